@@ -2767,17 +2767,10 @@ class Bayes:
             for i in range(len(lst_labels1)):
                 s_field0 = lst_labels1[i]
                 s_field1 = "{}_acc".format(lst_labels1[i])
-                self.steps[n_step]["Omega"][h][s_field1] = 0.0
-                for j in range(len(self.steps[n_step]["Omega"][h])):
-                    if j == 0:
-                        self.steps[n_step]["Omega"][h][s_field1].values[j] = self.steps[
-                            n_step
-                        ]["Omega"][h][s_field0].values[j]
-                    else:
-                        self.steps[n_step]["Omega"][h][s_field1].values[j] = (
-                            self.steps[n_step]["Omega"][h][s_field1].values[j - 1]
-                            + self.steps[n_step]["Omega"][h][s_field0].values[j]
-                        )
+                # running sum (columns are read-only views under copy-on-write)
+                self.steps[n_step]["Omega"][h][s_field1] = np.cumsum(
+                    self.steps[n_step]["Omega"][h][s_field0].values
+                )
         return None
 
     def conditionalize(self, dct_evidence, s_varfield="E", s_weightfield="W"):
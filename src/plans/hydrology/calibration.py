@@ -0,0 +1,430 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Monte Carlo (GLUE) calibration of hydrology models in a process pool.
+
+Parameter sets are sampled from the ``Min``/``Max`` hypotheses table used by
+:class:`plans.analyst.Bayes`, solved in parallel and scored with the model
+evaluation metrics. Scored samples are streamed into ``Bayes`` steps.
+
+Features
+--------
+
+* Deterministic uniform sampling of parameter hypotheses.
+* Parallel runs with :class:`concurrent.futures.ProcessPoolExecutor`.
+* Climate forcing shared with workers through shared memory.
+* Resumable runs (results are appended to a CSV file as they finish).
+* GLUE evidence (behavioral samples and likelihood weights) for ``Bayes``.
+
+Overview
+--------
+
+Each worker receives a copy of the model *once*, without its climate data.
+The forcing columns are placed in :mod:`multiprocessing.shared_memory` by
+the parent process and attached by the workers, so tasks only carry the
+sample parameters. Results are written to ``{name}_results.csv`` after each
+batch, with its batch number. On restart, samples of fully written batches
+are skipped and replayed into ``Bayes`` in the same batches.
+
+Examples
+--------
+
+.. code-block:: python
+
+    import pandas as pd
+    from plans.hydrology.calibration import Calibration
+
+    # hypotheses table
+    df_hyp = pd.DataFrame(
+        {"Name": ["kv", "gk"], "Min": [1.0, 5.0], "Max": [100.0, 100.0]}
+    )
+    # model is expected to hold climate and observed data
+    cal = Calibration(model=m, df_hypotheses=df_hyp, n_samples=1000, folder="./out")
+    df_results = cal.run(n_workers=4, batch_size=200)
+    print(cal.bayes.steps[-1]["Bands"])
+
+"""
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+import copy
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.analyst import Bayes
+from plans.hydrology import pool
+from plans.hydrology.core import METRICS
+from plans.hydrology.upscaled import UpscaledModel
+
+# ... {develop}
+
+
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+# CONSTANTS -- Module-level
+# =======================================================================
+
+# metrics where higher values are better (see ``get_evidence()``)
+METRICS_MAX = ("rsq", "nse", "kge", "lognse")
+
+# worker state (one model per process)
+_WORKER = {}
+
+# ... {develop}
+
+
+# FUNCTIONS
+# ***********************************************************************
+
+# FUNCTIONS -- Project-level
+# =======================================================================
+
+
+def sample_hypotheses(df_hypotheses, n_samples, seed=None):
+    """
+    Sample parameter sets uniformly from a hypotheses table.
+
+    :param df_hypotheses: hypotheses table with fields ``Name``, ``Min`` and ``Max``
+    :type df_hypotheses: :class:`pandas.DataFrame`
+    :param n_samples: number of samples
+    :type n_samples: int
+    :param seed: random seed (use it for reproducible and resumable runs)
+    :type seed: int
+    :return: samples table with field ``id`` and one field per parameter
+    :rtype: :class:`pandas.DataFrame`
+    """
+    rng = np.random.default_rng(seed)
+    dc = {"id": np.arange(n_samples)}
+    for i in range(len(df_hypotheses)):
+        h = df_hypotheses["Name"].values[i]
+        n_min = df_hypotheses["Min"].values[i]
+        n_max = df_hypotheses["Max"].values[i]
+        dc[h] = rng.uniform(n_min, n_max, size=n_samples)
+    return pd.DataFrame(dc)
+
+
+def get_evidence(df_results, hypotheses, likelihood="rsq", threshold=None):
+    """
+    Get GLUE evidence for ``Bayes.conditionalize()`` from scored samples.
+
+    .. note::
+
+        For efficiency metrics (``rsq``, ``nse``, ``kge`` and ``lognse``) the
+        likelihood weight is the metric itself (clipped at zero). For ``rmse``
+        and ``bias`` the weight is the inverse of the absolute error. Samples
+        not meeting the ``threshold`` get zero weight.
+
+    :param df_results: scored samples
+    :type df_results: :class:`pandas.DataFrame`
+    :param hypotheses: list of parameter names
+    :type hypotheses: list
+    :param likelihood: metric used as likelihood measure
+    :type likelihood: str
+    :param threshold: behavioral threshold for the metric (minimum for efficiency metrics, maximum otherwise)
+    :type threshold: float
+    :return: dictionary of evidence dataframes (fields ``E`` and ``W``)
+    :rtype: dict
+    """
+    if likelihood not in METRICS:
+        raise ValueError(f"Likelihood '{likelihood}' not found. Use one of {METRICS}")
+    vct_metric = df_results[likelihood].values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if likelihood in METRICS_MAX:
+            vct_w = np.where(vct_metric > 0.0, vct_metric, 0.0)
+            if threshold is not None:
+                vct_w = np.where(vct_metric >= threshold, vct_w, 0.0)
+        else:
+            vct_metric = np.abs(vct_metric)
+            vct_w = np.where(vct_metric > 0.0, 1.0 / vct_metric, 0.0)
+            if threshold is not None:
+                vct_w = np.where(vct_metric <= threshold, vct_w, 0.0)
+    vct_w = np.nan_to_num(vct_w, nan=0.0, posinf=0.0)
+    dc_evidence = {}
+    for h in hypotheses:
+        dc_evidence[h] = pd.DataFrame({"E": df_results[h].values, "W": vct_w})
+    return dc_evidence
+
+
+# FUNCTIONS -- Module-level
+# =======================================================================
+
+
+def _init_worker(model, ls_specs):
+    """
+    Set up the worker model with the shared climate data.
+
+    :param model: model template (see :func:`plans.hydrology.pool.get_template`)
+    :type model: :class:`plans.hydrology.core.Model`
+    :param ls_specs: list of column specs from :func:`plans.hydrology.pool.share_frame`
+    :type ls_specs: list
+    :return: None
+    :rtype: None
+    """
+    _WORKER["shm"] = pool.attach_model(model, ls_specs)  # keep references alive
+    _WORKER["model"] = model
+    _WORKER["params"] = {
+        p: copy.deepcopy(model.params[p]["value"]) for p in model.params
+    }
+    return None
+
+
+def _apply_params(model, dc_values, dc_base):
+    """
+    Reset model parameters to base values and apply sampled values.
+
+    .. note::
+
+        For ``UpscaledModel`` only initial conditions, parameters and (if
+        needed) the GUH are updated, so the climate setup is not repeated.
+
+    :param model: worker model
+    :type model: :class:`plans.hydrology.core.Model`
+    :param dc_values: sampled parameter values
+    :type dc_values: dict
+    :param dc_base: base parameter values
+    :type dc_base: dict
+    :return: None
+    :rtype: None
+    """
+    for p in dc_base:
+        model.params[p]["value"] = copy.deepcopy(dc_base[p])
+    for p in dc_values:
+        model.params[p]["value"] = dc_values[p]
+    if isinstance(model, UpscaledModel):
+        model._setup_start()
+        model._setup_params()
+        if "kq" in dc_values:
+            model._setup_guh()
+    else:
+        model.setup()
+    return None
+
+
+def _run_sample(dc_sample):
+    """
+    Solve and evaluate the worker model for one parameter set.
+
+    :param dc_sample: sample with ``id`` and parameter values
+    :type dc_sample: dict
+    :return: sample with evaluation metrics
+    :rtype: dict
+    """
+    model = _WORKER["model"]
+    dc_values = {p: dc_sample[p] for p in dc_sample if p != "id"}
+    _apply_params(model, dc_values, _WORKER["params"])
+    model.solve()
+    model.evaluate()
+    dc_out = dict(dc_sample)
+    for m in METRICS:
+        dc_out[m] = getattr(model, m)
+    return dc_out
+
+
+# CLASSES
+# ***********************************************************************
+
+# CLASSES -- Project-level
+# =======================================================================
+
+
+class Calibration:
+    """
+    Monte Carlo (GLUE) calibration driver feeding :class:`plans.analyst.Bayes`.
+    """
+
+    def __init__(
+        self,
+        model,
+        df_hypotheses,
+        n_samples=1000,
+        seed=None,
+        folder=None,
+        name="myCalibration",
+        gridsize=100,
+    ):
+        """
+        Deploy the calibration driver.
+
+        :param model: model holding parameters, climate data and observed data
+        :type model: :class:`plans.hydrology.core.Model`
+        :param df_hypotheses: hypotheses table with fields ``Name``, ``Min`` and ``Max``
+        :type df_hypotheses: :class:`pandas.DataFrame`
+        :param n_samples: number of samples
+        :type n_samples: int
+        :param seed: random seed
+        :type seed: int
+        :param folder: path to folder for resumable outputs. If None, nothing is saved
+        :type folder: str
+        :param name: name of calibration (used as file prefix)
+        :type name: str
+        :param gridsize: grid resolution of ``Bayes`` histograms
+        :type gridsize: int
+        """
+        self.model = model
+        self.hypotheses = df_hypotheses
+        self.n_samples = n_samples
+        self.seed = seed
+        self.folder = folder
+        self.name = name
+        self.gridsize = gridsize
+
+        # outputs
+        self.samples = None
+        self.results = None
+        self.bayes = None
+
+    def get_samples(self):
+        """
+        Get samples table. Loaded from file if a previous run exists.
+
+        :return: samples table
+        :rtype: :class:`pandas.DataFrame`
+        """
+        fpath = self._get_fpath("samples")
+        if fpath is not None and fpath.exists():
+            return pd.read_csv(fpath, sep=";")
+        df = sample_hypotheses(
+            df_hypotheses=self.hypotheses, n_samples=self.n_samples, seed=self.seed
+        )
+        if fpath is not None:
+            df.to_csv(fpath, sep=";", index=False)
+        return df
+
+    def _get_fpath(self, suffix):
+        # todo [docstring]
+        if self.folder is None:
+            return None
+        return Path(f"{self.folder}/{self.name}_{suffix}.csv")
+
+    def _conditionalize(self, df_batch, likelihood, threshold):
+        """
+        Stream a batch of scored samples into a new ``Bayes`` step.
+
+        :return: None
+        :rtype: None
+        """
+        hypotheses = list(self.hypotheses["Name"].values)
+        dc_evidence = get_evidence(
+            df_results=df_batch,
+            hypotheses=hypotheses,
+            likelihood=likelihood,
+            threshold=threshold,
+        )
+        # skip batches without behavioral samples
+        if np.sum(dc_evidence[hypotheses[0]]["W"].values) == 0:
+            return None
+        self.bayes.conditionalize(dct_evidence=dc_evidence)
+        return None
+
+    def run(self, n_workers=None, batch_size=100, likelihood="rsq", threshold=None):
+        """
+        Run the calibration.
+
+        .. note::
+
+            If ``folder`` is set, results are appended to ``{name}_results.csv``
+            after each batch, so an interrupted run can be resumed by calling
+            ``run()`` again. Saved batches (fields ``batch`` and ``batch_rows``)
+            are replayed as they were run, so only samples of batches not
+            fully written are solved again.
+
+        :param n_workers: number of worker processes. Default is the number of CPUs
+        :type n_workers: int
+        :param batch_size: number of samples per ``Bayes`` step
+        :type batch_size: int
+        :param likelihood: metric used as likelihood measure (see ``get_evidence()``)
+        :type likelihood: str
+        :param threshold: behavioral threshold for the likelihood metric
+        :type threshold: float
+        :return: scored samples
+        :rtype: :class:`pandas.DataFrame`
+        """
+        self.samples = self.get_samples()
+        self.bayes = Bayes(
+            df_hypotheses=self.hypotheses, name=self.name, gridsize=self.gridsize
+        )
+
+        # ---------------- resume previous results ---------------- #
+        fpath = self._get_fpath("results")
+        ls_results = []
+        n_batch = 0
+        if fpath is not None and fpath.exists():
+            df_done = pd.read_csv(fpath, sep=";")
+            # keep fully written batches only (an incomplete batch runs again)
+            vct_rows = df_done.groupby("batch")["batch"].transform("size")
+            b_full = (vct_rows == df_done["batch_rows"]).values
+            if not np.all(b_full):
+                df_done = df_done[b_full].reset_index(drop=True)
+                df_done.to_csv(fpath, sep=";", index=False)
+            # replay saved batches into Bayes
+            for _, df_batch in df_done.groupby("batch", sort=True):
+                self._conditionalize(df_batch, likelihood, threshold)
+            if len(df_done) > 0:
+                n_batch = int(df_done["batch"].max()) + 1
+            ls_results.append(df_done)
+        vct_done = np.concatenate([df["id"].values for df in ls_results] + [[]])
+        df_todo = self.samples[~self.samples["id"].isin(vct_done)]
+
+        # ---------------- run pending samples ---------------- #
+        if len(df_todo) > 0:
+            ls_shm, ls_specs = pool.share_frame(self.model.data_clim)
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=n_workers,
+                    initializer=_init_worker,
+                    initargs=(pool.get_template(self.model), ls_specs),
+                ) as executor:
+                    for i in range(0, len(df_todo), batch_size):
+                        ls_batch = df_todo.iloc[i : i + batch_size].to_dict("records")
+                        df_batch = pd.DataFrame(
+                            list(executor.map(_run_sample, ls_batch))
+                        )
+                        # batch boundaries for resuming
+                        df_batch["batch"] = n_batch
+                        df_batch["batch_rows"] = len(df_batch)
+                        n_batch = n_batch + 1
+                        # save before conditionalize
+                        if fpath is not None:
+                            df_batch.to_csv(
+                                fpath,
+                                sep=";",
+                                index=False,
+                                mode="a",
+                                header=not fpath.exists(),
+                            )
+                        ls_results.append(df_batch)
+                        self._conditionalize(df_batch, likelihood, threshold)
+            finally:
+                pool.release_frame(ls_shm)
+
+        self.results = pd.concat(ls_results, ignore_index=True)
+        return self.results
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    print("Hello world!")
+    # ... {develop}
@@ -42,9 +42,14 @@ Print a message
 
 # Native imports
 # =======================================================================
+import functools
 import glob
+import json
 import os.path
 import shutil
+import time
+import zipfile
+from contextlib import nullcontext
 from pathlib import Path
 
 # ... {develop}
@@ -84,6 +89,34 @@ HELLO = "Hello World!"  # example
 
 # CONSTANTS -- Module-level
 # =======================================================================
+
+# routing convolution methods (see ``convolve_uh()``)
+ROUTING_METHODS = ("auto", "direct", "fft", "oa")
+
+# maximum unit hydrograph length for direct convolution in "auto" mode
+ROUTING_DIRECT_MAX = 32
+
+# minimum ratio of series and unit hydrograph lengths for overlap-add in "auto" mode
+ROUTING_OA_RATIO = 64
+
+# evaluation metrics (see ``compute_metrics()``)
+METRICS = ("rmse", "rsq", "bias", "nse", "kge", "lognse")
+
+# offset for log-NSE, as a fraction of the mean observed value (avoids log of zero)
+LOGNSE_EPS = 0.01
+
+# data types of simulation arrays (see ``Model.dtype``)
+DTYPES = ("float32", "float64")
+
+# integration schemes of linear decay terms (see ``get_decay_k()``)
+SCHEMES = ("euler", "exact")
+
+# no-op block of models without profiling (see ``Model.profile``)
+_NO_PROFILE = nullcontext()
+
+# formats of exported simulation data
+EXPORT_FORMATS = ("csv", "npz")
+
 # ... {develop}
 
 
@@ -100,11 +133,83 @@ def compute_decay(s, dt, k):
     return s * dt / k
 
 
+def get_decay_k(k, dt, scheme="euler"):
+    """
+    Get the residence time of linear decay terms (``s * dt / k``) for an integration scheme.
+
+    .. note::
+
+        The ``exact`` scheme returns the effective residence time
+        ``dt / (1 - exp(-dt / k))``, so the explicit term gives the closed-form
+        outflow of a linear reservoir over one step, ``s * (1 - exp(-dt / k))``.
+        Outflow never exceeds storage, even for ``dt`` larger than ``k``.
+
+    :param k: residence time
+    :type k: float or :class:`numpy.ndarray`
+    :param dt: time step, in the same units of ``k``
+    :type dt: float
+    :param scheme: integration scheme, ``euler`` (explicit Euler) or ``exact``
+    :type scheme: str
+    :return: residence time for the explicit decay term
+    :rtype: float or :class:`numpy.ndarray`
+    """
+    if scheme == "euler":
+        return k
+    if scheme == "exact":
+        with np.errstate(divide="ignore"):
+            return dt / -np.expm1(-dt / np.asarray(k, dtype=np.float64))
+    raise ValueError(f"Scheme '{scheme}' not available. Use one of {SCHEMES}")
+
+
 def compute_flow(flow_pot, flow_cap):
     # todo [docstring]
     return np.where(flow_pot > flow_cap, flow_cap, flow_pot)
 
 
+def compute_metrics(pred, obs):
+    """
+    Compute all evaluation metrics between predicted and observed values.
+
+    .. note::
+
+        ``rmse``, ``rsq`` and ``bias`` follow :class:`plans.analyst.Bivar`.
+        ``rsq`` is computed against the 1:1 line, so it equals ``nse``.
+        ``kge`` is the Kling-Gupta Efficiency and ``lognse`` is the NSE of
+        log values (offset by ``LOGNSE_EPS`` times the mean observed value).
+
+    :param pred: 1d array of predicted values
+    :type pred: :class:`numpy.ndarray`
+    :param obs: 1d array of observed values
+    :type obs: :class:`numpy.ndarray`
+    :return: 1d array of metrics, in the order of ``METRICS``
+    :rtype: :class:`numpy.ndarray`
+    """
+    n = len(pred)
+    vct_err = pred - obs
+    sse = np.sum(np.power(vct_err, 2))
+    obs_mean = np.mean(obs)
+    sst = np.sum(np.power(obs - obs_mean, 2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rmse = np.sqrt(sse / n)
+        nse = 1 - (sse / sst)
+        bias = 100 * np.sum(vct_err) / np.sum(obs)
+        # Kling-Gupta Efficiency
+        pred_mean = np.mean(pred)
+        r = np.corrcoef(pred, obs)[0, 1] if n > 1 else np.nan
+        alpha = np.std(pred) / np.std(obs)
+        beta = pred_mean / obs_mean
+        kge = 1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2 + (beta - 1) ** 2)
+        # NSE of log values
+        eps = LOGNSE_EPS * obs_mean
+        vct_log_obs = np.log(obs + eps)
+        vct_log_err = np.log(pred + eps) - vct_log_obs
+        lognse = 1 - (
+            np.sum(np.power(vct_log_err, 2))
+            / np.sum(np.power(vct_log_obs - np.mean(vct_log_obs), 2))
+        )
+    return np.array([rmse, nse, bias, nse, kge, lognse], dtype=np.float64)
+
+
 def uh_convolution(flow: np.ndarray, uh: np.ndarray) -> np.ndarray:
     """
     Convolve a flow time series with a unit hydrograph (full output).
@@ -148,7 +253,188 @@ def uh_convolution(flow: np.ndarray, uh: np.ndarray) -> np.ndarray:
     if not np.isclose(uh.sum(), 1.0, atol=1e-6):
         raise ValueError("Unit hydrograph must sum to 1.")
 
-    return np.convolve(flow, uh, mode="full")
+    # direct convolution for short unit hydrographs, FFT-based otherwise
+    method = get_convolution_method(len(flow), len(uh))
+    if method == "direct":
+        return np.convolve(flow, uh, mode="full")
+    from scipy import signal
+
+    func = signal.oaconvolve if method == "oa" else signal.fftconvolve
+    return func(flow, uh, mode="full")
+
+
+def uh_convolution_batch(flow: np.ndarray, uh: np.ndarray) -> np.ndarray:
+    """
+    Convolve many flow time series with unit hydrographs in one call (full output).
+
+    Batched version of ``uh_convolution()``. Flow and unit hydrographs are
+    broadcast over series (first axis):
+
+    * one flow series and many unit hydrographs (e.g. screening of basins);
+    * many flow series and one unit hydrograph (e.g. design storms of a basin);
+    * many flow series and one unit hydrograph per series.
+
+    .. note::
+
+        Unit hydrographs of different lengths must be padded with zeros,
+        so the output length is :math:`N_{flow} + N_{UH} - 1` for the padded
+        length. Short unit hydrographs are convolved directly (one matrix
+        product over sliding windows of all series) and long ones with FFT,
+        as in ``uh_convolution()``.
+
+    :param flow: Input flow time series (1d or 2d, series x time).
+    :type flow: numpy.ndarray
+    :param uh: Unit hydrograph ordinates (1d or 2d, series x lags). Each must sum to 1.
+    :type uh: numpy.ndarray
+    :return: Routed hydrographs (series x full length).
+    :rtype: numpy.ndarray
+    :raises ValueError: If inputs are not 1D or 2D, series do not broadcast or a UH does not sum to unity.
+    """
+    flow = np.atleast_2d(np.asarray(flow, dtype=float))
+    uh = np.atleast_2d(np.asarray(uh, dtype=float))
+
+    if flow.ndim != 2 or uh.ndim != 2:
+        raise ValueError("Inputs must be 1D or 2D arrays.")
+
+    n_series = np.broadcast_shapes(flow.shape[:1], uh.shape[:1])[0]
+
+    if not np.allclose(uh.sum(axis=1), 1.0, atol=1e-6):
+        raise ValueError("Unit hydrographs must sum to 1.")
+
+    size = flow.shape[1]
+    size_uh = uh.shape[1]
+    method = get_convolution_method(size, size_uh)
+    if method == "direct":
+        from numpy.lib.stride_tricks import sliding_window_view
+
+        # windows of the padded flow times the reversed unit hydrographs
+        grd_pad = np.pad(flow, ((0, 0), (size_uh - 1, size_uh - 1)))
+        grd_win = sliding_window_view(grd_pad, size_uh, axis=-1)
+        outflow = np.matmul(grd_win, uh[:, ::-1, None])[..., 0]
+        return np.broadcast_to(outflow, (n_series, outflow.shape[1])).copy()
+    from scipy import signal
+
+    func = signal.oaconvolve if method == "oa" else signal.fftconvolve
+    outflow = func(flow, uh, mode="full", axes=-1)
+    return np.broadcast_to(outflow, (n_series, outflow.shape[1])).copy()
+
+
+def get_uh_support(uh, tol=1e-12):
+    """
+    Trim the negligible tail of a unit hydrograph.
+
+    The tail is dropped while its cumulative mass is not greater than ``tol``,
+    so exact trailing zeros (padding) are always dropped.
+
+    :param uh: Unit hydrograph ordinates (or 2d, one per row, trimmed to the longest support).
+    :type uh: numpy.ndarray
+    :param tol: Maximum mass of the dropped tail.
+    :type tol: float
+    :return: Unit hydrograph over its support (at least one ordinate).
+    :rtype: numpy.ndarray
+    """
+    uh = np.asarray(uh, dtype=float)
+    # cumulative mass of the tail, from the end
+    vct_tail = np.cumsum(np.abs(uh[..., ::-1]), axis=-1)[..., ::-1]
+    n = int(np.max(np.sum(vct_tail > tol, axis=-1)))
+    return uh[..., : max(n, 1)]
+
+
+def get_convolution_method(size, size_uh):
+    """
+    Choose the convolution method for routing by lengths.
+
+    Short unit hydrographs are convolved directly, long series with
+    overlap-add and other cases with a single FFT.
+
+    :param size: Series length.
+    :type size: int
+    :param size_uh: Unit hydrograph length.
+    :type size_uh: int
+    :return: Method name (``direct``, ``fft`` or ``oa``).
+    :rtype: str
+    """
+    if size_uh <= ROUTING_DIRECT_MAX:
+        return "direct"
+    if size >= ROUTING_OA_RATIO * size_uh:
+        return "oa"
+    return "fft"
+
+
+def convolve_uh(inflow, uh, memory=None, method="auto"):
+    """
+    Route inflow series with a unit hydrograph (output truncated to the inflow length).
+
+    .. math::
+
+        Q(t) = M(t) + \\sum_{\\tau=0}^{t} I(\\tau) \\cdot UH(t - \\tau)
+
+    where :math:`M` is the memory, the outflow of inflow before the first step.
+
+    .. note::
+
+        Inflow may be a 2d array (series x time). All series are routed
+        in one batched transform, with a shared unit hydrograph (1d) or
+        one unit hydrograph per series (2d). Missing values (NaN) are propagated to
+        all later outflow values, as in a step-by-step convolution.
+
+    .. note::
+
+        The ``direct`` method adds terms in time order, so results do not
+        depend on the series length (warm starts match full runs exactly).
+        ``fft`` and ``oa`` match it to round-off.
+
+    :param inflow: Inflow series (time in last axis).
+    :type inflow: numpy.ndarray
+    :param uh: Unit hydrograph ordinates, trimmed to its support (see ``get_uh_support()``). May be 2d (series x lags).
+    :type uh: numpy.ndarray
+    :param memory: [optional] Outflow of inflow before the first step (time in last axis).
+    :type memory: numpy.ndarray
+    :param method: Convolution method, one of ``ROUTING_METHODS``.
+    :type method: str
+    :return: Outflow series with the inflow shape.
+    :rtype: numpy.ndarray
+    """
+    if method not in ROUTING_METHODS:
+        raise ValueError(
+            f"Routing method '{method}' not available. Use one of {ROUTING_METHODS}"
+        )
+    inflow = np.asarray(inflow, dtype=float)
+    uh = np.asarray(uh, dtype=float)
+    size = inflow.shape[-1]
+    size_uh = min(uh.shape[-1], size)
+    uh = uh[..., :size_uh]
+    if method == "auto":
+        method = get_convolution_method(size, size_uh)
+
+    # missing values are removed and propagated later
+    vct_nan = np.cumsum(np.isnan(inflow), axis=-1) > 0
+    has_nan = bool(np.any(vct_nan))
+    if has_nan:
+        inflow = np.where(vct_nan, 0.0, inflow)
+
+    # memory comes first (same order as a step-by-step convolution)
+    outflow = np.zeros(inflow.shape, dtype=np.float64)
+    if memory is not None:
+        n = min(size, memory.shape[-1])
+        outflow[..., :n] = memory[..., :n]
+
+    if method == "direct":
+        # lags in reverse order: terms are added in time order
+        for lag in range(size_uh - 1, -1, -1):
+            outflow[..., lag:] = (
+                outflow[..., lag:] + inflow[..., : size - lag] * uh[..., lag : lag + 1]
+            )
+    else:
+        from scipy import signal
+
+        func = signal.oaconvolve if method == "oa" else signal.fftconvolve
+        vct_uh = uh.reshape((1,) * (inflow.ndim - uh.ndim) + uh.shape)
+        outflow = outflow + func(inflow, vct_uh, mode="full", axes=-1)[..., :size]
+
+    if has_nan:
+        outflow[vct_nan] = np.nan
+    return outflow
 
 
 def convert_deg_to_ratio(theta_deg):
@@ -257,6 +543,121 @@ def convert_mm_to_m3s(values, area_km2, dt_seconds=3600.0):
 
 # ... {develop}
 
+def profiled(name):
+    """
+    Decorate a model method to be timed as a profiler block (see ``Model.profile``).
+
+    :param name: block name
+    :type name: str
+    :return: method decorator
+    :rtype: callable
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._profile(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_columns_meta_file(fpath):
+    """
+    Get the path of the JSON metadata sidecar of a columnar ``.npz`` file.
+
+    :param fpath: path to ``.npz`` file
+    :type fpath: str
+    :return: path to ``.json`` file
+    :rtype: :class:`pathlib.Path`
+    """
+    return Path(fpath).with_suffix(".json")
+
+
+def save_columns(df, fpath, level=None, meta=None):
+    """
+    Save a table as a columnar ``.npz`` file with a JSON metadata sidecar.
+
+    .. note::
+
+        Each column is a ``.npy`` member of the archive, so single columns
+        can be read without parsing the whole file (see ``load_columns()``).
+        Text columns are stored as fixed-width unicode arrays.
+
+    :param df: table to save
+    :type df: :class:`pandas.DataFrame`
+    :param fpath: path to ``.npz`` file
+    :type fpath: str
+    :param level: [optional] compression level (``0`` to ``9``). Default is no compression
+    :type level: int
+    :param meta: [optional] extra metadata for the sidecar (JSON serializable)
+    :type meta: dict
+    :return: None
+    :rtype: None
+    """
+    if level is None:
+        compression = zipfile.ZIP_STORED
+    else:
+        compression = zipfile.ZIP_DEFLATED
+    dc_columns = {}
+    with zipfile.ZipFile(
+        fpath, mode="w", compression=compression, compresslevel=level
+    ) as zf:
+        for c in df.columns:
+            vct = df[c].to_numpy()
+            if vct.dtype == object:
+                vct = vct.astype(str)
+            with zf.open(f"{c}.npy", mode="w", force_zip64=True) as f:
+                np.lib.format.write_array(f, vct, allow_pickle=False)
+            dc_columns[str(c)] = str(vct.dtype)
+
+    dc_meta = {
+        "format": "npz",
+        "rows": len(df),
+        "level": level,
+        "columns": dc_columns,
+    }
+    if meta is not None:
+        dc_meta.update(meta)
+    with open(get_columns_meta_file(fpath), "w") as f:
+        json.dump(dc_meta, f, indent=2)
+    return None
+
+
+def load_columns_meta(fpath):
+    """
+    Load the JSON metadata sidecar of a columnar ``.npz`` file.
+
+    :param fpath: path to ``.npz`` file
+    :type fpath: str
+    :return: metadata
+    :rtype: dict
+    """
+    with open(get_columns_meta_file(fpath)) as f:
+        return json.load(f)
+
+
+def load_columns(fpath, columns=None):
+    """
+    Load a table (or some of its columns) from a columnar ``.npz`` file.
+
+    :param fpath: path to ``.npz`` file (see ``save_columns()``)
+    :type fpath: str
+    :param columns: [optional] columns to load. Default is all columns
+    :type columns: list
+    :return: table with columns in the saved order
+    :rtype: :class:`pandas.DataFrame`
+    """
+    with np.load(fpath, allow_pickle=False) as f:
+        if columns is None:
+            columns = f.files
+            if get_columns_meta_file(fpath).exists():
+                columns = list(load_columns_meta(fpath)["columns"])
+        return pd.DataFrame({c: f[c] for c in columns})
+
+
 # FUNCTIONS -- Module-level
 # =======================================================================
 # ... {develop}
@@ -269,6 +670,115 @@ def convert_mm_to_m3s(values, area_km2, dt_seconds=3600.0):
 # =======================================================================
 
 
+class Profiler:
+    """
+    Accumulator of wall time and call counts of process blocks.
+
+    Nested blocks are keyed by their path (e.g. ``solve/routing``). A block
+    opened again inside itself (e.g. ``super()`` calls of the same method)
+    is timed once, by the outer block.
+    """
+
+    def __init__(self):
+        # block path -> [calls, time]
+        self.blocks = {}
+        # paths of open blocks
+        self.stack = []
+
+    def block(self, name):
+        """
+        Get a timed block (context manager).
+
+        :param name: block name
+        :type name: str
+        :return: block context manager
+        :rtype: :class:`ProfilerBlock`
+        """
+        if len(self.stack) > 0 and self.stack[-1].split("/")[-1] == name:
+            return _NO_PROFILE
+        return ProfilerBlock(self, name)
+
+    def add(self, path, elapsed):
+        """
+        Accumulate one call of a block.
+
+        :param path: block path
+        :type path: str
+        :param elapsed: wall time in seconds
+        :type elapsed: float
+        :return: None
+        :rtype: None
+        """
+        acc = self.blocks.setdefault(path, [0, 0.0])
+        acc[0] += 1
+        acc[1] += elapsed
+        return None
+
+    def reset(self):
+        """
+        Clear all accumulated blocks.
+
+        :return: None
+        :rtype: None
+        """
+        self.blocks = {}
+        self.stack = []
+        return None
+
+    def get_report(self):
+        """
+        Get the table of accumulated blocks (in order of first call).
+
+        :return: table with fields ``block``, ``level``, ``calls``, ``time``, ``time_mean`` and ``share`` (of the time of top blocks)
+        :rtype: :class:`pandas.DataFrame`
+        """
+        ls_paths = list(self.blocks.keys())
+        vct_calls = np.array([self.blocks[b][0] for b in ls_paths], dtype=np.int64)
+        vct_time = np.array([self.blocks[b][1] for b in ls_paths], dtype=np.float64)
+        vct_level = np.array([b.count("/") for b in ls_paths], dtype=np.int64)
+        total = np.sum(vct_time[vct_level == 0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame(
+                {
+                    "block": ls_paths,
+                    "level": vct_level,
+                    "calls": vct_calls,
+                    "time": vct_time,
+                    "time_mean": vct_time / vct_calls,
+                    "share": vct_time / total,
+                }
+            )
+
+
+class ProfilerBlock:
+    """
+    Timed block of a :class:`Profiler`.
+    """
+
+    __slots__ = ("profiler", "name", "path", "t0")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.path = None
+        self.t0 = None
+
+    def __enter__(self):
+        stack = self.profiler.stack
+        self.path = self.name if len(stack) == 0 else f"{stack[-1]}/{self.name}"
+        stack.append(self.path)
+        # blocks are listed in order of first call
+        self.profiler.blocks.setdefault(self.path, [0, 0.0])
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.t0
+        self.profiler.stack.pop()
+        self.profiler.add(self.path, elapsed)
+        return False
+
+
 class Model(DataSet):
     # todo [optimize for DRY] move this class to root.py and make more abstract for all Models.
     #  Here can be a HydroModel(Model).
@@ -311,6 +821,9 @@ class Model(DataSet):
         self.rmse = None
         self.rsq = None
         self.bias = None
+        self.nse = None
+        self.kge = None
+        self.lognse = None
 
         # run file
         self.file_model = None
@@ -318,6 +831,31 @@ class Model(DataSet):
         # flags
         self.update_dt_flag = True
 
+        # numerical engine for solvers ("python" or "compiled")
+        self.engine = "python"
+
+        # data type of simulation arrays ("float32" or "float64")
+        self.dtype = "float64"
+
+        # integration scheme of linear decay terms ("euler" or "exact")
+        self.scheme = "euler"
+
+        # output variables kept in simulation data (all if None)
+        # develop logic in downstream objects
+        self.outputs = None
+
+        # warm start state (see get_checkpoint()) -- cold start if None
+        self.checkpoint = None
+
+        # profiling of solver blocks (see get_profile())
+        self.profile = False
+        self.profiler = Profiler()
+
+        # format of exported simulation data ("csv" or "npz", see save_columns())
+        self.export_format = "csv"
+        # compression level of binary exports (no compression if None)
+        self.export_level = None
+
         # testing helpers
         self.n_steps = None
 
@@ -655,15 +1193,24 @@ class Model(DataSet):
         """
         # ensure to update dt
         self.update_dt()
+        if np.dtype(self.dtype).name not in DTYPES:
+            raise ValueError(
+                f"Data type '{self.dtype}' not available. Use one of {DTYPES}"
+            )
+        if self.scheme not in SCHEMES:
+            raise ValueError(
+                f"Scheme '{self.scheme}' not available. Use one of {SCHEMES}"
+            )
         # get timestep series
         vc_ts = Model.get_timestep_series(
             start_time=self.params["t0"]["value"],
             end_time=self.params["tN"]["value"],
             time_unit=self.params["dt_freq"]["value"],
         )
+        # time spacing is exactly dt (so it does not depend on simulation length)
         vc_t = np.linspace(
             start=0,
-            stop=len(vc_ts) * self.params["dt"]["value"],
+            stop=(len(vc_ts) - 1) * self.params["dt"]["value"],
             num=len(vc_ts),
             dtype=np.float64,
         )
@@ -684,6 +1231,44 @@ class Model(DataSet):
 
         return None
 
+    def _profile(self, name):
+        """
+        Get a timed block of the model profiler (a no-op block if ``profile`` is False).
+
+        :param name: block name
+        :type name: str
+        :return: block context manager
+        :rtype: object
+        """
+        if self.profile:
+            return self.profiler.block(name)
+        return _NO_PROFILE
+
+    def get_profile(self):
+        """
+        Get the profiling report of solver blocks (accumulated over runs).
+
+        .. note::
+
+            Set ``profile`` to True before ``setup()`` and ``solve()``.
+            Use ``profiler.reset()`` to clear previous runs.
+
+        :return: table of blocks (see :meth:`Profiler.get_report`)
+        :rtype: :class:`pandas.DataFrame`
+        """
+        return self.profiler.get_report()
+
+    def get_empty_series(self, fill_value=np.nan):
+        """
+        Get an empty simulation series with the model data type.
+
+        :param fill_value: initial value of all steps
+        :type fill_value: float
+        :return: 1d array with the simulation length
+        :rtype: :class:`numpy.ndarray`
+        """
+        return np.full(self.slen, fill_value, dtype=self.dtype)
+
     def solve(self):
         """
         Solve the model for boundary and initial conditions by numerical methods.
@@ -724,6 +1309,75 @@ class Model(DataSet):
         self.evaluate()
         return None
 
+    def get_checkpoint(self):
+        """
+        Get the state checkpoint at the last simulation step. Expected to be incremented downstream.
+
+        .. note::
+
+            A later run started from the checkpoint (see ``load_checkpoint()``)
+            begins at the checkpoint timestamp, so only the new steps are solved.
+
+        :return: dict of arrays (flat keys)
+        :rtype: dict
+        """
+        last_datetime = pd.Timestamp(self.sdata[self.field_datetime][self.slen - 1])
+        dc = {
+            self.field_datetime: np.array(str(last_datetime)),
+            "dt": np.array(self.params["dt"]["value"]),
+        }
+        # ... continues in downstream objects ... #
+        return dc
+
+    def save_checkpoint(self, fpath):
+        """
+        Save the state checkpoint at the last simulation step to a ``.npz`` file.
+
+        :param fpath: path to file
+        :type fpath: str
+        :return: None
+        :rtype: None
+        """
+        np.savez(fpath, **self.get_checkpoint())
+        return None
+
+    def load_checkpoint(self, fpath):
+        """
+        Load a state checkpoint for warm starting. The start time ``t0`` is set
+        to the checkpoint timestamp.
+
+        :param fpath: path to ``.npz`` file
+        :type fpath: str
+        :return: None
+        :rtype: None
+        """
+        with np.load(fpath) as f:
+            self.checkpoint = {k: f[k] for k in f.files}
+        self.params["t0"]["value"] = str(self.checkpoint[self.field_datetime])
+        return None
+
+    def _setup_checkpoint(self):
+        """
+        Check if the checkpoint is compatible with the simulation.
+
+        :return: None
+        :rtype: None
+        """
+        dt = float(self.checkpoint["dt"])
+        if dt != self.params["dt"]["value"]:
+            raise ValueError(
+                f"Checkpoint time step ({dt}) differs from model time step "
+                f"({self.params['dt']['value']})"
+            )
+        t0 = pd.Timestamp(str(self.checkpoint[self.field_datetime]))
+        if t0 != pd.Timestamp(self.sdata[self.field_datetime][0]):
+            raise ValueError(
+                f"Checkpoint timestamp ({t0}) differs from model start time "
+                f"({self.sdata[self.field_datetime][0]})"
+            )
+        # ... continues in downstream objects ... #
+        return None
+
     def export(self, folder, filename):
         """
         Export object resources
@@ -736,17 +1390,61 @@ class Model(DataSet):
         :rtype: None
         """
         # export model simulation data
-        super().export(folder, filename=filename, data_suffix="sim")
+        if self.export_format == "csv":
+            super().export(folder, filename=filename, data_suffix="sim")
+        elif self.export_format == "npz":
+            # data goes to binary columns instead of csv
+            self.export_metadata(folder=folder, filename=filename + "_bootfile")
+            save_columns(
+                df=self.data,
+                fpath=f"{folder}/{filename}_sim.npz",
+                level=self.export_level,
+                meta=self.get_export_meta(),
+            )
+        else:
+            raise ValueError(
+                f"Export format '{self.export_format}' not available. "
+                f"Use one of {EXPORT_FORMATS}"
+            )
 
         # export model parameter file
         df_params = self.get_params()
         df_params.to_csv(f"{folder}/{filename}_params.csv", sep=";", index=False)
 
+        # export profiling report
+        if self.profile:
+            df_profile = self.get_profile()
+            df_profile.to_csv(f"{folder}/{filename}_profile.csv", sep=";", index=False)
+
         # export model observation data
         # develop in downstream objects
 
         # ... continues in downstream objects ... #
 
+    def get_export_meta(self):
+        """
+        Get the metadata of exported simulation data.
+
+        :return: model name, time step and units and descriptions of variables
+        :rtype: dict
+        """
+        dc_vars = {}
+        for v in self.data.columns:
+            if v in self.vars:
+                dc_vars[v] = {
+                    k: self.vars[v][k]
+                    for k in ["units", "description", "kind"]
+                    if k in self.vars[v]
+                }
+        return {
+            "model": self.object_alias,
+            "name": self.name,
+            "alias": self.alias,
+            "dt": float(self.params["dt"]["value"]),
+            "dt_units": self.params["dt"]["units"],
+            "variables": dc_vars,
+        }
+
     def save(self, folder):
         """
         Save to sourced files is not allowed for Model() family. Use .export() instead.
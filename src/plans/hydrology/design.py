@@ -545,6 +545,8 @@ def runoff_scs(P, CN):
 
     # --- retention parameter (mm) ---
     S = (25400.0 / CN) - 254.0
+    # (arrays of curve numbers are broadcast, e.g. one per row of a batch)
+    P, S = np.broadcast_arrays(P, S)
 
     #
     # --- initial abstraction (mm) ---
@@ -555,7 +557,7 @@ def runoff_scs(P, CN):
 
     # --- apply condition ---
     mask = P > Ia
-    R[mask] = ((P[mask] - Ia) ** 2) / (P[mask] + 0.8 * S)
+    R[mask] = ((P[mask] - Ia[mask]) ** 2) / (P[mask] + 0.8 * S[mask])
 
     return R
 
@@ -684,6 +686,248 @@ def tc_kirpich(L, S):
     return 0.0078 * (np.power(L_ft, 0.77)) * (np.power(S_ratio, -0.385))
 
 
+# FUNCTIONS -- Batch design storms
+# =======================================================================
+
+
+def get_storm_distributions(storm_type):
+    """
+    Get the SCS cumulative distributions of a batch of storms.
+
+    :param storm_type: Storm distribution types. One of: "I", "IA", "II", "III"
+    :type storm_type: str or :class:`numpy.ndarray`
+    :return: Cumulative fractions at hours 0-24 (storms x 25)
+    :rtype: :class:`numpy.ndarray`
+    """
+    vct_types = np.char.upper(np.atleast_1d(np.asarray(storm_type, dtype=str)))
+    ls_invalid = sorted(set(vct_types) - set(SCS_DISTRIBUTIONS))
+    if len(ls_invalid) > 0:
+        raise ValueError(
+            f"Invalid storm_type {ls_invalid}. Use one of {list(SCS_DISTRIBUTIONS.keys())}"
+        )
+    grd_dist = np.zeros((len(vct_types), len(SCS_TIME_HOURS)))
+    for t in np.unique(vct_types):
+        grd_dist[vct_types == t] = SCS_DISTRIBUTIONS[t]
+    return grd_dist
+
+
+def hyetograph_scs_batch(P, storm_type, duration=1440, dt=3600, factor=1):
+    """
+    Generate a batch of discrete hyetographs using SCS dimensionless distributions.
+
+    The 24-hour distribution is stretched to the storm duration :math:`D`,
+    so the cumulative fraction at time :math:`t` is :math:`F(24 \\cdot t / D)`.
+    All storms share the same time steps (ending at ``(i + 1) * dt``), padded
+    with zeros after the end of shorter storms.
+
+    .. note::
+
+        With the default duration (24 hours) and time step (1 hour) each row is
+        the ``p`` field of ``hyetograph_scs()``.
+
+    :param P: Total storm precipitation [mm]
+    :type P: float or :class:`numpy.ndarray`
+    :param storm_type: Storm distribution types. One of: "I", "IA", "II", "III"
+    :type storm_type: str or :class:`numpy.ndarray`
+    :param duration: Storm duration in minutes
+    :type duration: float or :class:`numpy.ndarray`
+    :param dt: Time step in seconds
+    :type dt: float
+    :param factor: Length multiplier of the time window (1 = longest duration, 2 = twice, ...)
+    :type factor: int
+    :return: Incremental precipitation [mm] (storms x steps)
+    :rtype: :class:`numpy.ndarray`
+    """
+    if factor < 1 or not isinstance(factor, int):
+        raise ValueError("factor must be an integer >= 1")
+    grd_dist = get_storm_distributions(storm_type)
+    vct_p, vct_d = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(P, dtype=float)),
+        np.atleast_1d(np.asarray(duration, dtype=float)),
+    )
+    if len(grd_dist) == 1:
+        grd_dist = np.repeat(grd_dist, len(vct_p), axis=0)
+
+    # common time steps (hours)
+    n_steps = int(np.ceil(factor * np.max(vct_d) * 60 / dt - 1e-9))
+    vct_t = np.arange(1, n_steps + 1) * dt / 3600
+
+    # storm time in hours of the 24-hour distribution
+    grd_tau = np.clip(24 * vct_t[None, :] / (vct_d[:, None] / 60), 0, 24)
+    grd_i = np.minimum(np.floor(grd_tau).astype(int), 23)
+    grd_w = grd_tau - grd_i
+    grd_f = np.take_along_axis(grd_dist, grd_i, axis=1) * (1 - grd_w)
+    grd_f = grd_f + np.take_along_axis(grd_dist, grd_i + 1, axis=1) * grd_w
+
+    # increments of the cumulative depth
+    return np.diff(grd_f * vct_p[:, None], axis=1, prepend=0.0)
+
+
+def hydrograph_scs_batch(grd_p, CN):
+    """
+    Compute effective rainfall (runoff) of a batch of hyetographs using the SCS Curve Number method.
+
+    Each row is computed as in ``hydrograph_scs()``, from the cumulative
+    precipitation of the row.
+
+    :param grd_p: Incremental precipitation [mm] (storms x steps)
+    :type grd_p: :class:`numpy.ndarray`
+    :param CN: SCS Curve Number of each storm [-]
+    :type CN: float or :class:`numpy.ndarray`
+    :return: Incremental runoff [mm] (storms x steps)
+    :rtype: :class:`numpy.ndarray`
+    """
+    grd_p_acc = np.cumsum(grd_p, axis=1)
+    vct_cn = np.atleast_1d(np.asarray(CN, dtype=float))
+    grd_r_acc = runoff_scs(grd_p_acc, vct_cn[:, None])
+    return np.diff(grd_r_acc, axis=1, prepend=0.0)
+
+
+def uh_scs_batch(dt, tc, duration=None):
+    """
+    Generate a batch of SCS synthetic unit hydrographs (one per time of concentration).
+
+    Rows are the ``uh_scs()`` hydrographs padded with zeros to the longest one.
+
+    :param dt: Time step in seconds.
+    :type dt: float
+    :param tc: Times of concentration in seconds.
+    :type tc: float or :class:`numpy.ndarray`
+    :param duration: Effective rainfall duration. Defaults to ``dt``.
+    :type duration: float, optional
+    :return: Unit hydrograph ordinates, rows sum to 1 (storms x lags)
+    :rtype: :class:`numpy.ndarray`
+    """
+    if duration is None:
+        duration = dt
+    vct_tp = 0.6 * np.atleast_1d(np.asarray(tc, dtype=float)) + duration / 2.0
+    vct_t = np.arange(0, SCS_T_TP.max() * vct_tp.max() + dt, dt)
+    grd_q = np.interp(vct_t[None, :] / vct_tp[:, None], SCS_T_TP, SCS_Q_QP)
+    return grd_q / np.sum(grd_q, axis=1, keepdims=True)
+
+
+def propagate_scs_batch(grd_r, tc, dt=3600):
+    """
+    Route a batch of runoff series using SCS unit hydrographs (one per series).
+
+    As in ``propagate_scs()``, the output is the full convolution, so
+    it is extended by the longest unit hydrograph (recession limb).
+
+    :param grd_r: Incremental runoff [mm] (storms x steps)
+    :type grd_r: :class:`numpy.ndarray`
+    :param tc: Times of concentration in seconds.
+    :type tc: float or :class:`numpy.ndarray`
+    :param dt: Time step in seconds.
+    :type dt: float
+    :return: Routed runoff [mm per step] (storms x extended steps)
+    :rtype: :class:`numpy.ndarray`
+    """
+    grd_uh = uh_scs_batch(dt=dt, tc=tc)
+    return uh_convolution_batch(flow=grd_r, uh=grd_uh)
+
+
+def design_storms(
+    recurrence,
+    duration,
+    CN,
+    tc,
+    parameters,
+    storm_type="II",
+    area=None,
+    dt=3600,
+    factor=1,
+):
+    """
+    Run a batch of design storms (IDF depth, SCS hyetograph, runoff and routing) in one call.
+
+    Inputs are broadcast to a common 1d shape, one design storm per item
+    (e.g. sites x return periods flattened). The storm depth comes from the IDF curve:
+
+    .. math::
+
+        P = i(T, D) \\cdot \\frac{D}{60}
+
+    .. note::
+
+        Time of concentration is expected in minutes, as returned by
+        ``tc_kirpich()`` and ``tc_scs()``.
+
+    :param recurrence: Recurrence times in years
+    :type recurrence: float or :class:`numpy.ndarray`
+    :param duration: Storm durations in minutes
+    :type duration: float or :class:`numpy.ndarray`
+    :param CN: SCS Curve Numbers [-]
+    :type CN: float or :class:`numpy.ndarray`
+    :param tc: Times of concentration in minutes
+    :type tc: float or :class:`numpy.ndarray`
+    :param parameters: IDF dict of parameters (see ``intensity_idf()``)
+    :type parameters: dict
+    :param storm_type: Storm distribution types. One of: "I", "IA", "II", "III"
+    :type storm_type: str or :class:`numpy.ndarray`
+    :param area: [optional] Drainage areas in m2, for discharges in m3/s and volumes in m3
+    :type area: float or :class:`numpy.ndarray`
+    :param dt: Time step in seconds
+    :type dt: float
+    :param factor: Length multiplier of the time window (1 = longest duration, 2 = twice, ...)
+    :type factor: int
+    :return: dict with time vector ``t`` [h], 2d arrays ``p``, ``r`` and ``q`` [mm per step] (storms x steps), ``Q`` [m3/s] if area is given, and the ``summary`` table
+    :rtype: dict
+    """
+    ls_inputs = [recurrence, duration, CN, tc, storm_type]
+    if area is not None:
+        ls_inputs.append(area)
+    ls_inputs = [np.ravel(a) for a in np.broadcast_arrays(*ls_inputs)]
+    vct_rec, vct_d, vct_cn, vct_tc, vct_types = ls_inputs[:5]
+    vct_d = vct_d.astype(float)
+
+    # storm depth
+    vct_p = intensity_idf(vct_rec, vct_d, parameters) * vct_d / 60
+
+    # batch series
+    grd_p = hyetograph_scs_batch(
+        P=vct_p, storm_type=vct_types, duration=vct_d, dt=dt, factor=factor
+    )
+    grd_r = hydrograph_scs_batch(grd_p, CN=vct_cn)
+    grd_q = propagate_scs_batch(grd_r, tc=60 * vct_tc.astype(float), dt=dt)
+
+    # pad series to the routed length
+    n_steps = grd_q.shape[1]
+    grd_p = np.pad(grd_p, ((0, 0), (0, n_steps - grd_p.shape[1])))
+    grd_r = np.pad(grd_r, ((0, 0), (0, n_steps - grd_r.shape[1])))
+    vct_t = np.arange(1, n_steps + 1) * dt / 3600
+    dc = {"t": vct_t, "p": grd_p, "r": grd_r, "q": grd_q}
+
+    # summary
+    vct_peak = np.argmax(grd_q, axis=1)
+    vct_r = np.sum(grd_r, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vct_rc = np.where(vct_p > 0, vct_r / vct_p, np.nan)
+    df = pd.DataFrame(
+        {
+            "id": np.arange(len(vct_p)),
+            "recurrence": vct_rec,
+            "duration": vct_d,
+            "storm_type": np.char.upper(vct_types.astype(str)),
+            "CN": vct_cn,
+            "tc": vct_tc,
+            "p": vct_p,
+            "r": vct_r,
+            "r_c": vct_rc,
+            "q_peak": grd_q[np.arange(len(grd_q)), vct_peak],
+            "t_peak": vct_t[vct_peak],
+        }
+    )
+    if area is not None:
+        vct_area = ls_inputs[5].astype(float)
+        # mm per step to m3/s
+        dc["Q"] = grd_q * (vct_area[:, None] / 1000 / dt)
+        df["area"] = vct_area
+        df["Q_peak"] = df["q_peak"] * vct_area / 1000 / dt
+        df["V"] = vct_r * vct_area / 1000
+    dc["summary"] = df
+    return dc
+
+
 # SCRIPT
 # ***********************************************************************
 # standalone behaviour as a script
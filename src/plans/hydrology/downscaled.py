@@ -42,7 +42,11 @@ Print a message
 
 # Native imports
 # =======================================================================
-# import {module}
+import glob
+import os
+from collections import OrderedDict
+from pathlib import Path
+
 # ... {develop}
 
 # External imports
@@ -54,7 +58,11 @@ import pandas as pd
 
 # Project-level imports
 # =======================================================================
-from .upscaled import UpscaledModel
+import plans.datasets as ds
+from plans import geo
+from .core import get_decay_k, profiled
+from .upscaled import UpscaledModel, CHECKPOINT_LEVELS
+from .kernels import UPSCALED_VARS
 
 # ... {develop}
 
@@ -65,6 +73,10 @@ from .upscaled import UpscaledModel
 
 # CONSTANTS -- Project-level
 # =======================================================================
+
+# zone layers of zonal aggregation (see DownscaledModel.zonal_layers)
+ZONAL_LAYERS = ("basin", "soils", "lulc")
+
 # ... {develop}
 
 # CONSTANTS -- Module-level
@@ -118,6 +130,24 @@ class DownscaledModel(UpscaledModel):
         self.use_g2g = True
         self.wmask = None
 
+        # active cells (flat indices in basemap) and their upscaling weights
+        self.cells = None
+        self.cells_weights = None
+
+        # map snapshots store (see plans.hydrology.store) -- disabled if folder is None
+        self.store_folder = None
+        self.store_vars = ["s", "g", "v", "qif"]
+        self.store_interval = 1  # in simulation steps
+        self.store_chunk = 100  # snapshots per chunk
+        self.store_dtype = "float32"
+        self.store_compress = False
+
+        # zonal aggregation (see plans.hydrology.zonal) -- disabled if zonal_vars is None
+        self.zonal_vars = None
+        self.zonal_layers = ["basin", "soils", "lulc"]
+        self.zonal_freq = "M"  # period frequency (pandas alias)
+        self.data_zonal = None
+
         # scenarios
         self.scenario_clim = "obs"
         self.scenario_lulc = "obs"
@@ -180,6 +210,11 @@ class DownscaledModel(UpscaledModel):
         self.file_data_lulc_ls = None
         self.filename_data_lulc = "lulc_*.tif"
 
+        # lazy lulc maps -- number of LULC maps kept in memory (None loads all maps)
+        self.lulc_cache_size = None
+        self.lulc_cache = None
+        self.data_lulc_catalog = None
+
         """
         Instructions: make a model that handles both G2G and HRU approach.
         The trick seems to have a area matrix that is the same...   
@@ -194,7 +229,7 @@ class DownscaledModel(UpscaledModel):
         # todo [docstring]
         super()._set_model_vars()
         # include local attribute
-        ls_non_local = ["t", "p", "e_pot", "q_obs", "q", "qbf", "qhf", "qgf"]
+        ls_non_local = ["t", "p", "e_pot", "q_obs", "q", "qbf", "qhf"]
         for v in self.vars:
             _b = True
             if v in set(ls_non_local):
@@ -237,22 +272,308 @@ class DownscaledModel(UpscaledModel):
     def _setup_wmask(self):
         # todo [docstring]
         if self.use_g2g:
-            self.wmask = self.data_basin.data.data
+            # nodata cells are not in the basin
+            self.wmask = np.ma.filled(self.data_basin.data, fill_value=0)
         else:
             # todo [develop] URH approach
             pass
 
         return None
 
+    def _setup_cells(self):
+        """
+        Set the active cells of the basemap (where ``wmask`` is positive).
+
+        .. note::
+
+            Local variables and parameter maps are stored as 1d arrays of
+            active cells only. Use ``get_map()`` to scatter them back to the
+            basemap grid (e.g., for exporting or viewing).
+
+        :return: None
+        :rtype: None
+        """
+        if self.wmask is None:
+            # all cells are active
+            self.cells = np.arange(self.basemap.size)
+            self.cells_weights = np.ones(self.basemap.size)
+        else:
+            vct_mask = np.asarray(self.wmask, dtype=np.float64).ravel()
+            self.cells = np.flatnonzero(vct_mask > 0)
+            self.cells_weights = vct_mask[self.cells]
+        return None
+
+    def get_cells(self, grid):
+        """
+        Get the values of active cells from a basemap grid.
+
+        :param grid: 2d array with the basemap shape (masked values are set to NaN)
+        :type grid: :class:`numpy.ndarray`
+        :return: 1d array of active cells values
+        :rtype: :class:`numpy.ndarray`
+        """
+        grd = np.ma.filled(np.ma.asarray(grid, dtype=np.float64), fill_value=np.nan)
+        return grd.ravel()[self.cells]
+
+    def get_map(self, values, fill_value=np.nan):
+        """
+        Scatter values of active cells back to a basemap grid.
+
+        :param values: 1d array of active cells values
+        :type values: :class:`numpy.ndarray`
+        :param fill_value: value for cells outside the basin
+        :type fill_value: float
+        :return: 2d array with the basemap shape
+        :rtype: :class:`numpy.ndarray`
+        """
+        grd = np.full(self.basemap.size, fill_value, dtype=np.float64)
+        grd[self.cells] = values
+        return grd.reshape(self.basemap.shape)
+
+    def get_lulc_epochs(self):
+        """
+        Get the LULC epochs of the simulation.
+
+        An epoch is a run of consecutive steps sharing the same LULC map.
+
+        :return: list of tuples ``(t_start, t_end, lulc_map_name)``, with ``t_end`` exclusive
+        :rtype: list
+        """
+        ids = self.sdata["lulc_map_id"]
+        bounds = np.flatnonzero(np.diff(ids)) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(ids)]])
+        return [
+            (int(t0), int(t1), self.lulc_maps_dc_inv[int(ids[t0])])
+            for t0, t1 in zip(starts, ends)
+        ]
+
+    def get_lulc_catalog(self):
+        """
+        Get the catalog of LULC maps.
+
+        :return: catalog with fields ``name`` and ``datetime`` (and ``file_data`` for lazy maps)
+        :rtype: :class:`pandas.DataFrame`
+        """
+        if self.data_lulc is None:
+            return self.data_lulc_catalog
+        return self.data_lulc.catalog
+
+    def _load_lulc_grid(self, lulc_map_name):
+        """
+        Load a LULC map grid, from memory or from its file (lazy maps).
+
+        :param lulc_map_name: name of the LULC map
+        :type lulc_map_name: str
+        :return: 2d array of LULC ids
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.data_lulc is not None:
+            return self.data_lulc.collection[lulc_map_name].data
+        df = self.data_lulc_catalog.set_index(self.field_name)
+        rst = ds.LULC(
+            name=lulc_map_name, datetime=df.loc[lulc_map_name, self.field_datetime]
+        )
+        rst.load_data(
+            file_data=df.loc[lulc_map_name, "file_data"],
+            file_table=self.file_data_lulc_table,
+        )
+        return rst.data
+
+    def _get_lulc_cache(self, lulc_map_name):
+        """
+        Get the cached LULC ids and parameter maps (active cells) of a LULC map.
+
+        Maps are built when first needed (e.g., when the solver enters the LULC
+        epoch) and only the ``lulc_cache_size`` most recently used LULC maps
+        are kept in memory.
+
+        :param lulc_map_name: name of the LULC map
+        :type lulc_map_name: str
+        :return: dict with LULC ids (``cells`` key) and parameter maps (``params`` key)
+        :rtype: dict
+        """
+        if lulc_map_name in self.lulc_cache:
+            self.lulc_cache.move_to_end(lulc_map_name)
+            return self.lulc_cache[lulc_map_name]
+        vct_src = self.get_cells(self._load_lulc_grid(lulc_map_name))
+        vc_ids = self.data_lulc_table[self.field_id].values
+        dc = {}
+        for p in self.params:
+            if self.params[p]["kind"] not in {"conceptual", "level"}:
+                continue
+            if self.params[p]["domain"] != "lulc":
+                continue
+            # downscaled values are set to the table (see _setup_params)
+            dc[p] = geo.convert(
+                array=vct_src,
+                old_values=vc_ids,
+                new_values=self.data_lulc_table[p].values,
+            )
+        self.lulc_cache[lulc_map_name] = {"cells": vct_src, "params": dc}
+        while len(self.lulc_cache) > self.lulc_cache_size:
+            self.lulc_cache.popitem(last=False)
+        return self.lulc_cache[lulc_map_name]
+
+    def get_lulc_cells(self, lulc_map_name):
+        """
+        Get the LULC ids of active cells of a LULC map.
+
+        :param lulc_map_name: name of the LULC map
+        :type lulc_map_name: str
+        :return: 1d array of LULC ids
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.lulc_cache_size is None:
+            return self.get_cells(self._load_lulc_grid(lulc_map_name))
+        return self._get_lulc_cache(lulc_map_name)["cells"]
+
+    def get_lulc_param_maps(self, lulc_map_name):
+        """
+        Get the LULC parameter maps (active cells) of a LULC map.
+
+        .. note::
+
+            If ``lulc_cache_size`` is set, maps are built when first needed
+            (see ``_get_lulc_cache()``).
+
+        :param lulc_map_name: name of the LULC map
+        :type lulc_map_name: str
+        :return: dict of parameter maps
+        :rtype: dict
+        """
+        if self.lulc_cache_size is not None:
+            return self._get_lulc_cache(lulc_map_name)["params"]
+        return {
+            p: self.params[p][lulc_map_name]
+            for p in self.params
+            if self.params[p]["kind"] in {"conceptual", "level"}
+            and self.params[p]["domain"] == "lulc"
+        }
+
+    @profiled("lulc")
+    def _get_lulc_params(self, lulc_map_name, g_cap):
+        """
+        Bind the LULC-dependent parameters of an epoch, including derived terms.
+
+        :param lulc_map_name: name of the LULC map
+        :type lulc_map_name: str
+        :param g_cap: soil capacity of active cells
+        :type g_cap: :class:`numpy.ndarray`
+        :return: keyword arguments for ``_solve_step()``
+        :rtype: dict
+        """
+        prm = self.get_lulc_param_maps(lulc_map_name)
+        s_of_a = prm["sofa"]
+        s_uf_a = prm["sufa"]
+        s_uf_cap = prm["sufcap"]
+        d_e_a = prm["dea"]
+        return {
+            # [Canopy] canopy parameters
+            "c_k": get_decay_k(
+                k=prm["ck"], dt=self.params["dt"]["value"], scheme=self.scheme
+            ),
+            "c_a": prm["ca"],
+            # [Surface] surface parameters
+            "s_k": prm["sk"],
+            "s_of_c": prm["sofc"],
+            "s_uf_a": s_uf_a,
+            "s_uf_c": prm["sufc"],
+            # [Soil] root zone parameter -- must not exceed G_cap
+            "d_e_a": np.where(d_e_a > g_cap, g_cap, d_e_a),
+            # [Surface] shutdown factor for underland flow
+            "s_uf_shutdown": UpscaledModel.compute_s_uf_shutdown(s_uf_cap, s_uf_a),
+            # [Surface] effective overland flow activation level
+            "s_of_a_eff": UpscaledModel.compute_sof_a_eff(s_uf_cap, s_of_a),
+        }
+
+    def _get_store_writer(self):
+        """
+        Get the map snapshots writer, if the store is enabled.
+
+        :return: writer or None if ``store_folder`` is None
+        :rtype: :class:`plans.hydrology.store.MapStoreWriter` or None
+        """
+        if self.store_folder is None:
+            return None
+        from plans.hydrology.store import MapStoreWriter
+
+        for v in self.store_vars:
+            if v not in UPSCALED_VARS:
+                raise ValueError(
+                    f"Variable '{v}' can not be stored. Use one of {list(UPSCALED_VARS)}"
+                )
+        return MapStoreWriter(
+            folder=self.store_folder,
+            variables=self.store_vars,
+            cells=self.cells,
+            shape=self.basemap.shape,
+            chunk_size=self.store_chunk,
+            dtype=self.store_dtype,
+            compress=self.store_compress,
+        )
+
+    def _get_zonal_reducer(self):
+        """
+        Get the zonal reducer, if zonal aggregation is enabled.
+
+        .. note::
+
+            The ``lulc`` layer is set at each LULC epoch by ``solve()``.
+
+        :return: reducer or None if ``zonal_vars`` is None
+        :rtype: :class:`plans.hydrology.zonal.ZonalReducer` or None
+        """
+        if self.zonal_vars is None:
+            return None
+        from plans.hydrology.zonal import ZonalReducer
+
+        for v in self.zonal_vars:
+            if v not in UPSCALED_VARS:
+                raise ValueError(
+                    f"Variable '{v}' can not be reduced. Use one of {list(UPSCALED_VARS)}"
+                )
+        for s in self.zonal_layers:
+            if s not in ZONAL_LAYERS:
+                raise ValueError(
+                    f"Zone layer '{s}' not found. Use one of {ZONAL_LAYERS}"
+                )
+
+        # period of steps
+        vct_dt = pd.DatetimeIndex(self.sdata[self.field_datetime])
+        vct_periods, vct_labels = pd.factorize(vct_dt.to_period(self.zonal_freq))
+        reducer = ZonalReducer(
+            variables=self.zonal_vars,
+            periods=vct_periods,
+            weights=self.cells_weights,
+            labels=vct_labels.astype(str),
+        )
+        if "basin" in self.zonal_layers:
+            vct_zones = self.get_cells(self.data_basin.data)
+            reducer.set_layer(
+                name="basin",
+                zones=vct_zones,
+                zone_ids=np.unique(vct_zones[np.isfinite(vct_zones)]),
+            )
+        if "soils" in self.zonal_layers:
+            reducer.set_layer(
+                name="soils",
+                zones=self.get_cells(self.data_soils.data),
+                zone_ids=self.data_soils_table[self.field_id].values,
+            )
+        return reducer
+
     def _setup_vars(self):
         # todo [docstring]
+        n_cells = len(self.cells)
         for v in self.vars:
             is_local = self.vars[v]["local"]
             if is_local:
-                # append a zero 2d map with 2 rows
-                self.vars[v]["map"] = np.array([self.basemap, self.basemap]) * 0.0
+                # append a zero array with 2 rows (t and t + 1) of active cells
+                self.vars[v]["map"] = np.zeros((2, n_cells), dtype=np.float64)
         return None
 
+    @profiled("params")
     def _setup_params(self):
         # todo [docstring]
         super()._setup_params()
@@ -273,13 +594,17 @@ class DownscaledModel(UpscaledModel):
             },
         }
 
-        # retrieve only conceptual parameters
+        # retrieve only conceptual and level parameters
         ls_params = []
         for p in self.params:
             p_kind = self.params[p]["kind"]
-            if p_kind == "conceptual":
+            if p_kind in {"conceptual", "level"}:
                 ls_params.append(p)
 
+        # reset lazy LULC maps once per setup (see get_lulc_param_maps)
+        if self.lulc_cache_size is not None:
+            self.lulc_cache = OrderedDict()
+
         # loop over parameters
         for p in ls_params:
             p_domain = self.params[p]["domain"]
@@ -304,33 +629,32 @@ class DownscaledModel(UpscaledModel):
                 # reset data table
                 dc_aux[p_domain]["table"][p] = vc_down.copy()
 
-            # [SOILS] parameter maps
+            # [SOILS] parameter maps (active cells only)
             if p_domain == "soils":
-                grd_src = self.data_soils.data.filled(fill_value=np.nan)
+                vct_src = self.get_cells(self.data_soils.data)
                 # append as "map" key
                 self.params[p]["map"] = geo.convert(
-                    array=grd_src, old_values=vc_ids, new_values=vc_down
+                    array=vct_src, old_values=vc_ids, new_values=vc_down
                 )
 
-            # [LULC] parameter maps
-            if p_domain == "lulc":
+            # [LULC] parameter maps (active cells only)
+            if p_domain == "lulc" and self.lulc_cache_size is None:
                 # run over all available lulcs
                 for lulc in self.lulc_maps_ls:
-                    grd_src = self.data_lulc.collection[lulc].data.filled(
-                        fill_value=np.nan
-                    )
+                    vct_src = self.get_cells(self.data_lulc.collection[lulc].data)
                     # append as lulc name
                     self.params[p][lulc] = geo.convert(
-                        array=grd_src, old_values=vc_ids, new_values=vc_down
+                        array=vct_src, old_values=vc_ids, new_values=vc_down
                     )
             #
 
         return None
 
+    @profiled("lulc")
     def _setup_add_lulc_to_data(self):
         # todo [docstring]
         df_main = self.data.copy()
-        df_lulc_meta = self.data_lulc.catalog.copy()
+        df_lulc_meta = self.get_lulc_catalog().copy()
 
         # Convert 'datetime' columns to datetime objects
         df_main[self.field_datetime] = pd.to_datetime(df_main[self.field_datetime])
@@ -373,6 +697,7 @@ class DownscaledModel(UpscaledModel):
 
         return None
 
+    @profiled("start")
     def _setup_start(self):
         # todo [docstring]
         super()._setup_start()
@@ -387,8 +712,26 @@ class DownscaledModel(UpscaledModel):
                         self.vars[v]["map"][0] + self.params["{}0".format(v)]["value"]
                     )
 
+        # --- warm start overwrites local initial conditions
+        if self.checkpoint is not None:
+            for v in CHECKPOINT_LEVELS:
+                self.vars[v]["map"][0] = self.checkpoint[f"map_{v}"]
+
         return None
 
+    def get_checkpoint(self):
+        """
+        Get the state checkpoint at the last simulation step, including
+        the local storage levels of active cells.
+
+        :return: dict of arrays (flat keys)
+        :rtype: dict
+        """
+        dc = super().get_checkpoint()
+        for v in CHECKPOINT_LEVELS:
+            dc[f"map_{v}"] = self.vars[v]["map"][0].copy()
+        return dc
+
     def setter(self, dict_setter):
         """
         Set selected attributes based on an incoming dictionary.
@@ -416,6 +759,17 @@ class DownscaledModel(UpscaledModel):
         # ... continues in downstream objects ... #
         return None
 
+    def _get_obs_field(self):
+        """
+        Get the field of observed values in ``data_obs`` (the simulation basin).
+
+        :return: field name
+        :rtype: str
+        """
+        if self.sbasin is None:
+            return super()._get_obs_field()
+        return self.sbasin
+
     def get_evaldata(self):
         # todo [docstring]
         data_obs_src = self.data_obs.copy()
@@ -504,6 +858,27 @@ class DownscaledModel(UpscaledModel):
         self.data_lulc_table_src = self.data_lulc_table.copy()
         self.lulc_n = len(self.data_lulc_table)
 
+        if self.lulc_cache_size is not None:
+            # lazy maps -- catalog only (see get_lulc_param_maps)
+            ls_files = sorted(
+                glob.glob(f"{self.folder_data_lulc}/{self.filename_data_lulc}")
+            )
+            self.data_lulc = None
+            self.data_lulc_catalog = pd.DataFrame(
+                {
+                    self.field_name: [
+                        os.path.basename(f).split(".")[0] for f in ls_files
+                    ],
+                    # same as ``load_folder()``
+                    self.field_datetime: [
+                        f.split("_")[-1].split(".")[0] for f in ls_files
+                    ],
+                    "file_data": ls_files,
+                }
+            )
+            self.lulc_maps_ls = list(self.data_lulc_catalog[self.field_name].values)
+            return None
+
         # lulc map collection
         self.data_lulc = ds.LULCSeries(name=self.name)
         # todo [develop] -- feature for handling the file format (tif, etc)
@@ -516,6 +891,25 @@ class DownscaledModel(UpscaledModel):
         self.lulc_maps_ls = list(self.data_lulc.collection.keys())
         return None
 
+    def load_scenario(self, scenario_clim="obs", scenario_lulc="obs"):
+        """
+        Load the climate and LULC data of a scenario. Other inputs (basin, topo and soils) are kept.
+
+        :param scenario_clim: name of climate scenario folder. If None, climate data is kept
+        :type scenario_clim: str
+        :param scenario_lulc: name of LULC scenario folder. If None, LULC data is kept
+        :type scenario_lulc: str
+        :return: None
+        :rtype: None
+        """
+        self._set_scenario(scenario_clim=scenario_clim, scenario_lulc=scenario_lulc)
+        if scenario_clim is not None:
+            self.load_clim()
+        if scenario_lulc is not None:
+            self.load_lulc()
+            self._set_basemap()
+        return None
+
     def load_data(self):
         """
         Load simulation data. Expected to increment superior methods.
@@ -546,6 +940,7 @@ class DownscaledModel(UpscaledModel):
 
         return None
 
+    @profiled("setup")
     def setup(self):
         """
         Set model simulation.
@@ -559,8 +954,13 @@ class DownscaledModel(UpscaledModel):
         :rtype: None
         """
 
-        # set all local variables (this need to be only t and t+1)
-        self._setup_vars()
+        with self._profile("cells"):
+            # set active cells
+            self._setup_wmask()
+            self._setup_cells()
+
+            # set all local variables (this need to be only t and t+1)
+            self._setup_vars()
 
         # setup superior object
         # this sets all global variables to the main data table
@@ -575,10 +975,25 @@ class DownscaledModel(UpscaledModel):
 
         return None
 
+    def start_stream(self):
+        """
+        Stepwise simulations are not available for local processes.
+
+        :return: None
+        :rtype: None
+        """
+        raise NotImplementedError(
+            "Stepwise simulations are available for UpscaledModel only"
+        )
+
+    @profiled("solve")
     def solve(self):
         """
         Solve the model for inputs and initial conditions by numerical methods.
 
+        Local processes are solved over the active cells. Global series are
+        the weighted mean of active cells and are routed as in ``UpscaledModel``.
+
         .. warning::
 
             This method overwrites model data.
@@ -597,30 +1012,29 @@ class DownscaledModel(UpscaledModel):
         # full global processes data is a dataframe with numpy arrays
         gb = self.sdata
 
+        # local processes data (t and t + 1 rows of active cells)
+        lc = {v: self.vars[v]["map"] for v in UPSCALED_VARS}
+        ls_levels = ["c", "s", "v", "g"]
+
         #
         # ---------------- parameters variables ----------------
         #
 
         # [Soil] soil parameters
         g_cap = self.params["gcap"][self.datakey]
-        # compute the global/basin gcap
-        gb_g_cap = geo.upscale(array=g_cap, weights=self.wmask, mode="mean")
         k_v = self.params["kv"][self.datakey]
-        g_k = self.params["gk"][self.datakey]
-        # compute the global/basin gk
-        gb_g_k = geo.upscale(array=g_k, weights=self.wmask, mode="mean")
+        g_k = get_decay_k(k=self.params["gk"][self.datakey], dt=dt, scheme=self.scheme)
         g_e_cap = self.params["ecap"][self.datakey]
-        d_e_a = self.params["dea"][self.datakey]
 
         #
-        # ---------------- derived parameter variables ----------------
+        # ---------------- initial conditions ----------------
         #
 
-        # [Surface] Conpute shutdown factor for underland flow
-        s_uf_shutdown = UpscaledModel.compute_s_uf_shutdown(s_uf_cap, s_uf_a)
-
-        # [Surface] Compute effective overland flow activation level
-        s_of_a_eff = UpscaledModel.compute_sof_a_eff(s_uf_cap, s_of_a)
+        # --- G0 storage must not exceed G_cap
+        lc["g"][0] = np.where(lc["g"][0] > g_cap, g_cap, lc["g"][0])
+        # --- V0 storage must not exceed D (Gcap - G)
+        d0 = g_cap - lc["g"][0]
+        lc["v"][0] = np.where(lc["v"][0] > d0, d0, lc["v"][0])
 
         #
         # ---------------- testing features ----------------
@@ -628,324 +1042,115 @@ class DownscaledModel(UpscaledModel):
 
         # [Testing feature] shutdown E_pot
         if self.shutdown_epot:
-            gb["e_pot"] = np.full(self.slen, 0.0)
+            gb["e_pot"] = self.get_empty_series(0.0)
 
         #
         # ---------------- numerical solution ----------------
         #
 
-        # ---------------- START TIME LOOP ---------------- #
-        # loop over steps (Euler Method)
-        for t in range(self.n_steps - 1):
-            # reset i
-            i = 0
-            #
-            # [LULC] ---------- variable parameters ---------- #
-            #
-
-            # access the current lulc epoch
-            lulc_map_id = gb["lulc_map_id"][t]
-            lulc_map_name = self.lulc_maps_dc_inv[lulc_map_id]
-
-            # [Canopy] canopy parameters
-            c_k = self.params["ck"][lulc_map_name]
-            c_a = self.params["ca"][lulc_map_name]
-
-            # [Surface] surface parameters
-            s_k = self.params["sk"][lulc_map_name]
-            s_of_a = self.params["sofa"][lulc_map_name]
-            s_of_c = self.params["sofc"][lulc_map_name]
-            s_uf_a = self.params["sufa"][lulc_map_name]
-            s_uf_c = self.params["sufc"][lulc_map_name]
-            s_uf_cap = self.params["sufcap"][lulc_map_name]
-
-            #
-            # [Deficit] ---------- update deficits ---------- #
-            #
-
-            # [Deficit] Phreatic zone deficit
-            ## gb["d"][t] = Global.compute_d(g_cap=g_cap, g=gb["g"][t])
-            gb["d"][t] = UpscaledModel.compute_d(g_cap=g_cap, g=gb["g"][t])
-
-            # [Deficit] Vadose zone deficit
-            gb["dv"][t] = UpscaledModel.compute_dv(d=gb["d"][t], v=gb["v"][t])
-
-            #
-            # [Evaporation] ---------- get evaporation flows first ---------- #
-            #
-
-            # [Evaporation] [Canopy] ---- evaporation from canopy
-
-            # [Evaporation] [Canopy] compute potential flow
-            e_c_pot = UpscaledModel.compute_ec_pot(e_pot=gb["e_pot"][t])
-
-            # [Evaporation] [Canopy] compute capacity flow
-            e_c_cap = UpscaledModel.compute_ec_cap(c=gb["c"][t], dt=dt)
-
-            # [Evaporation] [Canopy] compute actual flow
-            gb["ec"][t] = UpscaledModel.compute_ec(e_c_pot, e_c_cap)
-
-            # [Evaporation] [Soil] ---- transpiration from soil
-
-            # [Evaporation] [Soil] compute potential flow
-            e_t_pot = UpscaledModel.compute_et_pot(e_pot=gb["e_pot"][t], ec=gb["ec"][t])
-
-            # [Evaporation] [Soil] compute the root zone depth factor
-            gb["egf"][t] = UpscaledModel.compute_et_f(dv=gb["dv"][t], d_et_a=d_e_a)
-
-            # [Evaporation] [Soil] compute capacity flow
-            e_t_cap = UpscaledModel.compute_et_cap(
-                e_t_f=gb["egf"][t], g=gb["g"][t], g_et_cap=g_e_cap, dt=dt
-            )
-
-            # [Evaporation] [Soil] compute actual flow
-            gb["eg"][t] = UpscaledModel.compute_et(e_t_pot, e_t_cap)
-
-            # [Evaporation] [Surface] ---- evaporation from surface
-
-            # [Evaporation] [Surface] compute potential flow
-            e_s_pot = UpscaledModel.compute_es_pot(
-                e_pot=gb["e_pot"][t], ec=gb["ec"][t], et=gb["eg"][t]
-            )
-
-            # [Evaporation] [Surface] compute capacity flow
-            e_s_cap = UpscaledModel.compute_es_cap(s=gb["s"][t], dt=dt)
-
-            # [Evaporation] [Surface] compute actual flow
-            gb["es"][t] = UpscaledModel.compute_es(e_s_pot, e_s_cap)
-
-            #
-            # [Evaporation] [Balance] ---- a priori discounts ---------- #
-            #
-
-            # [Evaporation] [Balance] -- apply discount a priori
-            gb["c"][t] = UpscaledModel.compute_e_discount(
-                storage=gb["c"][t], discount=gb["ec"][t]
-            )
-
-            # [Evaporation] [Balance] -- apply discount a priori
-            gb["g"][t] = UpscaledModel.compute_e_discount(
-                storage=gb["g"][t], discount=gb["eg"][t]
-            )
-
-            # [Evaporation] [Balance] water balance -- apply discount a priori
-            gb["s"][t] = UpscaledModel.compute_e_discount(
-                storage=gb["s"][t], discount=gb["es"][t]
-            )
-
-            #
-            # [Canopy] ---------- Solve canopy water balance ---------- #
-            #
-
-            # [Canopy] [Throughfall] --
-
-            # [Canopy] [Throughfall] Compute throughfall fraction
-            gb["ptff"][t] = UpscaledModel.compute_tf_f(c=gb["c"][t], ca=c_a)
-
-            # [Canopy] [Throughfall] Compute throughfall capacity
-            p_tf_cap = UpscaledModel.compute_tf_cap(
-                c=gb["c"][t], ca=c_a, p=gb["p"][t], dt=dt
-            )
-
-            # [Canopy] [Throughfall] Compute throughfall
-            gb["ptf"][t] = UpscaledModel.compute_tf(
-                p_tf_cap=p_tf_cap, p_tf_f=gb["ptff"][t]
-            )
-
-            # [Canopy] [Stemflow] --
-
-            # [Canopy] [Stemflow] Compute potential stemflow -- only activated storage contributes
-            c_sf_pot = UpscaledModel.compute_sf_pot(c=gb["c"][t], ca=c_a)
-
-            # [Canopy] [Stemflow] Compute actual stemflow
-            gb["psf"][t] = compute_decay(s=c_sf_pot, dt=dt, k=c_k)
-
-            # [Canopy] [Aggflows] --
-
-            # [Canopy] [Aggflows] Compute effective rain on surface
-            gb["ps"][t] = UpscaledModel.compute_ps(sf=gb["psf"][t], tf=gb["ptf"][t])
-
-            # [Canopy] [Aggflows] Compute effective rain on canopy
-            gb["pc"][t] = UpscaledModel.compute_pc(p=gb["p"][t], tf_f=gb["ptff"][t])
-
-            # [Canopy] [Water Balance] ---- Apply water balance
-            gb["c"][t + 1] = UpscaledModel.compute_next_c(
-                c=gb["c"][t], pc=gb["pc"][t], sf=gb["psf"][t]
-            )
-
-            #
-            # [Surface] ---------- Solve surface water balance ---------- #
-            #
-
-            # [Surface] [Overland] -- Overland flow
-
-            # [Surface] [Overland] Compute surface overland spill storage capacity
-            sof_ss_cap = UpscaledModel.compute_sof_cap(s=gb["s"][t], sof_a=s_of_a_eff)
-
-            # [Surface] [Overland] Compute overland flow fraction
-            gb["qoff"][t] = UpscaledModel.compute_qof_f(
-                sof_cap=sof_ss_cap, sof_c=s_of_c
-            )
-
-            # [Surface] [Overland] Compute overland flow capacity
-            q_of_cap = UpscaledModel.compute_qof_cap(
-                sof_cap=sof_ss_cap, ps=gb["ps"][t], dt=dt
-            )
-
-            # [Surface] [Overland] Compute potential overland
-            q_of_pot = UpscaledModel.compute_qof_pot(
-                qof_cap=q_of_cap, qof_f=gb["qoff"][t]
-            )
-
-            # [Surface] [Underland] -- Underland flow
-
-            # [Surface] [Underland] Compute surface underland spill storage capacity
-            suf_ss_cap = UpscaledModel.compute_suf_cap(
-                s=gb["s"][t], suf_a=s_uf_a, shutdown=s_uf_shutdown
-            )
-
-            # [Surface] [Underland] Compute underland flow fraction
-            gb["quff"][t] = UpscaledModel.compute_quf_f(
-                suf_cap=suf_ss_cap, suf_c=s_uf_c
-            )
-
-            # [Surface] [Underland] Compute underland flow capacity
-            q_uf_cap = UpscaledModel.compute_quf_cap(suf_cap=suf_ss_cap, dt=dt)
-
-            # [Surface] [Underland] Compute potential underland flow
-            q_uf_pot = UpscaledModel.compute_quf_pot(
-                quf_cap=q_uf_cap, quf_f=gb["quff"][t]
-            )
-
-            # [Surface] [Infiltration] -- Infiltration flow
-
-            # [Surface] [Infiltration] -- Potential infiltration from downstream (soil)
-            q_if_pot_down = UpscaledModel.compute_qif_pot_down(
-                d=gb["d"][t], v=gb["v"][t], dt=dt
-            )
-
-            # [Surface] [Infiltration] -- Potential infiltration from upstream (hydraulic head)
-            q_if_pot_up = UpscaledModel.compute_qif_pot_up(s=gb["s"][t], sk=s_k, dt=dt)
-
-            # [Surface] [Infiltration] -- Potential infiltration
-            q_if_pot = UpscaledModel.compute_qif_pot(
-                if_down=q_if_pot_down, if_up=q_if_pot_up
-            )
-
-            # [Testing feature]
-            if self.shutdown_qif:
-                q_if_pot = 0.0 * q_if_pot
-
-            # [Surface] -- Full potential outflow
-            s_out_pot = q_of_pot + q_uf_pot + q_if_pot
-
-            # [Surface] ---- Actual flows
-
-            # [Surface] Compute surface outflow capacity
-            s_out_cap = gb["s"][t]
-
-            # [Surface] Compute Actual outflow
-            s_out_act = np.where(s_out_cap > s_out_pot, s_out_pot, s_out_cap)
-
-            # [Surface] Allocate outflows
-            with np.errstate(divide="ignore", invalid="ignore"):
-                gb["qof"][t] = s_out_act * np.where(
-                    s_out_pot == 0.0, 0.0, q_of_pot / s_out_pot
-                )
-                gb["quf"][t] = s_out_act * np.where(
-                    s_out_pot == 0.0, 0.0, q_uf_pot / s_out_pot
-                )
-                gb["qif"][t] = s_out_act * np.where(
-                    s_out_pot == 0.0, 0.0, q_if_pot / s_out_pot
-                )
-
-            # [Surface Water Balance] ---- Apply water balance.
-            gb["s"][t + 1] = UpscaledModel.compute_next_s(
-                s=gb["s"][t],
-                ps=gb["ps"][t],
-                qof=gb["qof"][t],
-                quf=gb["quf"][t],
-                qif=gb["qif"][t],
-            )
-
-            #
-            # [Soil] ---------- Solve soil water balance ---------- #
-            #
-
-            # [Soil Vadose Zone]
-
-            # [Soil Vadose Zone] Get Recharge Fraction
-            gb["qvff"][t] = UpscaledModel.compute_qvf_f(d=gb["d"][t], v=gb["v"][t])
-
-            # [Soil Vadose Zone] Compute Potential Recharge
-            q_vf_pot = UpscaledModel.compute_qvf_pot(qvf_f=gb["qvff"][t], kv=k_v, dt=dt)
-
-            # [Soil Vadose Zone] Compute Maximal Recharge
-            q_vf_cap = UpscaledModel.compute_qvf_cap(v=gb["v"][t], dt=dt)
-
-            # [Soil Vadose Zone] Compute Actual Recharge
-            gb["qvf"][t] = UpscaledModel.compute_qvf(qvf_pot=q_vf_pot, qvf_cap=q_vf_cap)
-
-            # [Vadose Water Balance] ---- Apply water balance
-            gb["v"][t + 1] = UpscaledModel.compute_next_v(
-                v=gb["v"][t], qif=gb["qif"][t], qvf=gb["qvf"][t]
-            )
-
-            # [Soil Phreatic Zone]
-
-            # [Soil Phreatic Zone] Compute Base flow (blue water -- discount on green water)
-            # gb["qgf"][t] = (np.max([gb["g"][t] - g_et_cap, 0.0])) * dt / g_k
-            gb["qgf"][t] = UpscaledModel.compute_qgf(
-                g=gb["g"][t], get_cap=g_e_cap, gk=g_k, dt=dt
-            )
+        # [Upscaling] cell weights are fixed
+        w = self.cells_weights
+        w_sum = np.sum(w)
+
+        # [Output] map snapshots writer
+        writer = self._get_store_writer()
+
+        # [Output] zonal statistics
+        reducer = self._get_zonal_reducer()
+
+        # [Upscaling] only variables kept in outputs
+        ls_upscaled = [v for v in UPSCALED_VARS if v in gb]
+
+        with self._profile("loop"):
+            # ---------------- START TIME LOOP ---------------- #
+            # loop over LULC epochs
+            for t0, t1, lulc_map_name in self.get_lulc_epochs():
+                #
+                # [LULC] ---------- variable parameters ---------- #
+                #
+                lulc_params = self._get_lulc_params(lulc_map_name, g_cap)
+                if reducer is not None and "lulc" in self.zonal_layers:
+                    reducer.set_layer(
+                        name="lulc",
+                        zones=self.get_lulc_cells(lulc_map_name),
+                        zone_ids=self.data_lulc_table[self.field_id].values,
+                    )
 
-            # [Testing feature]
-            if self.shutdown_qbf:
-                gb["qgf"][t] = 0.0 * gb["qgf"][t]
+                # loop over steps of epoch (Euler Method)
+                for t in range(t0, min(t1, self.n_steps - 1)):
+                    # [Local] forcing is shared by all cells
+                    lc["p"] = gb["p"][t : t + 2]
+                    lc["e_pot"] = gb["e_pot"][t : t + 2]
+
+                    # [Local] flows at row 0 and levels at row 1
+                    self._solve_step(
+                        gb=lc,
+                        t=0,
+                        dt=dt,
+                        g_cap=g_cap,
+                        k_v=k_v,
+                        g_k=g_k,
+                        g_e_cap=g_e_cap,
+                        **lulc_params,
+                    )
 
-            # [Phreatic Water Balance] ---- Apply water balance
-            gb["g"][t + 1] = UpscaledModel.compute_next_g(
-                g=gb["g"][t], qvf=gb["qvf"][t], qgf=gb["qgf"][t]
+                    # [Upscaling] global series are the mean of active cells
+                    for v in ls_upscaled:
+                        gb[v][t] = np.sum(lc[v][0] * w) / w_sum
+
+                    # [Output] map snapshots
+                    if writer is not None and t % self.store_interval == 0:
+                        writer.append(
+                            step=t,
+                            datetime=gb[self.field_datetime][t],
+                            values={v: lc[v][0] for v in self.store_vars},
+                        )
+
+                    # [Output] zonal statistics
+                    if reducer is not None:
+                        reducer.append(
+                            step=t, values={v: lc[v][0] for v in self.zonal_vars}
+                        )
+
+                    # [Local] move levels to next step
+                    for v in ls_levels:
+                        lc[v][0] = lc[v][1]
+
+                # ---------------- END TIME LOOP ---------------- #
+
+        if writer is not None:
+            writer.close()
+        if reducer is not None:
+            self.data_zonal = reducer.get_table()
+
+        # [Upscaling] last levels
+        for v in ls_levels:
+            gb[v][self.n_steps - 1] = geo.upscale(
+                array=lc[v][0], weights=self.cells_weights, mode="mean"
             )
 
-            # ---------------- END TIME LOOP ---------------- #
-
         #
         # [Total Flows] ---------- compute total flows ---------- #
         #
 
         # [Total Flows] Total E
-        gb["e"] = UpscaledModel.compute_e(ec=gb["ec"], es=gb["es"], eg=gb["eg"])
+        if "e" in gb:
+            gb["e"] = UpscaledModel.compute_e(ec=gb["ec"], es=gb["es"], eg=gb["eg"])
 
         # [Total Flows] Compute Hillslope flow
-        gb["qhf"] = UpscaledModel.compute_qhf(
-            qof=gb["qof"], quf=gb["quf"], qgf=gb["qgf"]
-        )
+        if "qhf" in gb:
+            gb["qhf"] = UpscaledModel.compute_qhf(
+                qof=gb["qof"], quf=gb["quf"], qgf=gb["qgf"]
+            )
 
         #
         # [Streamflow] ---------- Solve flow routing to basin gauge station ---------- #
         #
+        self._solve_routing(gb=gb)
 
-        # global basin is considered the first
-        basin = self.basins_ls[0]
-
-        # [Baseflow] Compute river base flow
-        vct_inflow = gb["qgf"]
-        gb["qbf"] = UpscaledModel.propagate_inflow(
-            inflow=vct_inflow,
-            unit_hydrograph=self.data_guh[basin].values,
-        )
-
-        # [Fast Streamflow] Compute Streamflow
-        # todo [feature] evaluate to split into more components
-        vct_inflow = gb["quf"] + gb["qof"]
-        q_fast = UpscaledModel.propagate_inflow(
-            inflow=vct_inflow, unit_hydrograph=self.data_guh[basin].values
-        )
-        gb["q"] = gb["qbf"] + q_fast
-
-        # set data
-        self.data = pd.DataFrame(gb)
+        # set data (arrays are not copied)
+        with self._profile("output"):
+            self.data = pd.DataFrame(gb, copy=False)
 
         return None
 
@@ -978,6 +1183,12 @@ class DownscaledModel(UpscaledModel):
         self.data_lulc_table.to_csv(
             fpath, sep=self.file_csv_sep, encoding=self.file_encoding, index=False
         )
+        # export zonal statistics
+        if self.data_zonal is not None:
+            fpath = Path(folder + "/" + filename + "_zonal.csv")
+            self.data_zonal.to_csv(
+                fpath, sep=self.file_csv_sep, encoding=self.file_encoding, index=False
+            )
         # ... continues in downstream objects ... #
 
     @staticmethod
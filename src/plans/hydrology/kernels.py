@@ -0,0 +1,461 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Fused numerical kernels for the hydrology models.
+
+Each kernel runs the full time loop of a model solver over plain contiguous
+:class:`numpy.ndarray` buffers, so it can be compiled to machine code when
+`numba <https://numba.pydata.org>`_ is available.
+
+Features
+--------
+
+* Pure-Python reference kernels that mirror the ``Model.solve()`` loops.
+* Optional just-in-time compilation with ``numba`` (no hard dependency).
+* Kernel registry with in-process cache of compiled kernels.
+
+Overview
+--------
+
+Kernels write results *in place* into the simulation arrays of ``sdata``, so
+the solvers keep their post-processing (total flows, routing and output
+tables) unchanged. Every arithmetic operation is kept in the same order as
+the ``compute_*`` methods of the models, therefore the compiled and the
+reference solutions match the interpreted loop bit-for-bit.
+
+.. note::
+
+    When ``numba`` is not installed, :func:`get_kernel` returns the
+    pure-Python kernel. It is still faster than the step-by-step loop because
+    it avoids method dispatch and dict lookups, but it is not compiled.
+
+Examples
+--------
+
+.. code-block:: python
+
+    from plans.hydrology import kernels
+
+    # get the (compiled, if possible) kernel for the upscaled model
+    kernel = kernels.get_kernel("upscaled")
+    print(kernels.has_numba())
+
+    # the linear storage models share one kernel
+    kernel = kernels.get_kernel("storage")
+
+"""
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+
+# ... {develop}
+
+
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+# CONSTANTS -- Module-level
+# =======================================================================
+
+# Order of the simulation arrays expected by ``upscaled_kernel()``
+UPSCALED_VARS = (
+    "c",
+    "s",
+    "v",
+    "g",
+    "d",
+    "dv",
+    "ec",
+    "eg",
+    "egf",
+    "es",
+    "ptff",
+    "ptf",
+    "psf",
+    "ps",
+    "pc",
+    "qoff",
+    "qof",
+    "quff",
+    "quf",
+    "qif",
+    "qvff",
+    "qvf",
+    "qgf",
+)
+
+# Order of the parameters expected by ``upscaled_kernel()``
+UPSCALED_PARAMS = (
+    "ck",
+    "ca",
+    "sk",
+    "sofc",
+    "sufa",
+    "sufc",
+    "gcap",
+    "kv",
+    "gk",
+    "ecap",
+    "dea",
+)
+
+# Order of the simulation arrays expected by ``storage_kernel()``
+STORAGE_VARS = ("p", "e_pot", "s", "q", "e", "qs", "qb", "qsf", "ss")
+
+# Models solved by ``storage_kernel()`` (the position is the kernel mode)
+STORAGE_MODELS = ("LinearStorage", "LSRR", "LSRRE", "LSFAS")
+
+# cache of compiled kernels
+_COMPILED = {}
+
+
+# FUNCTIONS
+# ***********************************************************************
+
+# FUNCTIONS -- Project-level
+# =======================================================================
+
+
+def has_numba():
+    """
+    Check if ``numba`` is available for compiling kernels.
+
+    :return: True if ``numba`` can be imported
+    :rtype: bool
+    """
+    try:
+        import numba
+    except ImportError:
+        return False
+    return True
+
+
+def jit(func):
+    """
+    Compile a kernel with ``numba`` if available.
+
+    Falls back to the pure-Python function otherwise.
+
+    .. note::
+
+        Kernels are compiled with ``error_model="numpy"`` so divisions by
+        zero return ``inf`` or ``nan`` instead of raising, as in NumPy.
+
+    :param func: pure-Python kernel
+    :type func: callable
+    :return: compiled kernel or the same function
+    :rtype: callable
+    """
+    if not has_numba():
+        return func
+    import numba
+
+    return numba.njit(error_model="numpy")(func)
+
+
+def get_kernel(name, compiled=True):
+    """
+    Get a kernel from the registry.
+
+    :param name: kernel name (see ``KERNELS``)
+    :type name: str
+    :param compiled: option to get the compiled kernel (if available)
+    :type compiled: bool
+    :return: kernel function
+    :rtype: callable
+    """
+    if name not in KERNELS:
+        raise ValueError(
+            f"Kernel '{name}' not found. Use one of {list(KERNELS.keys())}"
+        )
+    func = KERNELS[name]
+    if not compiled:
+        return func
+    if name not in _COMPILED:
+        _COMPILED[name] = jit(func)
+    return _COMPILED[name]
+
+
+# FUNCTIONS -- Module-level
+# =======================================================================
+
+
+def upscaled_kernel(
+    p,
+    e_pot,
+    c,
+    s,
+    v,
+    g,
+    d,
+    dv,
+    ec,
+    eg,
+    egf,
+    es,
+    ptff,
+    ptf,
+    psf,
+    ps,
+    pc,
+    qoff,
+    qof,
+    quff,
+    quf,
+    qif,
+    qvff,
+    qvf,
+    qgf,
+    c_k,
+    c_a,
+    s_k,
+    s_of_c,
+    s_uf_a,
+    s_uf_c,
+    g_cap,
+    k_v,
+    g_k,
+    g_e_cap,
+    d_e_a,
+    s_uf_shutdown,
+    s_of_a_eff,
+    dt,
+    n_steps,
+    shutdown_qif,
+    shutdown_qbf,
+):
+    """
+    Fused canopy, surface and soil time loop of ``UpscaledModel.solve()``.
+
+    Arrays are updated in place. Routing and total flows are not included.
+
+    .. note::
+
+        Each line mirrors one ``UpscaledModel.compute_*()`` method, keeping
+        the same operation order so results are identical.
+
+    :return: None
+    :rtype: None
+    """
+    for t in range(n_steps - 1):
+        # [Deficit] ---------- update deficits ---------- #
+        d[t] = g_cap - g[t]
+        dv[t] = d[t] - v[t]
+
+        # [Evaporation] [Canopy]
+        e_c_pot = e_pot[t]
+        e_c_cap = c[t] * dt
+        ec[t] = e_c_cap if e_c_pot > e_c_cap else e_c_pot
+
+        # [Evaporation] [Soil]
+        e_t_pot = e_pot[t] - ec[t]
+        egf[t] = 1 - (dv[t] / (dv[t] + d_e_a))
+        g_et = g_e_cap if g[t] > g_e_cap else g[t]
+        e_t_cap = egf[t] * g_et * dt
+        eg[t] = e_t_cap if e_t_pot > e_t_cap else e_t_pot
+
+        # [Evaporation] [Surface]
+        e_s_pot = e_pot[t] - ec[t] - eg[t]
+        e_s_cap = s[t] * dt
+        es[t] = e_s_cap if e_s_pot > e_s_cap else e_s_pot
+
+        # [Evaporation] [Balance] ---- a priori discounts
+        c[t] = c[t] - ec[t]
+        g[t] = g[t] - eg[t]
+        s[t] = s[t] - es[t]
+
+        # [Canopy] [Throughfall]
+        if c_a <= 0.0:
+            ptff[t] = 1.0
+        else:
+            tf_f = c[t] / c_a
+            ptff[t] = 1.0 if tf_f > 1.0 else tf_f
+        c_ss = c[t] - c_a
+        c_ss_cap = (0.0 if c_ss < 0 else c_ss) * dt
+        p_tf_cap = p[t] + c_ss_cap
+        ptf[t] = ptff[t] * p_tf_cap
+
+        # [Canopy] [Stemflow]
+        c_sf_pot = c_a if c[t] > c_a else c[t]
+        psf[t] = c_sf_pot * dt / c_k
+
+        # [Canopy] [Aggflows]
+        ps[t] = psf[t] + ptf[t]
+        pc[t] = p[t] * (1 - ptff[t])
+
+        # [Canopy] [Water Balance]
+        c[t + 1] = c[t] + pc[t] - psf[t]
+
+        # [Surface] [Overland]
+        sof_ss = s[t] - s_of_a_eff
+        sof_ss_cap = 0.0 if sof_ss < 0.0 else sof_ss
+        sof_den = sof_ss_cap + s_of_c
+        qoff[t] = 0.0 if sof_den == 0.0 else sof_ss_cap / sof_den
+        q_of_cap = (sof_ss_cap * dt) + ps[t]
+        q_of_pot = qoff[t] * q_of_cap
+
+        # [Surface] [Underland]
+        suf_ss = s[t] - s_uf_a
+        suf_ss_cap = (0.0 if suf_ss < 0.0 else suf_ss) * s_uf_shutdown
+        suf_den = suf_ss_cap + s_uf_c
+        quff[t] = 0.0 if suf_den == 0 else suf_ss_cap / suf_den
+        q_uf_cap = suf_ss_cap * dt
+        q_uf_pot = quff[t] * q_uf_cap
+
+        # [Surface] [Infiltration]
+        q_if_pot_down = (d[t] - v[t]) * dt
+        q_if_pot_up = s[t] * dt / s_k
+        q_if_pot = q_if_pot_down if q_if_pot_up > q_if_pot_down else q_if_pot_up
+        if shutdown_qif:
+            q_if_pot = 0.0 * q_if_pot
+
+        # [Surface] ---- Actual flows
+        s_out_pot = q_of_pot + q_uf_pot + q_if_pot
+        s_out_cap = s[t]
+        s_out_act = s_out_pot if s_out_cap > s_out_pot else s_out_cap
+        if s_out_pot == 0.0:
+            qof[t] = s_out_act * 0.0
+            quf[t] = s_out_act * 0.0
+            qif[t] = s_out_act * 0.0
+        else:
+            qof[t] = s_out_act * (q_of_pot / s_out_pot)
+            quf[t] = s_out_act * (q_uf_pot / s_out_pot)
+            qif[t] = s_out_act * (q_if_pot / s_out_pot)
+
+        # [Surface Water Balance]
+        s[t + 1] = s[t] + ps[t] - qof[t] - quf[t] - qif[t]
+
+        # [Soil Vadose Zone]
+        qvff[t] = 1.0 if d[t] <= 0.0 else v[t] / d[t]
+        q_vf_pot = qvff[t] * k_v * dt
+        q_vf_cap = v[t] * dt
+        qvf[t] = q_vf_cap if q_vf_pot > q_vf_cap else q_vf_pot
+
+        # [Vadose Water Balance]
+        v[t + 1] = v[t] + qif[t] - qvf[t]
+
+        # [Soil Phreatic Zone]
+        g_ss = g[t] - g_e_cap
+        g_ss = g_ss if g_ss > 0.0 else 0.0
+        qgf[t] = g_ss * dt / g_k
+        if shutdown_qbf:
+            qgf[t] = 0.0 * qgf[t]
+
+        # [Phreatic Water Balance]
+        g[t + 1] = g[t] + qvf[t] - qgf[t]
+
+    return None
+
+
+def storage_kernel(
+    p,
+    e_pot,
+    s,
+    q,
+    e,
+    qs,
+    qb,
+    qsf,
+    ss,
+    k,
+    q_max,
+    s_a,
+    s_c,
+    dt,
+    n_steps,
+    mode,
+    shutdown_qb,
+):
+    """
+    Fused time loop of the linear storage models (``LinearStorage``, ``LSRR``,
+    ``LSRRE`` and ``LSFAS``).
+
+    Arrays are updated in place. Arrays not used by a model may be empty.
+
+    .. note::
+
+        ``mode`` is the position of the model in ``STORAGE_MODELS``. Minimum
+        and maximum operations are written so that ``nan`` propagates as in
+        ``np.min()`` and ``np.max()``, so results are identical to the loops
+        of the ``solve()`` methods.
+
+    :return: None
+    :rtype: None
+    """
+    for t in range(n_steps - 1):
+        # [Decay] Qt = dt * St / k
+        q_pot = s[t] * dt / k
+
+        # [LinearStorage] no inflow
+        if mode == 0:
+            q[t] = q_pot
+            s[t + 1] = s[t] - q[t]
+            continue
+
+        # [LSRR] [LSRRE] flow is limited by q_max
+        if mode < 3 and q_max < q_pot:
+            q_pot = q_max
+
+        # [LSRR] S(t + 1) = S(t) + P(t) - Q(t)
+        if mode == 1:
+            q[t] = q_pot
+            s[t + 1] = s[t] + p[t] - q[t]
+            continue
+
+        # [Outflows] potential outflow
+        qs_pot = 0.0
+        if mode == 2:
+            o_pot = q_pot + e_pot[t]
+        else:
+            # [LSFAS] spill storage and runoff fraction
+            ss_cap = s[t] - s_a
+            if ss_cap < 0.0:
+                ss_cap = 0.0
+            ss[t] = ss_cap
+            qsf[t] = 0.0 if (ss_cap + s_c) == 0.0 else ss_cap / (ss_cap + s_c)
+            qs_pot = qsf[t] * ((ss_cap * dt) + p[t])
+            if shutdown_qb:
+                q_pot = 0.0
+            o_pot = qs_pot + q_pot + e_pot[t]
+
+        # [Outflows] actual outflow is limited by storage
+        o_max = s[t]
+        o_act = o_max if o_max < o_pot else o_pot
+
+        # [Outflows] allocate outflows and apply water balance
+        if mode == 2:
+            q[t] = o_act * (0.0 if o_pot == 0.0 else q_pot / o_pot)
+            e[t] = o_act * (0.0 if o_pot == 0.0 else e_pot[t] / o_pot)
+            s[t + 1] = s[t] + p[t] - q[t] - e[t]
+        else:
+            qs[t] = o_act * (0.0 if o_pot == 0.0 else qs_pot / o_pot)
+            qb[t] = o_act * (0.0 if o_pot == 0.0 else q_pot / o_pot)
+            e[t] = o_act * (0.0 if o_pot == 0.0 else e_pot[t] / o_pot)
+            q[t] = qs[t] + qb[t]
+            s[t + 1] = s[t] + p[t] - qs[t] - qb[t] - e[t]
+
+    return None
+
+
+# ... {develop}
+
+
+# CONSTANTS -- Registry
+# =======================================================================
+KERNELS = {
+    "upscaled": upscaled_kernel,
+    "storage": storage_kernel,
+}
@@ -0,0 +1,372 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Topology-ordered runs of nested sub-basin models in a process pool.
+
+Each sub-basin (the incremental area between gauges) has its own upscaled
+model. Upstream and downstream links come from the basins topology table
+(see :meth:`plans.datasets.Basins.get_upstream_ids`), so the outlet discharge
+of upstream basins is added to downstream basins in dependency order.
+
+Features
+--------
+
+* Dependency levels (headwaters first) from the basins topology table.
+* Local models solved in parallel with :class:`concurrent.futures.ProcessPoolExecutor`.
+* Upstream discharge fed to downstream basins, with an optional channel travel time.
+* Tidy summary table (one row per basin).
+
+Overview
+--------
+
+Local runoff of a sub-basin does not depend on upstream inflow, so all
+local models are submitted to the pool at once. Outlet discharges are then
+accumulated level by level as results arrive, so the wall time is bounded
+by the DAG depth, not by the number of basins.
+
+Flows are water depths over basin areas, so outlet discharge at a basin
+is the area-weighted sum of the local flow and the upstream outlet flows:
+
+.. math::
+
+    Q_{b}(t) = \\frac{q_{b}(t) \\cdot A_{b} + \\sum_{u} Q_{u}(t - \\tau_{u}) \\cdot A^{*}_{u}}{A^{*}_{b}}
+
+where :math:`A^{*}` is the total drainage area and :math:`\\tau_{u}` is the
+travel time from the upstream outlet (path length over the ``kq`` celerity of
+the downstream basin).
+
+Examples
+--------
+
+.. code-block:: python
+
+    from plans.hydrology.nested import NestedRunner
+
+    # models keyed by basin Id (loaded with ``load_data()``)
+    runner = NestedRunner(models={1: m1, 2: m2, 3: m3}, topology=df_basins)
+    df_summary = runner.run(n_workers=3)
+    df_outlet = runner.results[3]
+
+"""
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+import os
+import copy
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.datasets import Basins
+
+# ... {develop}
+
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+# CONSTANTS -- Project-level
+# =======================================================================
+
+# outlet flows accumulated downstream
+NESTED_OUTPUTS = ("q", "qbf")
+
+# ... {develop}
+
+
+# FUNCTIONS
+# ***********************************************************************
+
+# FUNCTIONS -- Project-level
+# =======================================================================
+
+
+def get_topology_levels(topology_df, ids=None):
+    """
+    Get the dependency levels of basins, from headwaters to outlets.
+
+    Basins in the same level do not depend on each other.
+
+    :param topology_df: dataframe with topology. Expected to have ``Id`` and ``Downstream_Id`` columns
+    :type topology_df: :class:`pandas.DataFrame`
+    :param ids: [optional] basin ids to order. Default is all ids of the topology
+    :type ids: list
+    :return: list of levels (lists of basin ids) and dict of direct upstream ids by basin
+    :rtype: tuple
+    """
+    if ids is None:
+        ids = list(topology_df["Id"].values)
+    dc_downstream = dict(zip(topology_df["Id"].values, topology_df["Downstream_Id"]))
+
+    # direct upstream basins (DAG edges)
+    dc_upstream = {}
+    dc_n_upstream = {}
+    for b in ids:
+        ls_upstream = Basins.get_upstream_ids(basin_id=b, topology_df=topology_df)
+        dc_n_upstream[b] = len(ls_upstream)
+        dc_upstream[b] = [u for u in ls_upstream if dc_downstream[u] == b]
+        for u in dc_upstream[b]:
+            if u not in ids:
+                raise ValueError(f"Basin '{u}' upstream of basin '{b}' not found")
+
+    # basins have more upstream basins than any of their upstream basins
+    dc_level = {}
+    for b in sorted(ids, key=lambda i: dc_n_upstream[i]):
+        dc_level[b] = 1 + max([dc_level[u] for u in dc_upstream[b]], default=-1)
+    n_levels = max(dc_level.values()) + 1
+    ls_levels = [[b for b in ids if dc_level[b] == n] for n in range(n_levels)]
+    return ls_levels, dc_upstream
+
+
+def get_lagged_flow(flow, lag):
+    """
+    Translate a flow series by a travel time, split between the two nearest steps.
+
+    .. note::
+
+        Flow before the first step is taken as zero and flow translated
+        beyond the last step is dropped.
+
+    :param flow: 1d array of flow
+    :type flow: :class:`numpy.ndarray`
+    :param lag: travel time in number of steps (may be fractional)
+    :type lag: float
+    :return: lagged flow
+    :rtype: :class:`numpy.ndarray`
+    """
+    n = int(np.floor(lag))
+    w = lag - n
+    vct_flow = np.zeros(len(flow) + n + 1)
+    vct_flow[n : n + len(flow)] = (1 - w) * flow
+    vct_flow[n + 1 :] = vct_flow[n + 1 :] + w * flow
+    return vct_flow[: len(flow)]
+
+
+# FUNCTIONS -- Module-level
+# =======================================================================
+
+
+def _run_basin(model):
+    """
+    Solve the local model of one basin.
+
+    :param model: local model (loaded)
+    :type model: :class:`plans.hydrology.upscaled.UpscaledModel`
+    :return: local outlet series
+    :rtype: dict
+    """
+    model.setup()
+    model.solve()
+    dc_out = {"datetime": model.sdata[model.field_datetime]}
+    for v in NESTED_OUTPUTS:
+        dc_out[v] = model.sdata[v]
+    return dc_out
+
+
+# CLASSES
+# ***********************************************************************
+
+# CLASSES -- Project-level
+# =======================================================================
+
+
+class NestedRunner:
+    """
+    Runner of nested sub-basin models for :class:`plans.hydrology.upscaled.UpscaledModel`.
+    """
+
+    def __init__(
+        self,
+        models,
+        topology,
+        field_area="UpstreamArea",
+        field_path=None,
+        folder=None,
+        name="myNested",
+    ):
+        """
+        Deploy the nested runner.
+
+        :param models: local models of sub-basins keyed by basin id (loaded with ``load_data()``)
+        :type models: dict
+        :param topology: basins topology table with ``Id``, ``Downstream_Id`` and area fields
+        :type topology: :class:`pandas.DataFrame`
+        :param field_area: field of the basin area (cells of the basin id, as in ``qutils.get_basins_areas()``)
+        :type field_area: str
+        :param field_path: [optional] field of the channel length (m) from the basin outlet to the downstream outlet. Default is no travel time
+        :type field_path: str
+        :param folder: path to folder for output tables. If None, nothing is saved
+        :type folder: str
+        :param name: name of run (used as file prefix)
+        :type name: str
+        """
+        self.models = models
+        self.topology = topology.set_index("Id", drop=False)
+        self.field_area = field_area
+        self.field_path = field_path
+        self.folder = folder
+        self.name = name
+
+        # dependency levels
+        self.levels, self.upstream = get_topology_levels(
+            topology_df=topology, ids=list(models.keys())
+        )
+
+        # outputs
+        self.results = None
+        self.summary = None
+        self.timing = None
+
+    def _get_template(self, basin_id):
+        """
+        Get a light copy of a basin model to send to workers (no simulation data).
+
+        :param basin_id: basin id
+        :type basin_id: int
+        :return: model copy
+        :rtype: :class:`plans.hydrology.upscaled.UpscaledModel`
+        """
+        template = copy.copy(self.models[basin_id])
+        template.params = copy.deepcopy(self.models[basin_id].params)
+        template.data = None
+        template.sdata = None
+        # only allocate what outlets need
+        template.outputs = list(NESTED_OUTPUTS)
+        return template
+
+    def get_lag(self, basin_id):
+        """
+        Get the travel time from a basin outlet to its downstream outlet.
+
+        :param basin_id: basin id
+        :type basin_id: int
+        :return: travel time in number of steps of the downstream model
+        :rtype: float
+        """
+        if self.field_path is None:
+            return 0.0
+        model = self.models[self.topology.loc[basin_id, "Downstream_Id"]]
+        path = self.topology.loc[basin_id, self.field_path]
+        t_travel = path / model.params["kq"]["value"]
+        return float(t_travel / model.params["dt"]["value"])
+
+    def _get_outlet(self, basin_id, dc_local, dc_results):
+        """
+        Get the outlet series of a basin from its local flows and upstream outlets.
+
+        :param basin_id: basin id
+        :type basin_id: int
+        :param dc_local: local series of the basin (see ``_run_basin()``)
+        :type dc_local: dict
+        :param dc_results: outlet tables of solved basins
+        :type dc_results: dict
+        :return: outlet table
+        :rtype: :class:`pandas.DataFrame`
+        """
+        area = self.topology.loc[basin_id, self.field_area]
+        area_total = area + sum(
+            dc_results[u].attrs["area_total"] for u in self.upstream[basin_id]
+        )
+        df = pd.DataFrame({"datetime": dc_local["datetime"]})
+        for v in NESTED_OUTPUTS:
+            vct_flow = dc_local[v] * area
+            for u in self.upstream[basin_id]:
+                df_up = dc_results[u]
+                if not np.array_equal(df_up["datetime"].values, df["datetime"].values):
+                    raise ValueError(
+                        f"Basin '{u}' must have the same steps as basin '{basin_id}'"
+                    )
+                vct_up = get_lagged_flow(df_up[v].values, lag=self.get_lag(u))
+                vct_flow = vct_flow + vct_up * df_up.attrs["area_total"]
+            df[f"{v}_local"] = dc_local[v]
+            df[v] = vct_flow / area_total
+        df.attrs["area_total"] = area_total
+        return df
+
+    def run(self, n_workers=None):
+        """
+        Run all basin models and accumulate outlet flows downstream.
+
+        :param n_workers: number of worker processes. Default is the number of CPUs
+        :type n_workers: int
+        :return: summary table with one row per basin
+        :rtype: :class:`pandas.DataFrame`
+        """
+        t0 = time.perf_counter()
+        ls_ids = [b for level in self.levels for b in level]
+        if n_workers is None:
+            n_workers = os.cpu_count()
+        n_workers = max(1, min(n_workers, len(ls_ids)))
+
+        dc_results = {}
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            # local models do not depend on upstream flows
+            dc_futures = {
+                b: executor.submit(_run_basin, self._get_template(b)) for b in ls_ids
+            }
+            # outlets follow the dependency order
+            for b in ls_ids:
+                dc_results[b] = self._get_outlet(
+                    basin_id=b,
+                    dc_local=dc_futures[b].result(),
+                    dc_results=dc_results,
+                )
+        self.results = dc_results
+
+        # ---------------- summary ---------------- #
+        dc_level = {b: n for n, level in enumerate(self.levels) for b in level}
+        ls_rows = []
+        for b in ls_ids:
+            df = dc_results[b]
+            dc_row = {
+                "Id": b,
+                "level": dc_level[b],
+                "n_upstream": len(self.upstream[b]),
+                "area": self.topology.loc[b, self.field_area],
+                "area_total": df.attrs["area_total"],
+            }
+            for v in NESTED_OUTPUTS:
+                dc_row[f"{v}_local"] = float(np.nansum(df[f"{v}_local"]))
+                dc_row[v] = float(np.nansum(df[v]))
+            ls_rows.append(dc_row)
+        self.summary = pd.DataFrame(ls_rows)
+        self.timing = {
+            "n_basins": len(ls_ids),
+            "n_levels": len(self.levels),
+            "wall_time": time.perf_counter() - t0,
+        }
+
+        if self.folder is not None:
+            fpath = Path(f"{self.folder}/{self.name}_summary.csv")
+            self.summary.to_csv(fpath, sep=";", index=False)
+            for b in ls_ids:
+                fpath = Path(f"{self.folder}/{self.name}_{b}.csv")
+                dc_results[b].to_csv(fpath, sep=";", index=False)
+        return self.summary
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    print("Hello world!")
+    # ... {develop}
@@ -0,0 +1,274 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Helpers for running hydrology models in process pools.
+
+Drivers that solve one model many times (calibration, sensitivity analysis,
+scenarios) send each worker a light copy of the model *once*. Climate forcing
+is placed in :mod:`multiprocessing.shared_memory` by the parent process and
+attached by the workers, so it is never pickled.
+
+Features
+--------
+
+* Light model templates without climate or simulation data.
+* Dataframe columns and arrays (e.g. raster maps) shared with workers through shared memory.
+* Worker models set up over the shared climate data.
+
+Examples
+--------
+
+.. code-block:: python
+
+    from concurrent.futures import ProcessPoolExecutor
+    from plans.hydrology import pool
+
+    _WORKER = {}
+
+    def _init_worker(model, ls_specs):
+        _WORKER["shm"] = pool.attach_model(model, ls_specs)
+        _WORKER["model"] = model
+
+    ls_shm, ls_specs = pool.share_frame(m.data_clim)
+    try:
+        with ProcessPoolExecutor(
+            initializer=_init_worker, initargs=(pool.get_template(m), ls_specs)
+        ) as executor:
+            ...
+    finally:
+        pool.release_frame(ls_shm)
+
+"""
+
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+import copy
+from multiprocessing import shared_memory
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+
+# FUNCTIONS
+# ***********************************************************************
+
+# FUNCTIONS -- Project-level
+# =======================================================================
+
+
+def get_template(model):
+    """
+    Get a light copy of a model to send to workers (no climate or simulation data).
+
+    .. note::
+
+        Parameters are copied, other attributes are shared with the model.
+        Both the climate data and its source copy (``data_clim_src``) are
+        dropped, so the forcing is never pickled into workers.
+
+    :param model: model holding parameters and climate data
+    :type model: :class:`plans.hydrology.core.Model`
+    :return: model copy
+    :rtype: :class:`plans.hydrology.core.Model`
+    """
+    template = copy.copy(model)
+    template.params = copy.deepcopy(model.params)
+    template.data_clim = None
+    template.data_clim_src = None
+    template.data = None
+    template.sdata = None
+    return template
+
+
+def share_array(vct):
+    """
+    Copy an array to a new shared memory block.
+
+    :param vct: array
+    :type vct: :class:`numpy.ndarray`
+    :return: shared memory block and array spec (block name, shape and dtype)
+    :rtype: tuple
+    """
+    vct = np.asarray(vct)
+    shm = shared_memory.SharedMemory(create=True, size=max(vct.nbytes, 1))
+    np.ndarray(vct.shape, dtype=vct.dtype, buffer=shm.buf)[:] = vct[:]
+    return shm, (shm.name, vct.shape, vct.dtype.str)
+
+
+def attach_array(spec):
+    """
+    Get an array over an existing shared memory block.
+
+    :param spec: array spec from ``share_array()``
+    :type spec: tuple
+    :return: shared memory block and array
+    :rtype: tuple
+    """
+    s_name, shape, s_dtype = spec
+    shm = shared_memory.SharedMemory(name=s_name)
+    return shm, np.ndarray(shape, dtype=np.dtype(s_dtype), buffer=shm.buf)
+
+
+def share_arrays(dc_arrays):
+    """
+    Copy named arrays (e.g. raster maps) to shared memory blocks.
+
+    .. note::
+
+        Masks of masked arrays are shared in their own blocks. Blocks must be
+        released by the parent process (see ``release_frame()``).
+
+    :param dc_arrays: dict of arrays (or masked arrays) keyed by name
+    :type dc_arrays: dict
+    :return: list of shared memory blocks and dict of array specs
+    :rtype: tuple
+    """
+    ls_shm = []
+    dc_specs = {}
+    for k, vct in dc_arrays.items():
+        shm, spec = share_array(np.ma.getdata(vct))
+        ls_shm.append(shm)
+        spec_mask = None
+        fill_value = None
+        if np.ma.isMaskedArray(vct):
+            fill_value = vct.fill_value
+            if vct.mask is not np.ma.nomask:
+                shm_mask, spec_mask = share_array(vct.mask)
+                ls_shm.append(shm_mask)
+        dc_specs[k] = (spec, spec_mask, fill_value, np.ma.isMaskedArray(vct))
+    return ls_shm, dc_specs
+
+
+def attach_arrays(dc_specs):
+    """
+    Rebuild named arrays from shared memory blocks.
+
+    :param dc_specs: dict of array specs from ``share_arrays()``
+    :type dc_specs: dict
+    :return: list of shared memory blocks and dict of arrays
+    :rtype: tuple
+    """
+    ls_shm = []
+    dc_arrays = {}
+    for k, (spec, spec_mask, fill_value, b_masked) in dc_specs.items():
+        shm, vct = attach_array(spec)
+        ls_shm.append(shm)
+        if b_masked:
+            mask = np.ma.nomask
+            if spec_mask is not None:
+                shm_mask, mask = attach_array(spec_mask)
+                ls_shm.append(shm_mask)
+            vct = np.ma.MaskedArray(vct, mask=mask, fill_value=fill_value, copy=False)
+        dc_arrays[k] = vct
+    return ls_shm, dc_arrays
+
+
+def share_frame(df):
+    """
+    Copy the columns of a dataframe to shared memory blocks.
+
+    .. note::
+
+        Datetime columns are shared as ``int64`` nanoseconds. Other columns
+        (e.g. text) are kept in the specs and sent to workers as they are.
+        Blocks must be released by the parent process (see ``release_frame()``).
+
+    :param df: dataframe
+    :type df: :class:`pandas.DataFrame`
+    :return: list of shared memory blocks and list of column specs
+    :rtype: tuple
+    """
+    ls_shm = []
+    ls_specs = []
+    for c in df.columns:
+        b_datetime = pd.api.types.is_datetime64_any_dtype(df[c])
+        if not (b_datetime or pd.api.types.is_numeric_dtype(df[c])):
+            ls_specs.append((c, None, df[c].values, None, False))
+            continue
+        if b_datetime:
+            vct = df[c].values.astype("datetime64[ns]").astype(np.int64)
+        else:
+            vct = np.asarray(df[c].values)
+        shm, spec = share_array(vct)
+        ls_shm.append(shm)
+        ls_specs.append((c,) + spec + (b_datetime,))
+    return ls_shm, ls_specs
+
+
+def attach_frame(ls_specs):
+    """
+    Rebuild a dataframe from shared memory blocks.
+
+    :param ls_specs: list of column specs from ``share_frame()``
+    :type ls_specs: list
+    :return: list of shared memory blocks and dataframe
+    :rtype: tuple
+    """
+    ls_shm = []
+    dc = {}
+    for c, s_name, shape, s_dtype, b_datetime in ls_specs:
+        if s_name is None:
+            # not shared (values are in the specs)
+            dc[c] = shape
+            continue
+        shm, vct = attach_array((s_name, shape, s_dtype))
+        if b_datetime:
+            vct = pd.to_datetime(vct)
+        dc[c] = vct
+        ls_shm.append(shm)
+    return ls_shm, pd.DataFrame(dc)
+
+
+def release_frame(ls_shm):
+    """
+    Close and free shared memory blocks of the parent process.
+
+    :param ls_shm: list of shared memory blocks from ``share_frame()`` or ``share_arrays()``
+    :type ls_shm: list
+    :return: None
+    :rtype: None
+    """
+    for shm in ls_shm:
+        shm.close()
+        shm.unlink()
+    return None
+
+
+def attach_model(model, ls_specs):
+    """
+    Set up a worker model (template) over the shared climate data.
+
+    :param model: model template (see ``get_template()``)
+    :type model: :class:`plans.hydrology.core.Model`
+    :param ls_specs: list of column specs of the climate data from ``share_frame()``
+    :type ls_specs: list
+    :return: list of shared memory blocks (keep references while the model is used)
+    :rtype: list
+    """
+    ls_shm, df_clim = attach_frame(ls_specs)
+    model.data_clim = df_clim
+    model.setup()
+    return ls_shm
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    print("Hello world!")
+    # ... {develop}
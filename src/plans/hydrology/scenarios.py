@@ -0,0 +1,318 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Climate and LULC scenario matrix runs of hydrology models in a process pool.
+
+Shared inputs (basin AOI, HTWI, soils and path-area histogram) are loaded
+once. Each combination of climate and LULC scenarios is solved in a worker
+process and reduced to a row of streamflow and water balance indicators.
+
+Features
+--------
+
+* Shared input maps placed once in shared memory (not copied per worker).
+* Bounded process pool with :class:`concurrent.futures.ProcessPoolExecutor`.
+* Selective outputs, so workers only allocate what indicators need.
+* Tidy summary table (one row per scenario).
+
+Overview
+--------
+
+Each worker receives a copy of the model *once*, without climate, LULC,
+simulation data or shared maps. The AOI, HTWI and soils maps are placed in
+:mod:`multiprocessing.shared_memory` by the parent process and attached by
+the workers (see :mod:`plans.hydrology.pool`), so they are not copied
+whatever the start method. Tasks only carry scenario names: workers load the scenario climate
+and LULC data with ``load_scenario()``, solve and return indicators.
+Scenarios are ordered by LULC first, so a worker tends to reuse the same
+LULC maps across climate scenarios.
+
+Examples
+--------
+
+.. code-block:: python
+
+    from plans.hydrology.scenarios import ScenarioRunner
+
+    # model is expected to hold shared inputs (see ``load_data()``)
+    runner = ScenarioRunner(
+        model=m,
+        scenarios_clim=["obs", "rcp45", "rcp85"],
+        scenarios_lulc=["obs", "reforest"],
+        folder="./out",
+    )
+    df_summary = runner.run(n_workers=4)
+
+"""
+
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+import copy
+import os
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology import pool
+
+# ... {develop}
+
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+# CONSTANTS -- Project-level
+# =======================================================================
+
+# outputs needed by ``get_indicators()`` (storage levels are always kept)
+SCENARIO_OUTPUTS = ("q", "qbf", "e", "qhf")
+
+# storage variables of the water balance
+SCENARIO_STORAGES = ("c", "s", "v", "g")
+
+# raster attributes of shared input maps (AOI, HTWI and soils)
+SCENARIO_RASTERS = ("data_basin", "data_tsi", "data_soils")
+
+# CONSTANTS -- Module-level
+# =======================================================================
+
+# worker state (one model per process)
+_WORKER = {}
+
+# ... {develop}
+
+
+# FUNCTIONS
+# ***********************************************************************
+
+# FUNCTIONS -- Project-level
+# =======================================================================
+
+
+def get_indicators(model):
+    """
+    Get streamflow and water balance indicators of a solved model.
+
+    .. note::
+
+        Totals are in water depth units (mm) over the simulation period.
+        Flow statistics are in water depth per time step.
+
+    :param model: solved model
+    :type model: :class:`plans.hydrology.upscaled.UpscaledModel`
+    :return: dictionary of indicators
+    :rtype: dict
+    """
+    gb = model.sdata
+    vct_q = gb["q"][np.isfinite(gb["q"])]
+    dc = {}
+    for v in ["p", "e", "qhf", "q", "qbf"]:
+        dc[v] = float(np.nansum(gb[v]))
+    # storage change
+    dc["ds"] = float(sum(gb[v][-1] - gb[v][0] for v in SCENARIO_STORAGES))
+    # streamflow
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dc["q_ratio"] = dc["q"] / dc["p"]
+        dc["bfi"] = dc["qbf"] / dc["q"]
+    dc["q_mean"] = float(np.mean(vct_q))
+    dc["q_p05"] = float(np.percentile(vct_q, 5))
+    dc["q_p95"] = float(np.percentile(vct_q, 95))
+    return dc
+
+
+def get_scenario_matrix(scenarios_clim, scenarios_lulc):
+    """
+    Get all combinations of climate and LULC scenarios.
+
+    :param scenarios_clim: list of climate scenarios
+    :type scenarios_clim: list
+    :param scenarios_lulc: list of LULC scenarios
+    :type scenarios_lulc: list
+    :return: list of ``(scenario_clim, scenario_lulc)`` tuples (LULC first)
+    :rtype: list
+    """
+    return [(c, l) for l in scenarios_lulc for c in scenarios_clim]
+
+
+# FUNCTIONS -- Module-level
+# =======================================================================
+
+
+def _init_worker(model, dc_specs):
+    """
+    Set the worker model over the shared input maps.
+
+    :param model: model template (without scenario data or map arrays)
+    :type model: :class:`plans.hydrology.downscaled.DownscaledModel`
+    :param dc_specs: dict of array specs of shared maps keyed by raster attribute (see ``pool.share_arrays()``)
+    :type dc_specs: dict
+    :return: None
+    :rtype: None
+    """
+    # keep references to shared blocks while the worker lives
+    _WORKER["shm"], dc_arrays = pool.attach_arrays(dc_specs)
+    for k in dc_arrays:
+        getattr(model, k).data = dc_arrays[k]
+    _WORKER["model"] = model
+    return None
+
+
+def _run_scenario(scenario):
+    """
+    Load, solve and summarize one scenario in the worker model.
+
+    :param scenario: tuple of climate and LULC scenario names
+    :type scenario: tuple
+    :return: scenario names and indicators
+    :rtype: dict
+    """
+    model = _WORKER["model"]
+    scenario_clim, scenario_lulc = scenario
+    model.load_scenario(scenario_clim=scenario_clim, scenario_lulc=scenario_lulc)
+    model.setup()
+    model.solve()
+    dc_out = {"clim": scenario_clim, "lulc": scenario_lulc}
+    dc_out.update(get_indicators(model))
+    # release simulation data
+    model.data = None
+    model.sdata = None
+    return dc_out
+
+
+# CLASSES
+# ***********************************************************************
+
+# CLASSES -- Project-level
+# =======================================================================
+
+
+class ScenarioRunner:
+    """
+    Runner of climate and LULC scenario matrices for :class:`plans.hydrology.downscaled.DownscaledModel`.
+    """
+
+    def __init__(
+        self,
+        model,
+        scenarios_clim,
+        scenarios_lulc,
+        folder=None,
+        name="myScenarios",
+    ):
+        """
+        Deploy the scenario runner.
+
+        :param model: model holding parameters and shared inputs (basin, topo, soils and PAH)
+        :type model: :class:`plans.hydrology.downscaled.DownscaledModel`
+        :param scenarios_clim: list of climate scenarios (folder names)
+        :type scenarios_clim: list
+        :param scenarios_lulc: list of LULC scenarios (folder names)
+        :type scenarios_lulc: list
+        :param folder: path to folder for the summary table. If None, nothing is saved
+        :type folder: str
+        :param name: name of run (used as file prefix)
+        :type name: str
+        """
+        self.model = model
+        self.scenarios_clim = list(scenarios_clim)
+        self.scenarios_lulc = list(scenarios_lulc)
+        self.folder = folder
+        self.name = name
+
+        # outputs
+        self.summary = None
+
+    def _get_template(self):
+        """
+        Get a light copy of the model to send to workers (no scenario or simulation data).
+
+        .. note::
+
+            Shared maps are copied without their arrays, which are attached
+            from shared memory by workers (see ``_get_shared_maps()``).
+
+        :return: model copy
+        :rtype: :class:`plans.hydrology.downscaled.DownscaledModel`
+        """
+        template = pool.get_template(self.model)
+        template.data_lulc = None
+        for k in self._get_shared_maps():
+            raster = copy.copy(getattr(self.model, k))
+            raster.data = None
+            setattr(template, k, raster)
+        # only allocate what indicators need
+        template.outputs = list(SCENARIO_OUTPUTS)
+        return template
+
+    def _get_shared_maps(self):
+        """
+        Get the arrays of input maps shared with workers.
+
+        :return: dict of map arrays keyed by raster attribute
+        :rtype: dict
+        """
+        dc = {}
+        for k in SCENARIO_RASTERS:
+            raster = getattr(self.model, k, None)
+            if raster is not None and raster.data is not None:
+                dc[k] = raster.data
+        return dc
+
+    def run(self, n_workers=None):
+        """
+        Run all combinations of climate and LULC scenarios.
+
+        :param n_workers: number of worker processes. Default is the number of CPUs
+        :type n_workers: int
+        :return: summary table with fields ``clim``, ``lulc`` and indicators
+        :rtype: :class:`pandas.DataFrame`
+        """
+        ls_scenarios = get_scenario_matrix(self.scenarios_clim, self.scenarios_lulc)
+        if n_workers is None:
+            n_workers = os.cpu_count()
+        n_workers = max(1, min(n_workers, len(ls_scenarios)))
+
+        # shared maps are released by the parent process
+        ls_shm, dc_specs = pool.share_arrays(self._get_shared_maps())
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_worker,
+                initargs=(self._get_template(), dc_specs),
+            ) as executor:
+                ls_results = list(executor.map(_run_scenario, ls_scenarios))
+        finally:
+            pool.release_frame(ls_shm)
+
+        self.summary = pd.DataFrame(ls_results)
+        if self.folder is not None:
+            fpath = Path(f"{self.folder}/{self.name}_summary.csv")
+            self.summary.to_csv(fpath, sep=";", index=False)
+        return self.summary
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    print("Hello world!")
+    # ... {develop}
@@ -0,0 +1,567 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Global sensitivity analysis (Morris and Sobol) of hydrology model parameters.
+
+Parameter samples are built from the ``Min``/``Max`` hypotheses table used by
+:class:`plans.hydrology.calibration.Calibration`. They are solved in batches
+in a process pool, and each batch is one vectorized ensemble run (see
+``UpscaledModel.solve_ensemble()``).
+
+Features
+--------
+
+* Morris trajectories (elementary effects ``mu``, ``mu_star`` and ``sigma``).
+* Saltelli samples over a Sobol sequence (first order and total indices).
+* Batched ensemble runs in a process pool, with shared climate forcing.
+* Convergence of indices with the sample size.
+* Wall time per 1000 model evaluations.
+
+Overview
+--------
+
+Workers receive a copy of the model *once* and attach the climate forcing
+from shared memory (as in calibration). Each task is a batch of samples,
+solved as ensemble members in one time loop with selective outputs. Samples
+are reduced to totals of the chosen outputs (``q``, ``e`` and ``qbf`` by
+default) and the indices are computed on these totals.
+
+Examples
+--------
+
+.. code-block:: python
+
+    from plans.hydrology.sensitivity import Sensitivity, get_hypotheses
+
+    # bounds at +/- 50% of current parameter values
+    df_hyp = get_hypotheses(model=m, spread=0.5)
+    sa = Sensitivity(model=m, df_hypotheses=df_hyp, method="morris", n=50)
+    sa.run(n_workers=4, batch_size=50)
+    print(sa.indices)
+    print(sa.timing["time_per_1000"])
+
+"""
+
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology import pool
+from plans.hydrology.upscaled import ENSEMBLE_PARAMS
+
+# ... {develop}
+
+
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+# CONSTANTS -- Project-level
+# =======================================================================
+
+# parameters that may vary by sample (``kq`` varies the GUH per sample)
+SENSITIVITY_PARAMS = ENSEMBLE_PARAMS + ("kq",)
+
+# sensitivity methods
+SENSITIVITY_METHODS = ("morris", "sobol")
+
+# CONSTANTS -- Module-level
+# =======================================================================
+
+# worker state (one model per process)
+_WORKER = {}
+
+# ... {develop}
+
+
+# FUNCTIONS
+# ***********************************************************************
+
+# FUNCTIONS -- Project-level
+# =======================================================================
+
+
+def get_hypotheses(model, params=None, spread=0.5):
+    """
+    Get a hypotheses table with bounds around the current model parameter values.
+
+    :param model: model with parameter values set
+    :type model: :class:`plans.hydrology.upscaled.UpscaledModel`
+    :param params: list of parameters. Default is all conceptual parameters in ``SENSITIVITY_PARAMS``
+    :type params: list
+    :param spread: relative half-width of bounds
+    :type spread: float
+    :return: hypotheses table with fields ``Name``, ``Min`` and ``Max``
+    :rtype: :class:`pandas.DataFrame`
+    """
+    if params is None:
+        params = [
+            p
+            for p in SENSITIVITY_PARAMS
+            if model.params[p]["kind"] == "conceptual" and model.params[p]["value"] != 0
+        ]
+    vct_value = np.array([model.params[p]["value"] for p in params], dtype=np.float64)
+    vct_delta = np.abs(vct_value) * spread
+    return pd.DataFrame(
+        {"Name": params, "Min": vct_value - vct_delta, "Max": vct_value + vct_delta}
+    )
+
+
+def sample_morris(df_hypotheses, n_trajectories, n_levels=4, seed=None):
+    """
+    Sample Morris trajectories (one factor changes at each step).
+
+    .. note::
+
+        Factors move over a grid of ``n_levels`` levels with the step
+        ``n_levels / (2 * (n_levels - 1))`` (in units of the factor range).
+        Each trajectory has one point per factor plus the base point.
+
+    :param df_hypotheses: hypotheses table with fields ``Name``, ``Min`` and ``Max``
+    :type df_hypotheses: :class:`pandas.DataFrame`
+    :param n_trajectories: number of trajectories
+    :type n_trajectories: int
+    :param n_levels: number of grid levels (even)
+    :type n_levels: int
+    :param seed: random seed
+    :type seed: int
+    :return: samples table with fields ``id``, ``trajectory``, ``step`` and one field per parameter
+    :rtype: :class:`pandas.DataFrame`
+    """
+    rng = np.random.default_rng(seed)
+    n_factors = len(df_hypotheses)
+    delta = n_levels / (2 * (n_levels - 1))
+    # unit values (trajectories x steps x factors)
+    grd_u = np.zeros((n_trajectories, n_factors + 1, n_factors))
+    for i in range(n_trajectories):
+        vct_u = rng.integers(0, n_levels, size=n_factors) / (n_levels - 1)
+        grd_u[i, 0] = vct_u
+        for j, f in enumerate(rng.permutation(n_factors)):
+            vct_u = vct_u.copy()
+            vct_u[f] = vct_u[f] + delta if vct_u[f] + delta <= 1.0 else vct_u[f] - delta
+            grd_u[i, j + 1] = vct_u
+    grd_u = grd_u.reshape(-1, n_factors)
+
+    n_steps = n_factors + 1
+    dc = {
+        "id": np.arange(len(grd_u)),
+        "trajectory": np.repeat(np.arange(n_trajectories), n_steps),
+        "step": np.tile(np.arange(n_steps), n_trajectories),
+    }
+    for i in range(n_factors):
+        n_min = df_hypotheses["Min"].values[i]
+        n_max = df_hypotheses["Max"].values[i]
+        dc[df_hypotheses["Name"].values[i]] = n_min + grd_u[:, i] * (n_max - n_min)
+    return pd.DataFrame(dc)
+
+
+def sample_saltelli(df_hypotheses, n_base, seed=None):
+    """
+    Sample Saltelli matrices ``A``, ``B`` and ``AB`` over a scrambled Sobol sequence.
+
+    .. note::
+
+        Samples are ordered by base row, so the first ``n`` base rows are a
+        smaller valid design (used for convergence). Use a power of 2 for
+        ``n_base`` to keep the balance of the Sobol sequence.
+
+    :param df_hypotheses: hypotheses table with fields ``Name``, ``Min`` and ``Max``
+    :type df_hypotheses: :class:`pandas.DataFrame`
+    :param n_base: number of base rows (model evaluations are ``n_base * (n_factors + 2)``)
+    :type n_base: int
+    :param seed: random seed
+    :type seed: int
+    :return: samples table with fields ``id``, ``row``, ``block`` and one field per parameter
+    :rtype: :class:`pandas.DataFrame`
+    """
+    from scipy.stats import qmc
+
+    ls_names = list(df_hypotheses["Name"].values)
+    n_factors = len(ls_names)
+    sampler = qmc.Sobol(d=2 * n_factors, scramble=True, seed=seed)
+    with warnings.catch_warnings():
+        # balance warning for sizes other than powers of 2
+        warnings.simplefilter("ignore", category=UserWarning)
+        grd = sampler.random(n_base)
+    grd_a = grd[:, :n_factors]
+    grd_b = grd[:, n_factors:]
+
+    # blocks: A, B and one AB per factor (A with the factor column from B)
+    ls_blocks = ["A", "B"] + ls_names
+    n_blocks = len(ls_blocks)
+    grd_u = np.zeros((n_base, n_blocks, n_factors))
+    grd_u[:, 0] = grd_a
+    grd_u[:, 1] = grd_b
+    for i in range(n_factors):
+        grd_u[:, i + 2] = grd_a
+        grd_u[:, i + 2, i] = grd_b[:, i]
+    grd_u = grd_u.reshape(-1, n_factors)
+
+    dc = {
+        "id": np.arange(len(grd_u)),
+        "row": np.repeat(np.arange(n_base), n_blocks),
+        "block": np.tile(ls_blocks, n_base),
+    }
+    for i in range(n_factors):
+        n_min = df_hypotheses["Min"].values[i]
+        n_max = df_hypotheses["Max"].values[i]
+        dc[ls_names[i]] = n_min + grd_u[:, i] * (n_max - n_min)
+    return pd.DataFrame(dc)
+
+
+def get_morris_effects(df_results, df_hypotheses, output, n_trajectories=None):
+    """
+    Get Morris elementary effects statistics of an output.
+
+    .. note::
+
+        Effects are scaled by the factor range, so ``mu_star`` is comparable
+        across factors (output change over the full range of the factor).
+
+    :param df_results: evaluated samples from ``sample_morris()``
+    :type df_results: :class:`pandas.DataFrame`
+    :param df_hypotheses: hypotheses table with fields ``Name``, ``Min`` and ``Max``
+    :type df_hypotheses: :class:`pandas.DataFrame`
+    :param output: output field
+    :type output: str
+    :param n_trajectories: [optional] use only the first trajectories
+    :type n_trajectories: int
+    :return: table with fields ``Name``, ``mu``, ``mu_star`` and ``sigma``
+    :rtype: :class:`pandas.DataFrame`
+    """
+    ls_names = list(df_hypotheses["Name"].values)
+    n_factors = len(ls_names)
+    df = df_results.sort_values(by=["trajectory", "step"])
+    if n_trajectories is not None:
+        df = df[df["trajectory"] < n_trajectories]
+    n = len(df) // (n_factors + 1)
+    vct_range = df_hypotheses["Max"].values - df_hypotheses["Min"].values
+    grd_u = (df[ls_names].values - df_hypotheses["Min"].values) / vct_range
+    grd_u = grd_u.reshape(n, n_factors + 1, n_factors)
+    grd_y = df[output].values.reshape(n, n_factors + 1)
+
+    # one factor changes at each step
+    grd_du = np.diff(grd_u, axis=1)
+    grd_f = np.argmax(np.abs(grd_du), axis=2)
+    grd_du = np.take_along_axis(grd_du, grd_f[..., None], axis=2)[..., 0]
+    grd_ee = np.diff(grd_y, axis=1) / grd_du
+
+    ls_mu, ls_mu_star, ls_sigma = [], [], []
+    for i in range(n_factors):
+        vct_ee = grd_ee[grd_f == i]
+        ls_mu.append(np.mean(vct_ee))
+        ls_mu_star.append(np.mean(np.abs(vct_ee)))
+        ls_sigma.append(np.std(vct_ee, ddof=1) if len(vct_ee) > 1 else np.nan)
+    return pd.DataFrame(
+        {"Name": ls_names, "mu": ls_mu, "mu_star": ls_mu_star, "sigma": ls_sigma}
+    )
+
+
+def get_sobol_indices(df_results, hypotheses, output, n_base=None):
+    """
+    Get first order and total Sobol indices of an output.
+
+    .. note::
+
+        First order indices use the Saltelli (2010) estimator and total
+        indices use the Jansen estimator.
+
+    :param df_results: evaluated samples from ``sample_saltelli()``
+    :type df_results: :class:`pandas.DataFrame`
+    :param hypotheses: list of parameter names
+    :type hypotheses: list
+    :param output: output field
+    :type output: str
+    :param n_base: [optional] use only the first base rows
+    :type n_base: int
+    :return: table with fields ``Name``, ``S1`` and ``ST``
+    :rtype: :class:`pandas.DataFrame`
+    """
+    df = df_results
+    if n_base is not None:
+        df = df[df["row"] < n_base]
+    df = df.pivot(index="row", columns="block", values=output)
+    vct_a = df["A"].values
+    vct_b = df["B"].values
+    n_var = np.var(np.concatenate([vct_a, vct_b]))
+    ls_s1, ls_st = [], []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for h in hypotheses:
+            vct_ab = df[h].values
+            ls_s1.append(np.mean(vct_b * (vct_ab - vct_a)) / n_var)
+            ls_st.append(0.5 * np.mean((vct_a - vct_ab) ** 2) / n_var)
+    return pd.DataFrame({"Name": list(hypotheses), "S1": ls_s1, "ST": ls_st})
+
+
+# FUNCTIONS -- Module-level
+# =======================================================================
+
+
+def _init_worker(model, ls_specs, hypotheses, outputs):
+    """
+    Set up the worker model with the shared climate data.
+
+    :param model: model template (see ``Sensitivity._get_template()``)
+    :type model: :class:`plans.hydrology.upscaled.UpscaledModel`
+    :param ls_specs: list of column specs from :func:`plans.hydrology.pool.share_frame`
+    :type ls_specs: list
+    :param hypotheses: list of parameter names
+    :type hypotheses: list
+    :param outputs: list of output variables
+    :type outputs: list
+    :return: None
+    :rtype: None
+    """
+    _WORKER["shm"] = pool.attach_model(model, ls_specs)  # keep references alive
+    _WORKER["model"] = model
+    _WORKER["hypotheses"] = hypotheses
+    _WORKER["outputs"] = outputs
+    return None
+
+
+def _run_batch(ls_samples):
+    """
+    Solve a batch of samples as ensemble members and get output totals.
+
+    :param ls_samples: list of samples (dicts with ``id`` and parameter values)
+    :type ls_samples: list
+    :return: table with field ``id`` and one field per output
+    :rtype: :class:`pandas.DataFrame`
+    """
+    model = _WORKER["model"]
+    outputs = _WORKER["outputs"]
+    df = pd.DataFrame(ls_samples)
+    df_params = df[_WORKER["hypotheses"]]
+    uh = None
+    if "kq" in df_params.columns:
+        # one GUH per member (cached by kq)
+        uh = np.stack([model.get_guh_array(kq=kq)[0] for kq in df_params["kq"].values])
+    dc = model.solve_ensemble(df_params, outputs=outputs, unit_hydrograph=uh)
+    dc_out = {"id": df["id"].values}
+    for v in outputs:
+        dc_out[v] = np.nansum(dc[v], axis=1)
+    return pd.DataFrame(dc_out)
+
+
+# CLASSES
+# ***********************************************************************
+
+# CLASSES -- Project-level
+# =======================================================================
+
+
+class Sensitivity:
+    """
+    Global sensitivity analysis driver (Morris or Sobol) for :class:`plans.hydrology.upscaled.UpscaledModel`.
+    """
+
+    def __init__(
+        self,
+        model,
+        df_hypotheses,
+        method="morris",
+        n=100,
+        outputs=("q", "e", "qbf"),
+        n_levels=4,
+        seed=None,
+    ):
+        """
+        Deploy the sensitivity driver.
+
+        :param model: model holding parameters and climate data
+        :type model: :class:`plans.hydrology.upscaled.UpscaledModel`
+        :param df_hypotheses: hypotheses table with fields ``Name``, ``Min`` and ``Max``
+        :type df_hypotheses: :class:`pandas.DataFrame`
+        :param method: sensitivity method (``morris`` or ``sobol``)
+        :type method: str
+        :param n: number of Morris trajectories or Saltelli base rows
+        :type n: int
+        :param outputs: output variables (reduced to totals over the simulation)
+        :type outputs: tuple
+        :param n_levels: number of grid levels of Morris trajectories
+        :type n_levels: int
+        :param seed: random seed
+        :type seed: int
+        """
+        if method not in SENSITIVITY_METHODS:
+            raise ValueError(
+                f"Method '{method}' not available. Use one of {SENSITIVITY_METHODS}"
+            )
+        for h in df_hypotheses["Name"].values:
+            if h not in SENSITIVITY_PARAMS:
+                raise ValueError(
+                    f"Parameter '{h}' not supported. Use one of {SENSITIVITY_PARAMS}"
+                )
+        self.model = model
+        self.hypotheses = df_hypotheses
+        self.method = method
+        self.n = n
+        self.outputs = list(outputs)
+        self.n_levels = n_levels
+        self.seed = seed
+
+        # outputs
+        self.samples = None
+        self.results = None
+        self.indices = None
+        self.convergence = None
+        self.timing = None
+
+    def get_samples(self):
+        """
+        Get samples table for the sensitivity method.
+
+        :return: samples table
+        :rtype: :class:`pandas.DataFrame`
+        """
+        if self.method == "morris":
+            return sample_morris(
+                df_hypotheses=self.hypotheses,
+                n_trajectories=self.n,
+                n_levels=self.n_levels,
+                seed=self.seed,
+            )
+        return sample_saltelli(
+            df_hypotheses=self.hypotheses, n_base=self.n, seed=self.seed
+        )
+
+    def _get_template(self):
+        """
+        Get a light copy of the model to send to workers (no climate or simulation data).
+
+        :return: model copy
+        :rtype: :class:`plans.hydrology.upscaled.UpscaledModel`
+        """
+        template = pool.get_template(self.model)
+        # only allocate what outputs need (qbf is routed with q)
+        template.outputs = [v for v in self.outputs if v != "qbf"]
+        return template
+
+    def get_indices(self, n=None):
+        """
+        Get sensitivity indices of all outputs.
+
+        :param n: [optional] use only the first trajectories (or base rows)
+        :type n: int
+        :return: table with fields ``output``, ``Name`` and indices
+        :rtype: :class:`pandas.DataFrame`
+        """
+        ls_dfs = []
+        for v in self.outputs:
+            if self.method == "morris":
+                df = get_morris_effects(
+                    df_results=self.results,
+                    df_hypotheses=self.hypotheses,
+                    output=v,
+                    n_trajectories=n,
+                )
+            else:
+                df = get_sobol_indices(
+                    df_results=self.results,
+                    hypotheses=list(self.hypotheses["Name"].values),
+                    output=v,
+                    n_base=n,
+                )
+            df.insert(0, "output", v)
+            ls_dfs.append(df)
+        return pd.concat(ls_dfs, ignore_index=True)
+
+    def get_convergence(self, n_points=4):
+        """
+        Get sensitivity indices for increasing sample sizes (halving down from ``n``).
+
+        :param n_points: number of sample sizes
+        :type n_points: int
+        :return: table with fields ``n``, ``n_evals``, ``output``, ``Name`` and indices
+        :rtype: :class:`pandas.DataFrame`
+        """
+        n_min = 2 if self.method == "morris" else 1
+        ls_n = sorted({max(self.n // 2**i, n_min) for i in range(n_points)})
+        n_evals = len(self.results) / self.n
+        ls_dfs = []
+        for n in ls_n:
+            df = self.get_indices(n=n)
+            df.insert(0, "n_evals", int(n * n_evals))
+            df.insert(0, "n", n)
+            ls_dfs.append(df)
+        return pd.concat(ls_dfs, ignore_index=True)
+
+    def run(self, n_workers=None, batch_size=50, n_points=4):
+        """
+        Run the sensitivity analysis.
+
+        .. note::
+
+            Memory use of workers grows with ``batch_size`` (one ensemble
+            member per sample), so lower it for long simulations.
+
+        :param n_workers: number of worker processes. Default is the number of CPUs
+        :type n_workers: int
+        :param batch_size: number of samples per ensemble run
+        :type batch_size: int
+        :param n_points: number of sample sizes for convergence
+        :type n_points: int
+        :return: sensitivity indices
+        :rtype: :class:`pandas.DataFrame`
+        """
+        self.samples = self.get_samples()
+        hypotheses = list(self.hypotheses["Name"].values)
+
+        t0 = time.perf_counter()
+        ls_shm, ls_specs = pool.share_frame(self.model.data_clim)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_worker,
+                initargs=(self._get_template(), ls_specs, hypotheses, self.outputs),
+            ) as executor:
+                ls_batches = [
+                    self.samples.iloc[i : i + batch_size].to_dict("records")
+                    for i in range(0, len(self.samples), batch_size)
+                ]
+                df_outputs = pd.concat(
+                    list(executor.map(_run_batch, ls_batches)), ignore_index=True
+                )
+        finally:
+            pool.release_frame(ls_shm)
+        n_wall = time.perf_counter() - t0
+
+        self.results = pd.merge(self.samples, df_outputs, on="id", how="left")
+        self.timing = {
+            "n_evals": len(self.results),
+            "wall_time": n_wall,
+            "time_per_1000": 1000 * n_wall / len(self.results),
+        }
+        self.indices = self.get_indices()
+        self.convergence = self.get_convergence(n_points=n_points)
+        return self.indices
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    print("Hello world!")
+    # ... {develop}
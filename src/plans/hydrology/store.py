@@ -0,0 +1,386 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Chunked on-disk store for map snapshots of distributed models.
+
+Snapshots of local variables are appended during ``solve()`` and written to
+disk in fixed-size chunks, so memory use does not grow with the simulation
+length. A lazy reader loads only the chunks needed for a query.
+
+Features
+--------
+
+* Streaming writer with bounded memory (one chunk buffer per variable).
+* Active cells only (maps are rebuilt on read with the stored cell index).
+* Raw ``.npy`` chunks (memory-mapped on read) or compressed ``.npz`` chunks.
+* Self-describing store (``store.json`` holds variables, shape and dtype).
+* Append-only index of snapshot steps and timestamps (one write per chunk).
+
+Overview
+--------
+
+A store is a folder with the following layout:
+
+.. code-block:: text
+
+    store/
+        store.json          # metadata
+        cells.npy           # flat indices of active cells in the basemap
+        index.csv           # step and timestamp of each snapshot (appended)
+        s/chunk_00000.npy   # array (chunk_size, n_cells)
+        s/chunk_00001.npy
+        g/chunk_00000.npy
+        ...
+
+Metadata is written when the store is created and when it is closed. The
+index is appended after each chunk is flushed, so a store is readable
+even if the simulation is interrupted, and flushing costs do not grow with
+the simulation length.
+
+Examples
+--------
+
+.. code-block:: python
+
+    from plans.hydrology.store import MapStoreReader
+
+    # ask the model to stream snapshots every 24 steps
+    m.store_folder = "./out/maps"
+    m.store_vars = ["s", "g", "v", "qif"]
+    m.store_interval = 24
+    m.setup()
+    m.solve()
+
+    # read lazily
+    reader = MapStoreReader("./out/maps")
+    grd = reader.get_map("g", 10)
+    df = reader.get_series("g", cells=[0, 1, 2])
+
+"""
+
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+import json
+import shutil
+from pathlib import Path
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+# CONSTANTS -- Module-level
+# =======================================================================
+
+# metadata file name
+STORE_META = "store.json"
+
+# active cells index file name
+STORE_CELLS = "cells.npy"
+
+# snapshots index file name
+STORE_INDEX = "index.csv"
+
+# ... {develop}
+
+
+# CLASSES
+# ***********************************************************************
+
+# CLASSES -- Project-level
+# =======================================================================
+
+
+class MapStoreWriter:
+    """
+    Streaming writer of map snapshots in a chunked on-disk store.
+    """
+
+    def __init__(
+        self,
+        folder,
+        variables,
+        cells,
+        shape,
+        chunk_size=100,
+        dtype="float32",
+        compress=False,
+        overwrite=True,
+    ):
+        """
+        Deploy the writer and create the store folder.
+
+        :param folder: path to store folder
+        :type folder: str
+        :param variables: list of variable names
+        :type variables: list
+        :param cells: flat indices of active cells in the basemap
+        :type cells: :class:`numpy.ndarray`
+        :param shape: basemap shape
+        :type shape: tuple
+        :param chunk_size: number of snapshots per chunk
+        :type chunk_size: int
+        :param dtype: data type of stored values
+        :type dtype: str
+        :param compress: option for compressed ``.npz`` chunks (not memory-mapped on read)
+        :type compress: bool
+        :param overwrite: option for removing an existing store in folder
+        :type overwrite: bool
+        """
+        self.folder = Path(folder)
+        self.variables = list(variables)
+        self.cells = np.asarray(cells)
+        self.shape = tuple(int(n) for n in shape)
+        self.chunk_size = int(chunk_size)
+        self.dtype = np.dtype(dtype)
+        self.compress = compress
+
+        # buffers
+        n_cells = len(self.cells)
+        self.buffers = {
+            v: np.empty((self.chunk_size, n_cells), dtype=self.dtype)
+            for v in self.variables
+        }
+        self.n_buffer = 0
+        self.n_chunks = 0
+        self.n_saved = 0
+        # steps and timestamps of buffered snapshots
+        self.steps = []
+        self.datetimes = []
+
+        # folder
+        if overwrite and self.folder.exists():
+            shutil.rmtree(self.folder)
+        for v in self.variables:
+            Path(self.folder / v).mkdir(parents=True, exist_ok=True)
+        np.save(self.folder / STORE_CELLS, self.cells)
+        with open(self.folder / STORE_INDEX, "w", encoding="utf-8") as f:
+            f.write("step;datetime\n")
+        self._write_meta()
+
+    def append(self, step, datetime, values):
+        """
+        Append one snapshot. Flushes to disk when the chunk is full.
+
+        :param step: simulation step index
+        :type step: int
+        :param datetime: snapshot timestamp
+        :type datetime: str or :class:`pandas.Timestamp`
+        :param values: dict of 1d arrays of active cells keyed by variable
+        :type values: dict
+        :return: None
+        :rtype: None
+        """
+        for v in self.variables:
+            self.buffers[v][self.n_buffer] = values[v]
+        self.steps.append(int(step))
+        self.datetimes.append(str(pd.Timestamp(datetime)))
+        self.n_buffer = self.n_buffer + 1
+        if self.n_buffer == self.chunk_size:
+            self.flush()
+        return None
+
+    def flush(self):
+        """
+        Write the current buffers as a new chunk and append them to the index.
+
+        :return: None
+        :rtype: None
+        """
+        if self.n_buffer == 0:
+            return None
+        for v in self.variables:
+            fpath = self.folder / v / self._get_chunk_name(self.n_chunks)
+            data = self.buffers[v][: self.n_buffer]
+            if self.compress:
+                np.savez_compressed(fpath, data=data)
+            else:
+                np.save(fpath, data)
+        # index is appended after the chunk is written
+        with open(self.folder / STORE_INDEX, "a", encoding="utf-8") as f:
+            for step, s_datetime in zip(self.steps, self.datetimes):
+                f.write(f"{step};{s_datetime}\n")
+        self.n_chunks = self.n_chunks + 1
+        self.n_saved = self.n_saved + self.n_buffer
+        self.n_buffer = 0
+        self.steps = []
+        self.datetimes = []
+        return None
+
+    def close(self):
+        """
+        Flush pending snapshots, write the final metadata and release buffers.
+
+        :return: None
+        :rtype: None
+        """
+        self.flush()
+        self._write_meta()
+        self.buffers = None
+        return None
+
+    def _get_chunk_name(self, n):
+        # todo [docstring]
+        ext = "npz" if self.compress else "npy"
+        return f"chunk_{n:05d}.{ext}"
+
+    def _write_meta(self):
+        """
+        Write the store metadata file.
+
+        :return: None
+        :rtype: None
+        """
+        dc_meta = {
+            "variables": self.variables,
+            "shape": list(self.shape),
+            "n_cells": int(len(self.cells)),
+            "chunk_size": self.chunk_size,
+            "dtype": self.dtype.name,
+            "compress": self.compress,
+            "n_chunks": self.n_chunks,
+            "n_snapshots": self.n_saved,
+        }
+        with open(self.folder / STORE_META, "w", encoding="utf-8") as f:
+            json.dump(dc_meta, f, indent=2)
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class MapStoreReader:
+    """
+    Lazy reader of a chunked on-disk store of map snapshots.
+    """
+
+    def __init__(self, folder, cache_size=2):
+        """
+        Open a store. Only the metadata, the cells and the snapshots index are loaded.
+
+        :param folder: path to store folder
+        :type folder: str
+        :param cache_size: number of chunks held in memory per variable
+        :type cache_size: int
+        """
+        self.folder = Path(folder)
+        fpath = self.folder / STORE_META
+        if not fpath.exists():
+            raise FileNotFoundError(f"Store metadata not found: {fpath}")
+        with open(fpath, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.variables = self.meta["variables"]
+        self.shape = tuple(self.meta["shape"])
+        self.chunk_size = self.meta["chunk_size"]
+        self.cells = np.load(self.folder / STORE_CELLS)
+        df_index = pd.read_csv(self.folder / STORE_INDEX, sep=";")
+        self.steps = df_index["step"].values.astype(np.int64)
+        self.datetimes = pd.to_datetime(df_index["datetime"])
+        self.cache_size = cache_size
+        self._cache = {v: {} for v in self.variables}
+
+    def __len__(self):
+        return len(self.steps)
+
+    def _get_chunk(self, var, n):
+        """
+        Get a chunk array, loading it from disk if not cached.
+
+        :param var: variable name
+        :type var: str
+        :param n: chunk number
+        :type n: int
+        :return: array (snapshots, n_cells)
+        :rtype: :class:`numpy.ndarray`
+        """
+        if var not in self._cache:
+            raise ValueError(f"Variable '{var}' not found. Use one of {self.variables}")
+        dc = self._cache[var]
+        if n not in dc:
+            if self.meta["compress"]:
+                with np.load(self.folder / var / f"chunk_{n:05d}.npz") as f:
+                    data = f["data"]
+            else:
+                data = np.load(self.folder / var / f"chunk_{n:05d}.npy", mmap_mode="r")
+            if len(dc) >= self.cache_size:
+                dc.pop(next(iter(dc)))
+            dc[n] = data
+        return dc[n]
+
+    def get(self, var, i):
+        """
+        Get a snapshot of active cells.
+
+        :param var: variable name
+        :type var: str
+        :param i: snapshot index
+        :type i: int
+        :return: 1d array of active cells values
+        :rtype: :class:`numpy.ndarray`
+        """
+        i = range(len(self))[i]
+        data = self._get_chunk(var, i // self.chunk_size)
+        return np.asarray(data[i % self.chunk_size])
+
+    def get_map(self, var, i, fill_value=np.nan):
+        """
+        Get a snapshot as a basemap grid.
+
+        :param var: variable name
+        :type var: str
+        :param i: snapshot index
+        :type i: int
+        :param fill_value: value for cells outside the basin
+        :type fill_value: float
+        :return: 2d array with the basemap shape
+        :rtype: :class:`numpy.ndarray`
+        """
+        vct = self.get(var, i)
+        grd = np.full(self.shape[0] * self.shape[1], fill_value, dtype=vct.dtype)
+        grd[self.cells] = vct
+        return grd.reshape(self.shape)
+
+    def get_series(self, var, cells=None):
+        """
+        Get the time series of active cells.
+
+        :param var: variable name
+        :type var: str
+        :param cells: positions of active cells to read. If None, all cells are read
+        :type cells: list
+        :return: table of series with ``datetime`` and one field per cell
+        :rtype: :class:`pandas.DataFrame`
+        """
+        if cells is None:
+            cells = np.arange(len(self.cells))
+        cells = np.asarray(cells)
+        n_chunks = -(-len(self) // self.chunk_size)
+        data = np.concatenate(
+            [np.asarray(self._get_chunk(var, n)[:, cells]) for n in range(n_chunks)]
+        )
+        df = pd.DataFrame(data[: len(self)], columns=[f"{var}_{c}" for c in cells])
+        df.insert(0, "datetime", self.datetimes.values)
+        return df
+
+
+# ... {develop}
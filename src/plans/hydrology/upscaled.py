@@ -36,25 +36,42 @@ Print a message
 
 
 """
+
 # IMPORTS
 # ***********************************************************************
 # import modules from other libs
 
 # Native imports
 # =======================================================================
-# import {module}
+from pathlib import Path
+
 # ... {develop}
 
 # External imports
 # =======================================================================
 import numpy as np
 import pandas as pd
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 
 # ... {develop}
 
 # Project-level imports
 # =======================================================================
-from .core import Model
+import plans.datasets as ds
+from plans.analyst import Bivar
+from .core import (
+    METRICS,
+    Model,
+    compute_decay,
+    compute_flow,
+    compute_metrics,
+    convolve_uh,
+    get_decay_k,
+    get_uh_support,
+    profiled,
+)
 
 # ... {develop}
 
@@ -69,6 +86,48 @@ from .core import Model
 
 # CONSTANTS -- Module-level
 # =======================================================================
+# parameters of UpscaledModel varying by member in ``solve_ensemble()``
+ENSEMBLE_PARAMS = (
+    "c0",
+    "s0",
+    "v0",
+    "g0",
+    "ck",
+    "ca",
+    "sk",
+    "sofa",
+    "sofc",
+    "sufa",
+    "sufc",
+    "sufcap",
+    "gcap",
+    "kv",
+    "gk",
+    "ecap",
+    "dea",
+)
+
+# storage levels of UpscaledModel saved in state checkpoints
+CHECKPOINT_LEVELS = ("c", "s", "v", "g")
+
+# variables always kept with selective outputs (storage levels and routing inflows)
+OUTPUT_REQUIRED = ("c", "s", "v", "g", "qof", "quf", "qgf")
+
+# variables needed for derived outputs (see ``UpscaledModel.get_output_vars()``)
+OUTPUT_DEPENDENCIES = {
+    "e": ("ec", "es", "eg"),
+    "qhf": ("qof", "quf", "qgf"),
+}
+
+# number of steps of rolling buffers for variables not kept in outputs
+SOLVE_CHUNK = 1024
+
+# maximum number of cached unit hydrographs (see ``get_guh()``)
+GUH_CACHE_SIZE = 32
+
+# cache of unit hydrographs keyed by (path-areas hash, kq, dt)
+_GUH_CACHE = {}
+
 # ... {develop}
 
 
@@ -81,6 +140,62 @@ from .core import Model
 
 # FUNCTIONS -- Module-level
 # =======================================================================
+
+
+def get_data_hash(df):
+    """
+    Get a hash of a table content, including field names.
+
+    :param df: table
+    :type df: :class:`pandas.DataFrame`
+    :return: hexadecimal digest
+    :rtype: str
+    """
+    import hashlib
+
+    h = hashlib.sha1()
+    h.update(";".join(str(c) for c in df.columns).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def get_guh(vct_t_src, grd_a_src, dt, window_size=8):
+    """
+    Compute the Geomorphic Unit Hydrograph of many basins in one pass.
+
+    Areas are normalized, smoothed with a moving average and interpolated
+    with one cubic spline for all basins at steps of ``dt``.
+
+    :param vct_t_src: 1d array of travel times (sorted, in days)
+    :type vct_t_src: :class:`numpy.ndarray`
+    :param grd_a_src: 2d array of areas (times x basins)
+    :type grd_a_src: :class:`numpy.ndarray`
+    :param dt: time step (in days)
+    :type dt: float
+    :param window_size: moving average window size
+    :type window_size: int
+    :return: 2d array of unit hydrographs over the support (basins x steps), not normalized
+    :rtype: :class:`numpy.ndarray`
+    """
+    from scipy import signal
+    from scipy.interpolate import CubicSpline
+
+    # normalize areas
+    grd_q_src = grd_a_src / np.sum(grd_a_src, axis=0)
+    # smoothing with moving average (all basins at once)
+    kernel = np.ones((window_size, 1)) / window_size
+    grd_q_src = signal.convolve(grd_q_src, kernel, mode="same", method="direct")
+
+    # steps within the travel time range
+    t_max = np.max(vct_t_src)
+    vct_t = np.arange(int(t_max / dt) + 2) * dt
+    vct_t = vct_t[vct_t <= t_max]
+
+    # Cubic spline interpolation (smoother)
+    f_cubic = CubicSpline(vct_t_src, grd_q_src, axis=0)
+    return np.ascontiguousarray(f_cubic(vct_t).T)
+
+
 # ... {develop}
 
 
@@ -108,6 +223,11 @@ class LinearStorage(Model):
         self.filename_data_obs = "S_obs.csv"
         self.folder_data_obs = None
 
+        # evaluation alignment (see _setup_evaldata())
+        self.eval_ix = None
+        self.eval_obs = None
+        self.eval_pred = None
+
     def _set_model_vars(self):
         # todo [docstring]
         self.vars = {
@@ -309,13 +429,16 @@ class LinearStorage(Model):
         super().setup()
 
         # append extra variables to dict
-        self.sdata["s"] = np.full(self.slen, np.nan)
-        self.sdata["q"] = np.full(self.slen, np.nan)
-        self.sdata["S_a"] = np.full(self.slen, np.nan)
+        self.sdata["s"] = self.get_empty_series()
+        self.sdata["q"] = self.get_empty_series()
+        self.sdata["S_a"] = self.get_empty_series()
 
         # set initial conditions
         self.sdata["s"][0] = self.params["s0"]["value"]
 
+        # align observations to simulation steps
+        self._setup_evaldata()
+
         return None
 
     def solve(self):
@@ -335,6 +458,8 @@ class LinearStorage(Model):
         # make simpler variables for clarity
         k = self.params["k"]["value"]
         dt = self.params["dt"]["value"]
+        # residence time of decay term for the integration scheme (see get_decay_k)
+        k_decay = get_decay_k(k=k, dt=dt, scheme=self.scheme)
 
         # simulation steps (this is useful for testing and debug)
         if self.n_steps is None:
@@ -346,16 +471,73 @@ class LinearStorage(Model):
         sdata["S_a"][:] = self.params["s0"]["value"] * np.exp(-sdata["t"] / k)
 
         # --- numerical solution
-        # loop over (Euler Method)
-        for t in range(n_steps - 1):
-            sdata["q"][t] = compute_decay(s=sdata["s"][t], dt=dt, k=k)
-            sdata["s"][t + 1] = sdata["s"][t] - sdata["q"][t]
+        if self.engine == "python":
+            # loop over (Euler Method)
+            for t in range(n_steps - 1):
+                sdata["q"][t] = compute_decay(s=sdata["s"][t], dt=dt, k=k_decay)
+                sdata["s"][t + 1] = sdata["s"][t] - sdata["q"][t]
+        else:
+            self._solve_storage(
+                model="LinearStorage", n_steps=n_steps, k=k_decay, dt=dt
+            )
 
         # reset data
         self.data = pd.DataFrame(sdata)
 
         return None
 
+    def _solve_storage(self, model, n_steps, **params):
+        """
+        Run the time loop with the fused storage kernel from :mod:`plans.hydrology.kernels`.
+
+        .. note::
+
+            Simulation arrays not used by the model are passed as empty
+            arrays. Parameters not used by the model are set to ``nan``.
+
+        :param model: model name (see ``kernels.STORAGE_MODELS``)
+        :type model: str
+        :param n_steps: number of simulation steps
+        :type n_steps: int
+        :param params: model parameters (``k``, ``q_max``, ``s_a``, ``s_c`` and ``dt``)
+        :type params: dict
+        :return: None
+        :rtype: None
+        """
+        from plans.hydrology import kernels
+
+        if self.engine != "compiled":
+            raise ValueError(
+                f"Engine '{self.engine}' not available. Use 'python' or 'compiled'"
+            )
+        kernel = kernels.get_kernel("storage", compiled=True)
+
+        # arrays must be contiguous and of the same data type
+        dtype = self.sdata["s"].dtype
+        arrays = []
+        for v in kernels.STORAGE_VARS:
+            if v not in self.sdata:
+                arrays.append(np.empty(0, dtype=dtype))
+            elif v in ["p", "e_pot"]:
+                arrays.append(np.ascontiguousarray(self.sdata[v], dtype=dtype))
+            else:
+                # simulation arrays are updated in place
+                arrays.append(self.sdata[v])
+        scalars = {
+            k: np.float64(params.get(k, np.nan))
+            for k in ["k", "q_max", "s_a", "s_c", "dt"]
+        }
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kernel(
+                *arrays,
+                **scalars,
+                n_steps=int(n_steps),
+                mode=kernels.STORAGE_MODELS.index(model),
+                shutdown_qb=bool(getattr(self, "shutdown_qb", False)),
+            )
+        return None
+
     def get_evaldata(self):
         # todo [docstring]
         # merge simulation and observation data based
@@ -377,23 +559,73 @@ class LinearStorage(Model):
         df["{}".format(self.var_eval)] = df["{}".format(self.var_eval)] / factor
         return df
 
-    def evaluate(self):
+    def _get_obs_field(self):
         """
-        Evaluate model metrics.
+        Get the field of observed values in ``data_obs``.
+
+        :return: field name
+        :rtype: str
+        """
+        return "{}_obs".format(self.var_eval)
+
+    def _setup_evaldata(self):
+        """
+        Align observations to simulation steps, so ``evaluate()`` runs on arrays.
+
+        .. note::
+
+            Observations out of the simulation period or with missing values
+            are dropped. Nothing is set if ``data_obs`` is None.
 
         :return: None
         :rtype: None
         """
-        df = self.get_evaldata()
+        if self.data_obs is None:
+            self.eval_ix = None
+            return None
+        s_field = self._get_obs_field()
+        df_obs = self.data_obs[[self.field_datetime, s_field]].dropna()
+        vct_ts = pd.DatetimeIndex(self.sdata[self.field_datetime])
+        vct_ix = vct_ts.get_indexer(pd.DatetimeIndex(df_obs[self.field_datetime]))
+        vct_obs = df_obs[s_field].values.astype(np.float64)
+        # keep simulation order
+        vct_b = vct_ix >= 0
+        vct_order = np.argsort(vct_ix[vct_b], kind="stable")
+        self.eval_ix = vct_ix[vct_b][vct_order]
+        self.eval_obs = vct_obs[vct_b][vct_order]
+        self.eval_pred = np.empty(len(self.eval_ix), dtype=np.float64)
+        return None
+
+    def get_metrics(self):
+        """
+        Get all evaluation metrics (see :func:`plans.hydrology.core.compute_metrics`).
+
+        .. note::
+
+            Runs on the simulation arrays and the observations aligned at
+            ``setup()``, so no tables are built.
+
+        :return: 1d array of metrics, in the order of ``METRICS``
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.eval_ix is None:
+            self._setup_evaldata()
+        np.take(self.sdata[self.var_eval], self.eval_ix, out=self.eval_pred)
+        # handle scaling factor for flows (expected to be in k-units)
+        if self.vars[self.var_eval]["kind"] == "flow":
+            np.divide(self.eval_pred, self.params["dt"]["value"], out=self.eval_pred)
+        return compute_metrics(pred=self.eval_pred, obs=self.eval_obs)
 
-        # evaluate paired data
-        vc_pred = df[self.var_eval].values
-        vc_obs = df["{}_obs".format(self.var_eval)].values
+    def evaluate(self):
+        """
+        Evaluate model metrics. Metrics are set as attributes (see ``METRICS``).
 
-        # compute evaluation metrics
-        self.rmse = Bivar.rmse(pred=vc_pred, obs=vc_obs)
-        self.rsq = Bivar.rsq(pred=vc_pred, obs=vc_obs)
-        self.bias = Bivar.bias(pred=vc_pred, obs=vc_obs)
+        :return: None
+        :rtype: None
+        """
+        vct_metrics = self.get_metrics()
+        for m, value in zip(METRICS, vct_metrics):
+            setattr(self, m, value)
 
         return None
 
@@ -603,6 +835,35 @@ class LSRR(LinearStorage):
         """
 
         # -------------- load climate inputs data -------------- #
+        self.load_clim()
+
+        # -------------- load observation data -------------- #
+        self.file_data_obs = Path(f"{self.folder_data_obs}/{self.filename_data_obs}")
+        self.data_obs = pd.read_csv(
+            self.file_data_obs,
+            sep=self.file_csv_sep,
+            encoding=self.file_encoding,
+            parse_dates=[self.field_datetime],
+        )
+
+        # -------------- update other mutables -------------- #
+        self.update()
+
+        # ... continues in downstream objects ... #
+
+        return None
+
+    def load_clim(self):
+        """
+        Load climate inputs data. The simulation period (``t0`` and ``tN``) is set to the climate period.
+
+        .. warning::
+
+            This method overwrites model data.
+
+        :return: None
+        :rtype: None
+        """
         self.file_data_clim = Path(f"{self.folder_data_clim}/{self.filename_data_clim}")
         df_data_input = pd.read_csv(
             self.file_data_clim,
@@ -623,21 +884,6 @@ class LSRR(LinearStorage):
         # set the data inputs for climate
         self.data_clim = df_data_input[[self.field_datetime] + self.var_inputs].copy()
         self.data_clim_src = self.data_clim.copy()
-
-        # -------------- load observation data -------------- #
-        self.file_data_obs = Path(f"{self.folder_data_obs}/{self.filename_data_obs}")
-        self.data_obs = pd.read_csv(
-            self.file_data_obs,
-            sep=self.file_csv_sep,
-            encoding=self.file_encoding,
-            parse_dates=[self.field_datetime],
-        )
-
-        # -------------- update other mutables -------------- #
-        self.update()
-
-        # ... continues in downstream objects ... #
-
         return None
 
     def setup(self):
@@ -667,11 +913,35 @@ class LSRR(LinearStorage):
         )
         df_downscaled = rs.scale_down(freq=self.params["dt_freq"]["value"])
 
-        # set interpolated inputs variables
-        self.sdata["p"] = df_downscaled["P"].values[:]
+        # set interpolated inputs variables (within simulation window)
+        self.sdata["p"] = self._get_inputs_window(
+            df=df_downscaled, varfield=rs.varfield, dtfield=rs.dtfield
+        )
 
         return None
 
+    def _get_inputs_window(self, df, varfield, dtfield):
+        """
+        Get input values within the simulation window (``t0`` to ``tN``).
+
+        .. note::
+
+            Inputs may span a longer period than the simulation, for
+            instance when warm starting from a checkpoint.
+
+        :param df: input data
+        :type df: :class:`pandas.DataFrame`
+        :param varfield: field of values
+        :type varfield: str
+        :param dtfield: field of datetime
+        :type dtfield: str
+        :return: values aligned to simulation steps
+        :rtype: :class:`numpy.ndarray`
+        """
+        vct_values = df.set_index(dtfield)[varfield]
+        vct_ts = pd.DatetimeIndex(self.sdata[self.field_datetime])
+        return vct_values.reindex(vct_ts).values.astype(self.dtype)
+
     def solve(self):
         """
         Solve the model for inputs and initial conditions by numerical methods.
@@ -687,6 +957,8 @@ class LSRR(LinearStorage):
         k = self.params["k"]["value"]
         qmax = self.params["q_max"]["value"]
         dt = self.params["dt"]["value"]
+        # residence time of decay terms for the integration scheme (see get_decay_k)
+        k = get_decay_k(k=k, dt=dt, scheme=self.scheme)
 
         # get data reference
         sdata = self.sdata
@@ -698,16 +970,21 @@ class LSRR(LinearStorage):
             n_steps = self.n_steps
 
         # --- numerical solution
-        # loop over (Euler Method)
-        for t in range(n_steps - 1):
-            # Qt = dt * St / k
-            sdata["q"][t] = np.min([compute_decay(s=sdata["s"][t], dt=dt, k=k), qmax])
-            # S(t + 1) = S(t) + P(t) - Q(t)
-            sdata["s"][t + 1] = sdata["s"][t] + sdata["p"][t] - sdata["q"][t]
+        if self.engine == "python":
+            # loop over (Euler Method)
+            for t in range(n_steps - 1):
+                # Qt = dt * St / k
+                sdata["q"][t] = np.min(
+                    [compute_decay(s=sdata["s"][t], dt=dt, k=k), qmax]
+                )
+                # S(t + 1) = S(t) + P(t) - Q(t)
+                sdata["s"][t + 1] = sdata["s"][t] + sdata["p"][t] - sdata["q"][t]
+        else:
+            self._solve_storage(model="LSRR", n_steps=n_steps, k=k, q_max=qmax, dt=dt)
 
-        # set io data
-        self.data = pd.DataFrame(sdata)
-        self.data = self.data[[self.field_datetime, "t", "p", "q", "s"]].copy()
+        # set io data (arrays are not copied)
+        ls_vars = [self.field_datetime, "t", "p", "q", "s"]
+        self.data = pd.DataFrame({v: sdata[v] for v in ls_vars}, copy=False)
 
         return None
 
@@ -876,7 +1153,7 @@ class LSRRE(LSRR):
         super().setup()
 
         # set E (actual)
-        self.sdata["e"] = np.full(self.slen, np.nan)
+        self.sdata["e"] = self.get_empty_series()
 
         # handle inputs E_pot values
         rs = ds.RainSeries()  # todo best practice is to have a EvapoSeries() object
@@ -889,8 +1166,10 @@ class LSRRE(LSRR):
         )
         df_downscaled = rs.scale_down(freq=self.params["dt_freq"]["value"])
 
-        # set interpolated inputs variables
-        self.sdata["e_pot"] = df_downscaled["e_pot"].values[:]
+        # set interpolated inputs variables (within simulation window)
+        self.sdata["e_pot"] = self._get_inputs_window(
+            df=df_downscaled, varfield="e_pot", dtfield=rs.dtfield
+        )
 
         return None
 
@@ -909,6 +1188,8 @@ class LSRRE(LSRR):
         k = self.params["k"]["value"]
         qmax = self.params["q_max"]["value"]
         dt = self.params["dt"]["value"]
+        # residence time of decay terms for the integration scheme (see get_decay_k)
+        k = get_decay_k(k=k, dt=dt, scheme=self.scheme)
 
         # get data reference
         sdata = self.sdata
@@ -923,38 +1204,39 @@ class LSRRE(LSRR):
             sdata["e_pot"] = np.full(self.slen, 0.0)
 
         # --- numerical solution
-        # loop over (Euler Method)
-        for t in range(n_steps - 1):
-            # potential flow
-            q_pot = np.min([compute_decay(s=sdata["s"][t], dt=dt, k=k), qmax])
+        if self.engine == "python":
+            # loop over (Euler Method)
+            for t in range(n_steps - 1):
+                # potential flow
+                q_pot = np.min([compute_decay(s=sdata["s"][t], dt=dt, k=k), qmax])
 
-            # Et = Et_pot
-            e_pot = sdata["e_pot"][t]
+                # Et = Et_pot
+                e_pot = sdata["e_pot"][t]
 
-            # Potential outflow O_pot
-            o_pot = q_pot + e_pot
+                # Potential outflow O_pot
+                o_pot = q_pot + e_pot
 
-            # Maximum outflow Omax = St
-            o_max = sdata["s"][t]
+                # Maximum outflow Omax = St
+                o_max = sdata["s"][t]
 
-            # actual outflow
-            o_act = np.min([o_max, o_pot])
+                # actual outflow
+                o_act = np.min([o_max, o_pot])
 
-            # allocate Q and E
-            with np.errstate(divide="ignore", invalid="ignore"):
-                sdata["q"][t] = o_act * np.where(o_pot == 0, 0, q_pot / o_pot)
-                sdata["e"][t] = o_act * np.where(o_pot == 0, 0, e_pot / o_pot)
+                # allocate Q and E
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    sdata["q"][t] = o_act * np.where(o_pot == 0, 0, q_pot / o_pot)
+                    sdata["e"][t] = o_act * np.where(o_pot == 0, 0, e_pot / o_pot)
 
-            # S(t + 1) = S(t) + P(t) - Q(t) - E(t)
-            sdata["s"][t + 1] = (
-                sdata["s"][t] + sdata["p"][t] - sdata["q"][t] - sdata["e"][t]
-            )
+                # S(t + 1) = S(t) + P(t) - Q(t) - E(t)
+                sdata["s"][t + 1] = (
+                    sdata["s"][t] + sdata["p"][t] - sdata["q"][t] - sdata["e"][t]
+                )
+        else:
+            self._solve_storage(model="LSRRE", n_steps=n_steps, k=k, q_max=qmax, dt=dt)
 
-        # set data
-        self.data = pd.DataFrame(sdata)
-        # organize cols
+        # set data (arrays are not copied)
         ls_vars = [self.field_datetime, "t", "p", "e_pot", "e", "q", "s"]
-        self.data = self.data[ls_vars].copy()
+        self.data = pd.DataFrame({v: sdata[v] for v in ls_vars}, copy=False)
 
         return None
 
@@ -1094,10 +1376,10 @@ class LSFAS(LSRRE):
         super().setup()
 
         # add new columns
-        self.sdata["qs"] = np.full(self.slen, np.nan)
-        self.sdata["qb"] = np.full(self.slen, np.nan)
-        self.sdata["qsf"] = np.full(self.slen, np.nan)
-        self.sdata["ss"] = np.full(self.slen, np.nan)
+        self.sdata["qs"] = self.get_empty_series()
+        self.sdata["qb"] = self.get_empty_series()
+        self.sdata["qsf"] = self.get_empty_series()
+        self.sdata["ss"] = self.get_empty_series()
 
         return None
 
@@ -1118,6 +1400,8 @@ class LSFAS(LSRRE):
         s_c = self.params["s_c"]["value"]
         # dt is the fraction of 1 Day/(1 simulation time step)
         dt = self.params["dt"]["value"]
+        # residence time of decay terms for the integration scheme (see get_decay_k)
+        k = get_decay_k(k=k, dt=dt, scheme=self.scheme)
         # get reference data
         sdata = self.sdata
 
@@ -1132,69 +1416,73 @@ class LSFAS(LSRRE):
             sdata["e_pot"] = np.full(self.slen, 0.0)
 
         # --- numerical solution
-        # loop over (Euler Method)
-        for t in range(n_steps - 1):
-            # Compute dynamic spill storage capacity in mm/D
-            ss_cap = np.max([0, sdata["s"][t] - s_a])  # spill storage = s - s_a
-            sdata["ss"][t] = ss_cap
-
-            # Compute runoff fraction
-            with np.errstate(divide="ignore", invalid="ignore"):
-                qs_f = np.where((ss_cap + s_c) == 0, 0, (ss_cap / (ss_cap + s_c)))
-            sdata["qsf"][t] = qs_f
-
-            # potential runoff -- scale by the fraction
-
-            # compute dynamic runoff capacity
-
-            # -- includes P in the Qs capacity
-            qs_cap = (ss_cap * dt) + sdata["p"][t]  # multiply by dt (figure out why!)
-
-            # apply runoff fraction over Qs
-            qs_pot = qs_f * qs_cap
-
-            # Compute potential base flow
-            # Qt = dt * St / k
-            # useful for testing
-            if self.shutdown_qb:
-                qb_pot = np.full(self.slen, 0.0)
-            else:
-                qb_pot = compute_decay(s=sdata["s"][t], dt=dt, k=k)
-
-            # Compute potential evaporation flow
-            # Et = E_pot
-            e_pot = sdata["e_pot"][t]
-
-            # Compute Potential outflow O_pot
-            o_pot = qs_pot + qb_pot + e_pot
-
-            # Compute Maximum outflow Omax = St
-            o_max = sdata["s"][t]
-
-            # Compute actual outflow
-            o_act = np.min([o_max, o_pot])
-
-            # Allocate outflows
-            with np.errstate(divide="ignore", invalid="ignore"):
-                sdata["qs"][t] = o_act * np.where(o_pot == 0, 0, qs_pot / o_pot)
-                sdata["qb"][t] = o_act * np.where(o_pot == 0, 0, qb_pot / o_pot)
-                sdata["e"][t] = o_act * np.where(o_pot == 0, 0, e_pot / o_pot)
-
-            # Compute full Q
-            sdata["q"][t] = sdata["qs"][t] + sdata["qb"][t]
-
-            # Apply Water balance
-            # S(t + 1) = S(t) + P(t) - Qs(t) - Qb(t) - E(t)
-            sdata["s"][t + 1] = (
-                sdata["s"][t]
-                + sdata["p"][t]
-                - sdata["qs"][t]
-                - sdata["qb"][t]
-                - sdata["e"][t]
+        if self.engine == "python":
+            # loop over (Euler Method)
+            for t in range(n_steps - 1):
+                # Compute dynamic spill storage capacity in mm/D
+                ss_cap = np.max([0, sdata["s"][t] - s_a])  # spill storage = s - s_a
+                sdata["ss"][t] = ss_cap
+
+                # Compute runoff fraction
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    qs_f = np.where((ss_cap + s_c) == 0, 0, (ss_cap / (ss_cap + s_c)))
+                sdata["qsf"][t] = qs_f
+
+                # potential runoff -- scale by the fraction
+
+                # compute dynamic runoff capacity
+
+                # -- includes P in the Qs capacity
+                # multiply by dt (figure out why!)
+                qs_cap = (ss_cap * dt) + sdata["p"][t]
+
+                # apply runoff fraction over Qs
+                qs_pot = qs_f * qs_cap
+
+                # Compute potential base flow
+                # Qt = dt * St / k
+                # useful for testing
+                if self.shutdown_qb:
+                    qb_pot = 0.0
+                else:
+                    qb_pot = compute_decay(s=sdata["s"][t], dt=dt, k=k)
+
+                # Compute potential evaporation flow
+                # Et = E_pot
+                e_pot = sdata["e_pot"][t]
+
+                # Compute Potential outflow O_pot
+                o_pot = qs_pot + qb_pot + e_pot
+
+                # Compute Maximum outflow Omax = St
+                o_max = sdata["s"][t]
+
+                # Compute actual outflow
+                o_act = np.min([o_max, o_pot])
+
+                # Allocate outflows
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    sdata["qs"][t] = o_act * np.where(o_pot == 0, 0, qs_pot / o_pot)
+                    sdata["qb"][t] = o_act * np.where(o_pot == 0, 0, qb_pot / o_pot)
+                    sdata["e"][t] = o_act * np.where(o_pot == 0, 0, e_pot / o_pot)
+
+                # Compute full Q
+                sdata["q"][t] = sdata["qs"][t] + sdata["qb"][t]
+
+                # Apply Water balance
+                # S(t + 1) = S(t) + P(t) - Qs(t) - Qb(t) - E(t)
+                sdata["s"][t + 1] = (
+                    sdata["s"][t]
+                    + sdata["p"][t]
+                    - sdata["qs"][t]
+                    - sdata["qb"][t]
+                    - sdata["e"][t]
+                )
+        else:
+            self._solve_storage(
+                model="LSFAS", n_steps=n_steps, k=k, s_a=s_a, s_c=s_c, dt=dt
             )
-        # reset data
-        self.data = pd.DataFrame(sdata)
-        # organize table
+        # reset data (arrays are not copied)
         ls_vars = [
             self.field_datetime,
             "t",
@@ -1208,7 +1496,7 @@ class LSFAS(LSRRE):
             "s",
             "ss",
         ]
-        self.data = self.data[ls_vars].copy()
+        self.data = pd.DataFrame({v: sdata[v] for v in ls_vars}, copy=False)
 
         return None
 
@@ -1301,8 +1589,14 @@ class UpscaledModel(LSFAS):
 
         # Geomorphic Unit Hydrograph
         self.data_guh = None
+
+        # routing convolution method ("auto", "direct", "fft" or "oa")
+        self.routing_method = "auto"
         self.filename_data_guh = "guh.csv"
 
+        # state of stepwise simulations (see ``start_stream()``)
+        self.stream = None
+
     def _set_model_vars(self):
         # todo [docstring]
         super()._set_model_vars()
@@ -1899,52 +2193,84 @@ class UpscaledModel(LSFAS):
 
         return None
 
+    def get_guh_support(self, kq=None):
+        """
+        Get the Geomorphic Unit Hydrograph of all basins over its full support.
+
+        Unit hydrographs are cached by path-areas content, ``kq`` and ``dt``,
+        so they do not depend on the simulation length.
+
+        .. note::
+
+            Expected to be called after ``_setup_tah()``.
+
+        :param kq: routing velocity. Default value is the model parameter
+        :type kq: float
+        :return: 2d read-only array of unit hydrographs (basins x steps), not normalized
+        :rtype: :class:`numpy.ndarray`
+        """
+        if kq is None:
+            kq = self.params["kq"]["value"]
+        dt = self.params["dt"]["value"]
+
+        key = (get_data_hash(self.data_pah), float(kq), float(dt))
+        if key not in _GUH_CACHE:
+            if len(_GUH_CACHE) >= GUH_CACHE_SIZE:
+                _GUH_CACHE.pop(next(iter(_GUH_CACHE)))
+            grd_guh = get_guh(
+                vct_t_src=self.data_tah["path"].values / kq,
+                grd_a_src=self.data_tah[self.basins_ls].values,
+                dt=dt,
+            )
+            grd_guh.setflags(write=False)
+            _GUH_CACHE[key] = grd_guh
+        return _GUH_CACHE[key]
+
+    def get_guh_array(self, kq=None):
+        """
+        Get the Geomorphic Unit Hydrograph of all basins as one array.
+
+        Unit hydrographs over support are cached (see ``get_guh_support()``),
+        so repeated calls only pad and normalize them to the simulation length.
+
+        .. note::
+
+            Expected to be called after ``_setup_tah()``.
+
+        :param kq: routing velocity. Default value is the model parameter
+        :type kq: float
+        :return: 2d array of unit hydrographs (basins x steps), each with sum = 1
+        :rtype: :class:`numpy.ndarray`
+        """
+        # get unit hydrographs over support (basins x steps)
+        grd_guh = self.get_guh_support(kq=kq)
+
+        # clip or add zeros at the tail
+        n = min(self.slen, grd_guh.shape[1])
+        grd_q = np.zeros((len(self.basins_ls), self.slen), dtype=np.float64)
+        grd_q[:, :n] = grd_guh[:, :n]
+        # normalize to sum = 1 (sum over support, independent of padding)
+        return grd_q / np.sum(grd_guh[:, :n], axis=1, keepdims=True)
+
+    @profiled("guh")
     def _setup_guh(self):
-        # todo [docstring]
-        from scipy.interpolate import CubicSpline
+        """
+        Set the Geomorphic Unit Hydrograph of all basins (see ``get_guh_array()``).
 
+        :return: None
+        :rtype: None
+        """
         # set the TAH data
         self._setup_tah()
 
-        # compute unit hydrograph
-        vct_t_src = self.data_tah["time"].values
-
         # set unit hydrograph dataframe
+        grd_q = self.get_guh_array()
         self.data_guh = pd.DataFrame(
-            {
-                "t": self.sdata["t"],
-            }
+            {"t": self.sdata["t"], **dict(zip(self.basins_ls, grd_q))}
         )
-        # append for each basin
-        for basin in self.basins_ls:
-            vct_q_src = self.data_tah[basin].values / self.data_tah[basin].sum()
-            # smoothing
-            window_size = 8  # make it more or less smooth
-            # Create a kernel for the moving average
-            kernel = np.ones(window_size) / window_size
-            # Apply the convolution
-            vct_q_src = np.convolve(vct_q_src, kernel, mode="same")
-
-            # clip data
-            t_max = np.max(vct_t_src)
-            df_q = self.data_guh.query(f"t <= {t_max}").copy()
-            vct_t_clip = df_q["t"].values
-
-            # Cubic spline interpolation (smoother)
-            f_cubic = CubicSpline(vct_t_src, vct_q_src)
-            vct_q_clip = f_cubic(vct_t_clip)
-
-            # add zeros at the tail
-            vct_q_new = np.concatenate(
-                [vct_q_clip, np.zeros(self.slen - len(vct_q_clip), dtype=np.float64)]
-            )
-            # normalize to sum = 1
-            vct_q_new = vct_q_new / np.sum(vct_q_new)
-            # append in guh
-            self.data_guh[basin] = vct_q_new
-
         return None
 
+    @profiled("start")
     def _setup_start(self):
         # todo [docstring]
         # loop over vars
@@ -1973,8 +2299,53 @@ class UpscaledModel(LSFAS):
             self.params["v0"]["value"] = g_cap
             self.sdata["v"][0] = g_cap - g0
 
+        # --- warm start overwrites initial conditions
+        if self.checkpoint is not None:
+            self._setup_checkpoint()
+
+        return None
+
+    def _setup_checkpoint(self):
+        """
+        Set initial conditions from the checkpoint.
+
+        :return: None
+        :rtype: None
+        """
+        super()._setup_checkpoint()
+        for v in CHECKPOINT_LEVELS:
+            self.sdata[v][0] = self.checkpoint[v]
         return None
 
+    def get_checkpoint(self):
+        """
+        Get the state checkpoint at the last simulation step.
+
+        Includes the storage levels and the routing memory, that is,
+        the outflow still to come from inflow of past steps.
+
+        .. note::
+
+            The unit hydrograph is truncated in runs shorter than it, so the
+            routing memory of short runs does not match a longer full run.
+
+        :return: dict of arrays (flat keys)
+        :rtype: dict
+        """
+        dc = super().get_checkpoint()
+        for v in CHECKPOINT_LEVELS:
+            dc[v] = np.array(self.sdata[v][self.slen - 1])
+        uh = self.data_guh[self.basins_ls[0]].values
+        dc_inflow = self._get_routing_inflows(self.sdata)
+        for k in dc_inflow:
+            dc[f"routing_{k}"] = UpscaledModel.get_routing_memory(
+                inflow=dc_inflow[k],
+                unit_hydrograph=uh,
+                memory=self._get_routing_memory(k),
+            )
+        return dc
+
+    @profiled("params")
     def _setup_params(self):
         # todo [docstring]
         # --- handle bad (unfeaseable) parameters
@@ -1993,22 +2364,32 @@ class UpscaledModel(LSFAS):
             self.n_steps = self.slen
         return None
 
-    def load_data(self):
+    def load_pah(self):
         """
-        Load simulation data. Expected to increment superior methods.
+        Load the Path-Area Histogram (PAH) data.
 
         :return: None
         :rtype: None
         """
-        super().load_data()
-
-        # -------------- load path areas inputs data -------------- #
         self.file_data_pah = Path(f"{self.folder_data_pah}/{self.filename_data_pah}")
         self.data_pah = pd.read_csv(
             self.file_data_pah,
             sep=self.file_csv_sep,
             encoding=self.file_encoding,
         )
+        return None
+
+    def load_data(self):
+        """
+        Load simulation data. Expected to increment superior methods.
+
+        :return: None
+        :rtype: None
+        """
+        super().load_data()
+
+        # -------------- load path areas inputs data -------------- #
+        self.load_pah()
 
         # -------------- update other mutables -------------- #
         # evaluate using self.update()
@@ -2017,6 +2398,7 @@ class UpscaledModel(LSFAS):
 
         return None
 
+    @profiled("setup")
     def setup(self):
         """
         Set model simulation.
@@ -2030,7 +2412,8 @@ class UpscaledModel(LSFAS):
         :rtype: None
         """
         # setup superior object
-        super().setup()
+        with self._profile("inputs"):
+            super().setup()
 
         # clear deprecated parent variables
         del self.sdata["qs"]
@@ -2040,9 +2423,13 @@ class UpscaledModel(LSFAS):
         del self.sdata["ss"]
         del self.sdata["q"]
 
-        # append new variables
+        # append new variables (only outputs are kept)
+        ls_outputs = self.get_output_vars()
         for v in self.new_vars:
-            self.sdata[v] = np.full(self.slen, np.nan)
+            if v in ls_outputs:
+                self.sdata[v] = self.get_empty_series()
+        if "e" not in ls_outputs:
+            del self.sdata["e"]
 
         #
         # ----------- simulation steps ------------- #
@@ -2067,369 +2454,1011 @@ class UpscaledModel(LSFAS):
         #
         # ------------- set empty io data ---------------- #
         #
-        self.data = pd.DataFrame(self.sdata)
+        with self._profile("output"):
+            self.data = pd.DataFrame(self.sdata)
+
+        # stepwise simulations restart from the new setup
+        self.stream = None
 
         return None
 
-    def solve(self):
+    def get_output_vars(self):
         """
-        Solve the model for inputs and initial conditions by numerical methods.
+        Get the variables kept in simulation data.
 
-        .. warning::
+        .. note::
 
-            This method overwrites model data.
+            With selective outputs (``outputs`` is not None), storage levels and
+            routing inflows are always kept, since warm starts and routing need
+            them. Variables needed by derived outputs (``e`` and ``qhf``) and the
+            evaluation variable (if observed data is set) are also kept. Other
+            variables live in rolling buffers during ``solve()``.
 
+        :return: list of variables
+        :rtype: list
+        """
+        ls_all = list(self.new_vars) + ["e"]
+        if self.outputs is None:
+            return ls_all
+        for v in self.outputs:
+            if v not in ls_all:
+                raise ValueError(f"Variable '{v}' not found. Use one of {ls_all}")
+        ls_outputs = list(OUTPUT_REQUIRED) + list(self.outputs)
+        if self.data_obs is not None:
+            ls_outputs.append(self.var_eval)
+        for v in self.outputs:
+            ls_outputs = ls_outputs + list(OUTPUT_DEPENDENCIES.get(v, ()))
+        return [v for v in ls_all if v in ls_outputs]
+
+    def _solve_loop(self, gb, dt, n_steps=None, **params):
+        """
+        Run the reference time loop (Euler Method) over the simulation arrays.
+
+        .. note::
+
+            Arrays in ``gb`` may be 1d (time) or 2d (time x members). In the
+            latter case, parameters are expected as 1d arrays (members), so
+            all members advance at once by broadcasting.
+
+        :param gb: simulation arrays, updated in place
+        :type gb: dict
+        :param dt: time step factor
+        :type dt: float
+        :param n_steps: [optional] number of rows of arrays. Default is ``n_steps`` of model
+        :type n_steps: int
+        :param params: model parameters and derived parameters (see ``_solve_step()``)
+        :type params: dict
         :return: None
         :rtype: None
         """
+        if n_steps is None:
+            n_steps = self.n_steps
+        # ---------------- START TIME LOOP ---------------- #
+        # loop over steps (Euler Method)
+        for t in range(n_steps - 1):
+            self._solve_step(gb=gb, t=t, dt=dt, **params)
+            # ---------------- END TIME LOOP ---------------- #
 
-        #
-        # ---------------- simulation setup ----------------
-        #
+        return None
 
-        # dt is the fraction of 1 Day/(1 simulation time step)
-        dt = self.params["dt"]["value"]
+    def _solve_step(
+        self,
+        gb,
+        t,
+        dt,
+        c_k,
+        c_a,
+        s_k,
+        s_of_c,
+        s_uf_a,
+        s_uf_c,
+        g_cap,
+        k_v,
+        g_k,
+        g_e_cap,
+        d_e_a,
+        s_uf_shutdown,
+        s_of_a_eff,
+    ):
+        """
+        Solve one time step (Euler Method). Flows are set at ``t`` and levels at ``t + 1``.
 
-        # full global processes data is a dataframe with numpy arrays
-        gb = self.sdata
+        .. note::
 
-        #
-        # ---------------- parameters variables ----------------
-        # this section is for improving code readability only
+            Rows of ``gb`` arrays may be scalars or 1d arrays (members or
+            cells), with parameters as scalars or matching 1d arrays.
 
-        # [Canopy] canopy parameters
-        c_k = self.params["ck"][self.datakey]
-        c_a = self.params["ca"][self.datakey]
+        :param gb: simulation arrays, updated in place
+        :type gb: dict
+        :param t: time step index
+        :type t: int
+        :param dt: time step factor
+        :type dt: float
+        :return: None
+        :rtype: None
+        """
+        #
+        # [Deficit] ---------- update deficits ---------- #
+        #
 
-        # [Surface] surface parameters
-        s_k = self.params["sk"][self.datakey]
-        s_of_a = self.params["sofa"][self.datakey]
-        s_of_c = self.params["sofc"][self.datakey]
-        s_uf_a = self.params["sufa"][self.datakey]
-        s_uf_c = self.params["sufc"][self.datakey]
-        s_uf_cap = self.params["sufcap"][self.datakey]
+        # [Deficit] Phreatic zone deficit
+        gb["d"][t] = UpscaledModel.compute_d(g_cap=g_cap, g=gb["g"][t])
 
-        # [Soil] soil parameters
-        g_cap = self.params["gcap"][self.datakey]
-        k_v = self.params["kv"][self.datakey]
-        g_k = self.params["gk"][self.datakey]
-        g_e_cap = self.params["ecap"][self.datakey]
-        d_e_a = self.params["dea"][self.datakey]
+        # [Deficit] Vadose zone deficit
+        gb["dv"][t] = UpscaledModel.compute_dv(d=gb["d"][t], v=gb["v"][t])
 
         #
-        # ---------------- derived parameter variables ----------------
+        # [Evaporation] ---------- get evaporation flows first ---------- #
         #
 
-        # [Surface] Conpute shutdown factor for underland flow
-        s_uf_shutdown = UpscaledModel.compute_s_uf_shutdown(s_uf_cap, s_uf_a)
+        # [Evaporation] [Canopy] ---- evaporation from canopy
 
-        # [Surface] Compute effective overland flow activation level
-        s_of_a_eff = UpscaledModel.compute_sof_a_eff(s_uf_cap, s_of_a)
+        # [Evaporation] [Canopy] compute potential flow
+        e_c_pot = UpscaledModel.compute_ec_pot(e_pot=gb["e_pot"][t])
 
-        #
-        # ---------------- testing features ----------------
-        #
+        # [Evaporation] [Canopy] compute capacity flow
+        e_c_cap = UpscaledModel.compute_ec_cap(c=gb["c"][t], dt=dt)
 
-        # [Testing feature] shutdown E_pot
-        if self.shutdown_epot:
-            gb["e_pot"] = np.full(self.slen, 0.0)
+        # [Evaporation] [Canopy] compute actual flow
+        gb["ec"][t] = UpscaledModel.compute_ec(e_c_pot, e_c_cap)
 
-        #
-        # ---------------- numerical solution ----------------
-        #
+        # [Evaporation] [Soil] ---- transpiration from soil
 
-        # ---------------- START TIME LOOP ---------------- #
-        # loop over steps (Euler Method)
-        for t in range(self.n_steps - 1):
-            #
-            # [Deficit] ---------- update deficits ---------- #
-            #
+        # [Evaporation] [Soil] compute potential flow
+        e_t_pot = UpscaledModel.compute_et_pot(e_pot=gb["e_pot"][t], ec=gb["ec"][t])
 
-            # [Deficit] Phreatic zone deficit
-            gb["d"][t] = UpscaledModel.compute_d(g_cap=g_cap, g=gb["g"][t])
+        # [Evaporation] [Soil] compute the root zone depth factor
+        gb["egf"][t] = UpscaledModel.compute_et_f(dv=gb["dv"][t], d_et_a=d_e_a)
 
-            # [Deficit] Vadose zone deficit
-            gb["dv"][t] = UpscaledModel.compute_dv(d=gb["d"][t], v=gb["v"][t])
+        # [Evaporation] [Soil] compute capacity flow
+        e_t_cap = UpscaledModel.compute_et_cap(
+            e_t_f=gb["egf"][t], g=gb["g"][t], g_et_cap=g_e_cap, dt=dt
+        )
 
-            #
-            # [Evaporation] ---------- get evaporation flows first ---------- #
-            #
+        # [Evaporation] [Soil] compute actual flow
+        gb["eg"][t] = UpscaledModel.compute_et(e_t_pot, e_t_cap)
 
-            # [Evaporation] [Canopy] ---- evaporation from canopy
+        # [Evaporation] [Surface] ---- evaporation from surface
 
-            # [Evaporation] [Canopy] compute potential flow
-            e_c_pot = UpscaledModel.compute_ec_pot(e_pot=gb["e_pot"][t])
+        # [Evaporation] [Surface] compute potential flow
+        e_s_pot = UpscaledModel.compute_es_pot(
+            e_pot=gb["e_pot"][t], ec=gb["ec"][t], et=gb["eg"][t]
+        )
 
-            # [Evaporation] [Canopy] compute capacity flow
-            e_c_cap = UpscaledModel.compute_ec_cap(c=gb["c"][t], dt=dt)
+        # [Evaporation] [Surface] compute capacity flow
+        e_s_cap = UpscaledModel.compute_es_cap(s=gb["s"][t], dt=dt)
 
-            # [Evaporation] [Canopy] compute actual flow
-            gb["ec"][t] = UpscaledModel.compute_ec(e_c_pot, e_c_cap)
+        # [Evaporation] [Surface] compute actual flow
+        gb["es"][t] = UpscaledModel.compute_es(e_s_pot, e_s_cap)
 
-            # [Evaporation] [Soil] ---- transpiration from soil
+        #
+        # [Evaporation] [Balance] ---- a priori discounts ---------- #
+        #
 
-            # [Evaporation] [Soil] compute potential flow
-            e_t_pot = UpscaledModel.compute_et_pot(e_pot=gb["e_pot"][t], ec=gb["ec"][t])
+        # [Evaporation] [Balance] -- apply discount a priori
+        gb["c"][t] = UpscaledModel.compute_e_discount(
+            storage=gb["c"][t], discount=gb["ec"][t]
+        )
 
-            # [Evaporation] [Soil] compute the root zone depth factor
-            gb["egf"][t] = UpscaledModel.compute_et_f(dv=gb["dv"][t], d_et_a=d_e_a)
+        # [Evaporation] [Balance] -- apply discount a priori
+        gb["g"][t] = UpscaledModel.compute_e_discount(
+            storage=gb["g"][t], discount=gb["eg"][t]
+        )
 
-            # [Evaporation] [Soil] compute capacity flow
-            e_t_cap = UpscaledModel.compute_et_cap(
-                e_t_f=gb["egf"][t], g=gb["g"][t], g_et_cap=g_e_cap, dt=dt
-            )
+        # [Evaporation] [Balance] water balance -- apply discount a priori
+        gb["s"][t] = UpscaledModel.compute_e_discount(
+            storage=gb["s"][t], discount=gb["es"][t]
+        )
 
-            # [Evaporation] [Soil] compute actual flow
-            gb["eg"][t] = UpscaledModel.compute_et(e_t_pot, e_t_cap)
+        #
+        # [Canopy] ---------- Solve canopy water balance ---------- #
+        #
 
-            # [Evaporation] [Surface] ---- evaporation from surface
+        # [Canopy] [Throughfall] --
 
-            # [Evaporation] [Surface] compute potential flow
-            e_s_pot = UpscaledModel.compute_es_pot(
-                e_pot=gb["e_pot"][t], ec=gb["ec"][t], et=gb["eg"][t]
-            )
+        # [Canopy] [Throughfall] Compute throughfall fraction
+        gb["ptff"][t] = UpscaledModel.compute_tf_f(c=gb["c"][t], ca=c_a)
 
-            # [Evaporation] [Surface] compute capacity flow
-            e_s_cap = UpscaledModel.compute_es_cap(s=gb["s"][t], dt=dt)
+        # [Canopy] [Throughfall] Compute throughfall capacity
+        p_tf_cap = UpscaledModel.compute_tf_cap(
+            c=gb["c"][t], ca=c_a, p=gb["p"][t], dt=dt
+        )
 
-            # [Evaporation] [Surface] compute actual flow
-            gb["es"][t] = UpscaledModel.compute_es(e_s_pot, e_s_cap)
+        # [Canopy] [Throughfall] Compute throughfall
+        gb["ptf"][t] = UpscaledModel.compute_tf(p_tf_cap=p_tf_cap, p_tf_f=gb["ptff"][t])
 
-            #
-            # [Evaporation] [Balance] ---- a priori discounts ---------- #
-            #
+        # [Canopy] [Stemflow] --
 
-            # [Evaporation] [Balance] -- apply discount a priori
-            gb["c"][t] = UpscaledModel.compute_e_discount(
-                storage=gb["c"][t], discount=gb["ec"][t]
-            )
+        # [Canopy] [Stemflow] Compute potential stemflow -- only activated storage contributes
+        c_sf_pot = UpscaledModel.compute_sf_pot(c=gb["c"][t], ca=c_a)
 
-            # [Evaporation] [Balance] -- apply discount a priori
-            gb["g"][t] = UpscaledModel.compute_e_discount(
-                storage=gb["g"][t], discount=gb["eg"][t]
-            )
+        # [Canopy] [Stemflow] Compute actual stemflow
+        gb["psf"][t] = compute_decay(s=c_sf_pot, dt=dt, k=c_k)
 
-            # [Evaporation] [Balance] water balance -- apply discount a priori
-            gb["s"][t] = UpscaledModel.compute_e_discount(
-                storage=gb["s"][t], discount=gb["es"][t]
-            )
+        # [Canopy] [Aggflows] --
 
-            #
-            # [Canopy] ---------- Solve canopy water balance ---------- #
-            #
+        # [Canopy] [Aggflows] Compute effective rain on surface
+        gb["ps"][t] = UpscaledModel.compute_ps(sf=gb["psf"][t], tf=gb["ptf"][t])
 
-            # [Canopy] [Throughfall] --
+        # [Canopy] [Aggflows] Compute effective rain on canopy
+        gb["pc"][t] = UpscaledModel.compute_pc(p=gb["p"][t], tf_f=gb["ptff"][t])
 
-            # [Canopy] [Throughfall] Compute throughfall fraction
-            gb["ptff"][t] = UpscaledModel.compute_tf_f(c=gb["c"][t], ca=c_a)
+        # [Canopy] [Water Balance] ---- Apply water balance
+        gb["c"][t + 1] = UpscaledModel.compute_next_c(
+            c=gb["c"][t], pc=gb["pc"][t], sf=gb["psf"][t]
+        )
 
-            # [Canopy] [Throughfall] Compute throughfall capacity
-            p_tf_cap = UpscaledModel.compute_tf_cap(
-                c=gb["c"][t], ca=c_a, p=gb["p"][t], dt=dt
-            )
+        #
+        # [Surface] ---------- Solve surface water balance ---------- #
+        #
 
-            # [Canopy] [Throughfall] Compute throughfall
-            gb["ptf"][t] = UpscaledModel.compute_tf(
-                p_tf_cap=p_tf_cap, p_tf_f=gb["ptff"][t]
-            )
+        # [Surface] [Overland] -- Overland flow
 
-            # [Canopy] [Stemflow] --
+        # [Surface] [Overland] Compute surface overland spill storage capacity
+        sof_ss_cap = UpscaledModel.compute_sof_cap(s=gb["s"][t], sof_a=s_of_a_eff)
 
-            # [Canopy] [Stemflow] Compute potential stemflow -- only activated storage contributes
-            c_sf_pot = UpscaledModel.compute_sf_pot(c=gb["c"][t], ca=c_a)
+        # [Surface] [Overland] Compute overland flow fraction
+        gb["qoff"][t] = UpscaledModel.compute_qof_f(sof_cap=sof_ss_cap, sof_c=s_of_c)
 
-            # [Canopy] [Stemflow] Compute actual stemflow
-            gb["psf"][t] = compute_decay(s=c_sf_pot, dt=dt, k=c_k)
+        # [Surface] [Overland] Compute overland flow capacity
+        q_of_cap = UpscaledModel.compute_qof_cap(
+            sof_cap=sof_ss_cap, ps=gb["ps"][t], dt=dt
+        )
 
-            # [Canopy] [Aggflows] --
+        # [Surface] [Overland] Compute potential overland
+        q_of_pot = UpscaledModel.compute_qof_pot(qof_cap=q_of_cap, qof_f=gb["qoff"][t])
 
-            # [Canopy] [Aggflows] Compute effective rain on surface
-            gb["ps"][t] = UpscaledModel.compute_ps(sf=gb["psf"][t], tf=gb["ptf"][t])
+        # [Surface] [Underland] -- Underland flow
 
-            # [Canopy] [Aggflows] Compute effective rain on canopy
-            gb["pc"][t] = UpscaledModel.compute_pc(p=gb["p"][t], tf_f=gb["ptff"][t])
+        # [Surface] [Underland] Compute surface underland spill storage capacity
+        suf_ss_cap = UpscaledModel.compute_suf_cap(
+            s=gb["s"][t], suf_a=s_uf_a, shutdown=s_uf_shutdown
+        )
 
-            # [Canopy] [Water Balance] ---- Apply water balance
-            gb["c"][t + 1] = UpscaledModel.compute_next_c(
-                c=gb["c"][t], pc=gb["pc"][t], sf=gb["psf"][t]
-            )
+        # [Surface] [Underland] Compute underland flow fraction
+        gb["quff"][t] = UpscaledModel.compute_quf_f(suf_cap=suf_ss_cap, suf_c=s_uf_c)
 
-            #
-            # [Surface] ---------- Solve surface water balance ---------- #
-            #
+        # [Surface] [Underland] Compute underland flow capacity
+        q_uf_cap = UpscaledModel.compute_quf_cap(suf_cap=suf_ss_cap, dt=dt)
 
-            # [Surface] [Overland] -- Overland flow
+        # [Surface] [Underland] Compute potential underland flow
+        q_uf_pot = UpscaledModel.compute_quf_pot(quf_cap=q_uf_cap, quf_f=gb["quff"][t])
 
-            # [Surface] [Overland] Compute surface overland spill storage capacity
-            sof_ss_cap = UpscaledModel.compute_sof_cap(s=gb["s"][t], sof_a=s_of_a_eff)
+        # [Surface] [Infiltration] -- Infiltration flow
 
-            # [Surface] [Overland] Compute overland flow fraction
-            gb["qoff"][t] = UpscaledModel.compute_qof_f(
-                sof_cap=sof_ss_cap, sof_c=s_of_c
-            )
+        # [Surface] [Infiltration] -- Potential infiltration from downstream (soil)
+        q_if_pot_down = UpscaledModel.compute_qif_pot_down(
+            d=gb["d"][t], v=gb["v"][t], dt=dt
+        )
 
-            # [Surface] [Overland] Compute overland flow capacity
-            q_of_cap = UpscaledModel.compute_qof_cap(
-                sof_cap=sof_ss_cap, ps=gb["ps"][t], dt=dt
-            )
+        # [Surface] [Infiltration] -- Potential infiltration from upstream (hydraulic head)
+        q_if_pot_up = UpscaledModel.compute_qif_pot_up(s=gb["s"][t], sk=s_k, dt=dt)
 
-            # [Surface] [Overland] Compute potential overland
-            q_of_pot = UpscaledModel.compute_qof_pot(
-                qof_cap=q_of_cap, qof_f=gb["qoff"][t]
-            )
+        # [Surface] [Infiltration] -- Potential infiltration
+        q_if_pot = UpscaledModel.compute_qif_pot(
+            if_down=q_if_pot_down, if_up=q_if_pot_up
+        )
 
-            # [Surface] [Underland] -- Underland flow
+        # [Testing feature]
+        if self.shutdown_qif:
+            q_if_pot = 0.0 * q_if_pot
 
-            # [Surface] [Underland] Compute surface underland spill storage capacity
-            suf_ss_cap = UpscaledModel.compute_suf_cap(
-                s=gb["s"][t], suf_a=s_uf_a, shutdown=s_uf_shutdown
-            )
+        # [Surface] -- Full potential outflow
+        s_out_pot = q_of_pot + q_uf_pot + q_if_pot
 
-            # [Surface] [Underland] Compute underland flow fraction
-            gb["quff"][t] = UpscaledModel.compute_quf_f(
-                suf_cap=suf_ss_cap, suf_c=s_uf_c
-            )
+        # [Surface] ---- Actual flows
+
+        # [Surface] Compute surface outflow capacity
+        s_out_cap = gb["s"][t]
 
-            # [Surface] [Underland] Compute underland flow capacity
-            q_uf_cap = UpscaledModel.compute_quf_cap(suf_cap=suf_ss_cap, dt=dt)
+        # [Surface] Compute Actual outflow
+        s_out_act = np.where(s_out_cap > s_out_pot, s_out_pot, s_out_cap)
 
-            # [Surface] [Underland] Compute potential underland flow
-            q_uf_pot = UpscaledModel.compute_quf_pot(
-                quf_cap=q_uf_cap, quf_f=gb["quff"][t]
+        # [Surface] Allocate outflows
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gb["qof"][t] = s_out_act * np.where(
+                s_out_pot == 0.0, 0.0, q_of_pot / s_out_pot
+            )
+            gb["quf"][t] = s_out_act * np.where(
+                s_out_pot == 0.0, 0.0, q_uf_pot / s_out_pot
+            )
+            gb["qif"][t] = s_out_act * np.where(
+                s_out_pot == 0.0, 0.0, q_if_pot / s_out_pot
             )
 
-            # [Surface] [Infiltration] -- Infiltration flow
+        # [Surface Water Balance] ---- Apply water balance.
+        gb["s"][t + 1] = UpscaledModel.compute_next_s(
+            s=gb["s"][t],
+            ps=gb["ps"][t],
+            qof=gb["qof"][t],
+            quf=gb["quf"][t],
+            qif=gb["qif"][t],
+        )
 
-            # [Surface] [Infiltration] -- Potential infiltration from downstream (soil)
-            q_if_pot_down = UpscaledModel.compute_qif_pot_down(
-                d=gb["d"][t], v=gb["v"][t], dt=dt
-            )
+        #
+        # [Soil] ---------- Solve soil water balance ---------- #
+        #
 
-            # [Surface] [Infiltration] -- Potential infiltration from upstream (hydraulic head)
-            q_if_pot_up = UpscaledModel.compute_qif_pot_up(s=gb["s"][t], sk=s_k, dt=dt)
+        # [Soil Vadose Zone]
 
-            # [Surface] [Infiltration] -- Potential infiltration
-            q_if_pot = UpscaledModel.compute_qif_pot(
-                if_down=q_if_pot_down, if_up=q_if_pot_up
-            )
+        # [Soil Vadose Zone] Get Recharge Fraction
+        gb["qvff"][t] = UpscaledModel.compute_qvf_f(d=gb["d"][t], v=gb["v"][t])
 
-            # [Testing feature]
-            if self.shutdown_qif:
-                q_if_pot = 0.0 * q_if_pot
+        # [Soil Vadose Zone] Compute Potential Recharge
+        q_vf_pot = UpscaledModel.compute_qvf_pot(qvf_f=gb["qvff"][t], kv=k_v, dt=dt)
 
-            # [Surface] -- Full potential outflow
-            s_out_pot = q_of_pot + q_uf_pot + q_if_pot
+        # [Soil Vadose Zone] Compute Maximal Recharge
+        q_vf_cap = UpscaledModel.compute_qvf_cap(v=gb["v"][t], dt=dt)
 
-            # [Surface] ---- Actual flows
+        # [Soil Vadose Zone] Compute Actual Recharge
+        gb["qvf"][t] = UpscaledModel.compute_qvf(qvf_pot=q_vf_pot, qvf_cap=q_vf_cap)
 
-            # [Surface] Compute surface outflow capacity
-            s_out_cap = gb["s"][t]
+        # [Vadose Water Balance] ---- Apply water balance
+        gb["v"][t + 1] = UpscaledModel.compute_next_v(
+            v=gb["v"][t], qif=gb["qif"][t], qvf=gb["qvf"][t]
+        )
 
-            # [Surface] Compute Actual outflow
-            s_out_act = np.where(s_out_cap > s_out_pot, s_out_pot, s_out_cap)
+        # [Soil Phreatic Zone]
 
-            # [Surface] Allocate outflows
-            with np.errstate(divide="ignore", invalid="ignore"):
-                gb["qof"][t] = s_out_act * np.where(
-                    s_out_pot == 0.0, 0.0, q_of_pot / s_out_pot
-                )
-                gb["quf"][t] = s_out_act * np.where(
-                    s_out_pot == 0.0, 0.0, q_uf_pot / s_out_pot
-                )
-                gb["qif"][t] = s_out_act * np.where(
-                    s_out_pot == 0.0, 0.0, q_if_pot / s_out_pot
-                )
+        # [Soil Phreatic Zone] Compute Base flow (blue water -- discount on green water)
+        # gb["qgf"][t] = (np.max([gb["g"][t] - g_et_cap, 0.0])) * dt / g_k
+        gb["qgf"][t] = UpscaledModel.compute_qgf(
+            g=gb["g"][t], get_cap=g_e_cap, gk=g_k, dt=dt
+        )
 
-            # [Surface Water Balance] ---- Apply water balance.
-            gb["s"][t + 1] = UpscaledModel.compute_next_s(
-                s=gb["s"][t],
-                ps=gb["ps"][t],
-                qof=gb["qof"][t],
-                quf=gb["quf"][t],
-                qif=gb["qif"][t],
-            )
+        # [Testing feature]
+        if self.shutdown_qbf:
+            gb["qgf"][t] = 0.0 * gb["qgf"][t]
 
-            #
-            # [Soil] ---------- Solve soil water balance ---------- #
-            #
+        # [Phreatic Water Balance] ---- Apply water balance
+        gb["g"][t + 1] = UpscaledModel.compute_next_g(
+            g=gb["g"][t], qvf=gb["qvf"][t], qgf=gb["qgf"][t]
+        )
+
+        return None
 
-            # [Soil Vadose Zone]
+    def _solve_kernel(self, dt, gb=None, n_steps=None, **params):
+        """
+        Run the time loop with the fused kernel from :mod:`plans.hydrology.kernels`.
 
-            # [Soil Vadose Zone] Get Recharge Fraction
-            gb["qvff"][t] = UpscaledModel.compute_qvf_f(d=gb["d"][t], v=gb["v"][t])
+        .. note::
 
-            # [Soil Vadose Zone] Compute Potential Recharge
-            q_vf_pot = UpscaledModel.compute_qvf_pot(qvf_f=gb["qvff"][t], kv=k_v, dt=dt)
+            Scalars are passed as :class:`numpy.float64` so the pure-Python
+            fallback keeps NumPy semantics for divisions by zero.
 
-            # [Soil Vadose Zone] Compute Maximal Recharge
-            q_vf_cap = UpscaledModel.compute_qvf_cap(v=gb["v"][t], dt=dt)
+        :param dt: time step factor
+        :type dt: float
+        :param gb: [optional] simulation arrays, updated in place. Default is ``sdata``
+        :type gb: dict
+        :param n_steps: [optional] number of rows of arrays. Default is ``n_steps`` of model
+        :type n_steps: int
+        :param params: model parameters and derived parameters, named as in ``solve()``
+        :type params: dict
+        :return: None
+        :rtype: None
+        """
+        from plans.hydrology import kernels
 
-            # [Soil Vadose Zone] Compute Actual Recharge
-            gb["qvf"][t] = UpscaledModel.compute_qvf(qvf_pot=q_vf_pot, qvf_cap=q_vf_cap)
+        if gb is None:
+            gb = self.sdata
+        if n_steps is None:
+            n_steps = self.n_steps
+        kernel = kernels.get_kernel("upscaled", compiled=True)
 
-            # [Vadose Water Balance] ---- Apply water balance
-            gb["v"][t + 1] = UpscaledModel.compute_next_v(
-                v=gb["v"][t], qif=gb["qif"][t], qvf=gb["qvf"][t]
-            )
+        # inputs must be contiguous float arrays
+        p = np.ascontiguousarray(gb["p"], dtype=gb["c"].dtype)
+        e_pot = np.ascontiguousarray(gb["e_pot"], dtype=gb["c"].dtype)
 
-            # [Soil Phreatic Zone]
+        # simulation arrays are updated in place
+        arrays = [gb[v] for v in kernels.UPSCALED_VARS]
+        scalars = {k: np.float64(params[k]) for k in params}
 
-            # [Soil Phreatic Zone] Compute Base flow (blue water -- discount on green water)
-            # gb["qgf"][t] = (np.max([gb["g"][t] - g_et_cap, 0.0])) * dt / g_k
-            gb["qgf"][t] = UpscaledModel.compute_qgf(
-                g=gb["g"][t], get_cap=g_e_cap, gk=g_k, dt=dt
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kernel(
+                p,
+                e_pot,
+                *arrays,
+                **scalars,
+                dt=np.float64(dt),
+                n_steps=int(n_steps),
+                shutdown_qif=bool(self.shutdown_qif),
+                shutdown_qbf=bool(self.shutdown_qbf),
             )
+        return None
+
+    @profiled("solve")
+    def solve(self):
+        """
+        Solve the model for inputs and initial conditions by numerical methods.
 
-            # [Testing feature]
-            if self.shutdown_qbf:
-                gb["qgf"][t] = 0.0 * gb["qgf"][t]
+        .. warning::
 
-            # [Phreatic Water Balance] ---- Apply water balance
-            gb["g"][t + 1] = UpscaledModel.compute_next_g(
-                g=gb["g"][t], qvf=gb["qvf"][t], qgf=gb["qgf"][t]
-            )
+            This method overwrites model data.
 
-            # ---------------- END TIME LOOP ---------------- #
+        :return: None
+        :rtype: None
+        """
+
+        #
+        # ---------------- simulation setup ----------------
+        #
+
+        # dt is the fraction of 1 Day/(1 simulation time step)
+        dt = self.params["dt"]["value"]
+
+        # full global processes data is a dataframe with numpy arrays
+        gb = self.sdata
+
+        #
+        # ---------------- testing features ----------------
+        #
+
+        # [Testing feature] shutdown E_pot
+        if self.shutdown_epot:
+            gb["e_pot"] = self.get_empty_series(0.0)
+
+        #
+        # ---------------- numerical solution ----------------
+        #
+
+        # ---------------- time loop ---------------- #
+        self._solve_time(dt=dt, **self._get_solve_params(dt=dt))
 
         #
         # [Total Flows] ---------- compute total flows ---------- #
         #
 
         # [Total Flows] Total E
-        gb["e"] = UpscaledModel.compute_e(ec=gb["ec"], es=gb["es"], eg=gb["eg"])
+        if "e" in gb:
+            gb["e"] = UpscaledModel.compute_e(ec=gb["ec"], es=gb["es"], eg=gb["eg"])
 
         # [Total Flows] Compute Hillslope flow
-        gb["qhf"] = UpscaledModel.compute_qhf(
-            qof=gb["qof"], quf=gb["quf"], qgf=gb["qgf"]
-        )
+        if "qhf" in gb:
+            gb["qhf"] = UpscaledModel.compute_qhf(
+                qof=gb["qof"], quf=gb["quf"], qgf=gb["qgf"]
+            )
 
         #
         # [Streamflow] ---------- Solve flow routing to basin gauge station ---------- #
         #
+        self._solve_routing(gb=gb)
+
+        # set data (arrays are not copied)
+        with self._profile("output"):
+            self.data = pd.DataFrame(gb, copy=False)
+
+        return None
+
+    @profiled("params")
+    def _get_solve_params(self, dt):
+        """
+        Get the model parameters and derived parameters of the time loop.
+
+        :param dt: time step factor
+        :type dt: float
+        :return: parameters named as in ``_solve_step()``
+        :rtype: dict
+        """
+        # [Canopy] canopy parameters
+        c_k = get_decay_k(k=self.params["ck"][self.datakey], dt=dt, scheme=self.scheme)
+        c_a = self.params["ca"][self.datakey]
+
+        # [Surface] surface parameters
+        s_k = self.params["sk"][self.datakey]
+        s_of_a = self.params["sofa"][self.datakey]
+        s_of_c = self.params["sofc"][self.datakey]
+        s_uf_a = self.params["sufa"][self.datakey]
+        s_uf_c = self.params["sufc"][self.datakey]
+        s_uf_cap = self.params["sufcap"][self.datakey]
+
+        # [Soil] soil parameters
+        g_cap = self.params["gcap"][self.datakey]
+        k_v = self.params["kv"][self.datakey]
+        g_k = get_decay_k(k=self.params["gk"][self.datakey], dt=dt, scheme=self.scheme)
+        g_e_cap = self.params["ecap"][self.datakey]
+        d_e_a = self.params["dea"][self.datakey]
+
+        #
+        # ---------------- derived parameter variables ----------------
+        #
+
+        # [Surface] Conpute shutdown factor for underland flow
+        s_uf_shutdown = UpscaledModel.compute_s_uf_shutdown(s_uf_cap, s_uf_a)
+
+        # [Surface] Compute effective overland flow activation level
+        s_of_a_eff = UpscaledModel.compute_sof_a_eff(s_uf_cap, s_of_a)
+
+        return {
+            "c_k": c_k,
+            "c_a": c_a,
+            "s_k": s_k,
+            "s_of_c": s_of_c,
+            "s_uf_a": s_uf_a,
+            "s_uf_c": s_uf_c,
+            "g_cap": g_cap,
+            "k_v": k_v,
+            "g_k": g_k,
+            "g_e_cap": g_e_cap,
+            "d_e_a": d_e_a,
+            "s_uf_shutdown": s_uf_shutdown,
+            "s_of_a_eff": s_of_a_eff,
+        }
+
+    def _get_solver(self):
+        """
+        Get the time loop method of the selected engine (see ``engine``).
+
+        :return: time loop method
+        :rtype: callable
+        """
+        if self.engine == "compiled":
+            # fused kernel over plain arrays (compiled if numba is available)
+            return self._solve_kernel
+        elif self.engine == "python":
+            # reference loop
+            return self._solve_loop
+        raise ValueError(
+            f"Engine '{self.engine}' not available. Use 'python' or 'compiled'"
+        )
+
+    @profiled("loop")
+    def _solve_time(self, dt, gb=None, solver=None, **params):
+        """
+        Run the time loop with the selected engine (see ``engine``).
+
+        .. note::
+
+            Variables not kept in simulation data (see ``get_output_vars()``)
+            are solved over rolling buffers of ``SOLVE_CHUNK`` steps, so memory
+            use does not grow with the simulation length. Kept variables are
+            solved in place over views of the full series.
+
+        :param dt: time step factor
+        :type dt: float
+        :param gb: [optional] simulation arrays (time first). Default is ``sdata``
+        :type gb: dict
+        :param solver: [optional] time loop method. Default is set by ``engine``
+        :type solver: callable
+        :param params: model parameters and derived parameters, named as in ``solve()``
+        :type params: dict
+        :return: None
+        :rtype: None
+        """
+        from plans.hydrology import kernels
+
+        # ---------------- select engine ---------------- #
+        if solver is None:
+            solver = self._get_solver()
+
+        if gb is None:
+            gb = self.sdata
+        ls_buffers = [v for v in kernels.UPSCALED_VARS if v not in gb]
+        if len(ls_buffers) == 0:
+            solver(gb=gb, dt=dt, n_steps=self.n_steps, **params)
+            return None
+
+        # ---------------- rolling buffers ---------------- #
+        ls_series = ["p", "e_pot"] + [v for v in kernels.UPSCALED_VARS if v in gb]
+        # buffers get the extra axes of levels (e.g. ensemble members)
+        shp = (SOLVE_CHUNK + 1,) + np.shape(gb["c"])[1:]
+        buffers = {v: np.full(shp, np.nan, dtype=gb["c"].dtype) for v in ls_buffers}
+        # chunks share their boundary row (levels at t + 1 of one chunk are the start of the next)
+        for t0 in range(0, self.n_steps - 1, SOLVE_CHUNK):
+            t1 = min(t0 + SOLVE_CHUNK, self.n_steps - 1)
+            n = t1 - t0 + 1
+            chunk = {v: gb[v][t0 : t1 + 1] for v in ls_series}
+            chunk.update({v: buffers[v][:n] for v in ls_buffers})
+            solver(gb=chunk, dt=dt, n_steps=n, **params)
+            # move last row to the start of the next chunk
+            for v in ls_buffers:
+                buffers[v][0] = buffers[v][n - 1]
+        return None
+
+    def _get_routing_inflows(self, gb):
+        """
+        Get the inflows routed to the basin gauge station.
+
+        :param gb: simulation arrays
+        :type gb: dict
+        :return: dict of inflow arrays keyed by ``qbf`` (base flow) and ``qff`` (fast flow)
+        :rtype: dict
+        """
+        return {
+            "qbf": gb["qgf"],
+            # todo [feature] evaluate to split into more components
+            "qff": gb["quf"] + gb["qof"],
+        }
+
+    def _get_routing_memory(self, key):
+        """
+        Get the routing memory of an inflow from the checkpoint.
 
+        :param key: inflow key (see ``_get_routing_inflows()``)
+        :type key: str
+        :return: routing memory or None in cold starts
+        :rtype: :class:`numpy.ndarray` or None
+        """
+        if self.checkpoint is None:
+            return None
+        return self.checkpoint[f"routing_{key}"]
+
+    @profiled("routing")
+    def _solve_routing(self, gb):
+        """
+        Solve flow routing to the basin gauge station.
+
+        Base flow and fast flow are routed in one batched convolution.
+
+        :param gb: simulation arrays
+        :type gb: dict
+        :return: None
+        :rtype: None
+        """
+        # routed flows are not kept in outputs
+        if "q" not in gb and "qbf" not in gb:
+            return None
         # global basin is considered the first
         basin = self.basins_ls[0]
+        dc_inflow = self._get_routing_inflows(gb)
+        ls_keys = list(dc_inflow.keys())
+
+        # routing memory of warm starts
+        memory = None
+        if self.checkpoint is not None:
+            memory = np.stack([self._get_routing_memory(k) for k in ls_keys])
 
-        # [Baseflow] Compute river base flow
-        vct_inflow = gb["qgf"]
-        gb["qbf"] = UpscaledModel.propagate_inflow(
-            inflow=vct_inflow,
+        # [Streamflow] route all components at once (components x time)
+        q_routed = UpscaledModel.propagate_inflow(
+            inflow=np.stack([dc_inflow[k] for k in ls_keys]),
             unit_hydrograph=self.data_guh[basin].values,
+            memory=memory,
+            method=self.routing_method,
         )
+        dc_routed = dict(zip(ls_keys, q_routed.astype(self.dtype, copy=False)))
+
+        # [Baseflow] river base flow
+        if "qbf" in gb:
+            gb["qbf"] = dc_routed["qbf"]
 
         # [Fast Streamflow] Compute Streamflow
-        # todo [feature] evaluate to split into more components
-        vct_inflow = gb["quf"] + gb["qof"]
-        q_fast = UpscaledModel.propagate_inflow(
-            inflow=vct_inflow, unit_hydrograph=self.data_guh[basin].values
-        )
-        gb["q"] = gb["qbf"] + q_fast
+        if "q" in gb:
+            gb["q"] = dc_routed["qbf"] + dc_routed["qff"]
+        return None
+
+    def start_stream(self):
+        """
+        Start a stepwise (online) simulation, for forcing received one step at a time.
+
+        The stream starts from the initial conditions of ``setup()``, including
+        warm starts from a checkpoint. Routing keeps a rolling buffer of the
+        outflow still to come, so each step costs one pass over the GUH support.
 
-        # set data
-        self.data = pd.DataFrame(gb)
+        .. note::
 
+            Expected to be called after ``setup()``. The GUH is taken over its
+            full support (see ``get_guh_support()``), so streams may run past
+            the setup period. Steps driven with the same forcing match
+            ``solve()`` with the ``direct`` routing method (other methods match
+            to round-off). Missing inflow (NaN) is propagated to all later
+            outflow, as in ``convolve_uh()``.
+
+        :return: None
+        :rtype: None
+        """
+        dt = self.params["dt"]["value"]
+        # untruncated GUH (not clipped to the setup period)
+        vct_guh = self.get_guh_support()[0]
+        uh = get_uh_support(vct_guh / np.sum(vct_guh))
+
+        # routing buffers start from the memory of warm starts
+        dc_routing = {}
+        for k in ("qbf", "qff"):
+            memory = self._get_routing_memory(k)
+            n_mem = 0 if memory is None else memory.shape[-1]
+            dc_routing[k] = np.zeros(max(len(uh), n_mem), dtype=np.float64)
+            if memory is not None:
+                dc_routing[k][:n_mem] = memory
+
+        self.stream = {
+            "step": 0,
+            "dt": dt,
+            "params": self._get_solve_params(dt=dt),
+            "levels": {v: self.sdata[v][0] for v in CHECKPOINT_LEVELS},
+            "uh": uh,
+            "routing": dc_routing,
+            # routed flows with missing inflow so far
+            "missing": set(),
+        }
         return None
 
+    def step(self, p, e_pot):
+        """
+        Solve one time step of the stepwise (online) simulation.
+
+        Flows are solved from the current storage levels, which are then
+        updated for the next step.
+
+        .. note::
+
+            The stream is started from the initial conditions if not
+            started yet (see ``start_stream()``).
+
+        :param p: precipitation of the step
+        :type p: float
+        :param e_pot: potential evapotranspiration of the step
+        :type e_pot: float
+        :return: dict of variables of the step (as a row of ``solve()`` data), including ``e``, ``qhf``, ``qbf`` and ``q``
+        :rtype: dict
+        """
+        from plans.hydrology import kernels
+
+        if self.stream is None:
+            self.start_stream()
+        st = self.stream
+
+        # [Testing feature] shutdown E_pot
+        if self.shutdown_epot:
+            e_pot = 0.0
+
+        # ---------------- two-row simulation arrays ---------------- #
+        # flows are set at the first row and levels at the second
+        gb = {v: np.full(2, np.nan, dtype=self.dtype) for v in kernels.UPSCALED_VARS}
+        gb["p"] = np.array([p, np.nan], dtype=self.dtype)
+        gb["e_pot"] = np.array([e_pot, np.nan], dtype=self.dtype)
+        for v in CHECKPOINT_LEVELS:
+            gb[v][0] = st["levels"][v]
+
+        # ---------------- numerical solution ---------------- #
+        solver = self._get_solver()
+        solver(gb=gb, dt=st["dt"], n_steps=2, **st["params"])
+        dc_step = {v: gb[v][0] for v in kernels.UPSCALED_VARS}
+        for v in CHECKPOINT_LEVELS:
+            st["levels"][v] = gb[v][1]
+
+        # [Total Flows] ---------- compute total flows ---------- #
+        dc_step["e"] = UpscaledModel.compute_e(
+            ec=dc_step["ec"], es=dc_step["es"], eg=dc_step["eg"]
+        )
+        dc_step["qhf"] = UpscaledModel.compute_qhf(
+            qof=dc_step["qof"], quf=dc_step["quf"], qgf=dc_step["qgf"]
+        )
+
+        # [Streamflow] ---------- rolling routing ---------- #
+        # inflow of the step is spread over the outflow to come (as in direct convolution)
+        uh = st["uh"]
+        n_uh = len(uh)
+        dc_routed = {}
+        for k, inflow in self._get_routing_inflows(gb).items():
+            vct_buffer = st["routing"][k]
+            if np.isnan(inflow[0]):
+                st["missing"].add(k)
+            else:
+                vct_buffer[:n_uh] = vct_buffer[:n_uh] + np.float64(inflow[0]) * uh
+            if k in st["missing"]:
+                dc_routed[k] = np.dtype(self.dtype).type(np.nan)
+            else:
+                dc_routed[k] = np.dtype(self.dtype).type(vct_buffer[0])
+            # shift the buffer to the next step
+            vct_buffer[:-1] = vct_buffer[1:]
+            vct_buffer[-1] = 0.0
+        dc_step["qbf"] = dc_routed["qbf"]
+        dc_step["q"] = dc_routed["qbf"] + dc_routed["qff"]
+
+        st["step"] = st["step"] + 1
+        return dc_step
+
+    def solve_ensemble(self, param_table, outputs=None, unit_hydrograph=None):
+        """
+        Solve the model for an ensemble of parameter sets in one time loop.
+
+        Every state and flow array gets an ensemble axis, so all members
+        advance at once by broadcasting. Forcing (``p`` and ``e_pot``) is
+        shared by all members, and so is the GUH routing unless one unit
+        hydrograph per member is given.
+
+        .. note::
+
+            Expected to be called after ``setup()``. Parameters missing in
+            ``param_table`` take the current model values. Unfeasible values
+            are handled per member as in ``setup()``.
+
+        .. warning::
+
+            The routing parameter ``kq`` defines the GUH, so it is shared by
+            all members of the model GUH. For ``kq`` varying by member, pass
+            one unit hydrograph per member (see ``get_guh_array()``).
+
+        :param param_table: parameter sets, one row per member and one column per parameter
+        :type param_table: :class:`pandas.DataFrame`
+        :param outputs: output variables. Default value is ``["q"]``
+        :type outputs: list
+        :param unit_hydrograph: [optional] unit hydrographs, one row per member (members x steps). Default value is the model GUH (shared)
+        :type unit_hydrograph: :class:`numpy.ndarray`
+        :return: dictionary of (member x time) arrays for each output variable
+        :rtype: dict
+        """
+        # ---------------- parameters ---------------- #
+        df = param_table.reset_index(drop=True)
+
+        # ---------------- routing ---------------- #
+        if unit_hydrograph is None:
+            if "kq" in df.columns and np.any(
+                df["kq"].values != self.params["kq"]["value"]
+            ):
+                raise ValueError("Parameter 'kq' must be the same for all members")
+            # GUH routing is shared by all members
+            unit_hydrograph = self.data_guh[self.basins_ls[0]].values
+        else:
+            unit_hydrograph = np.asarray(unit_hydrograph)
+            if unit_hydrograph.ndim != 2 or len(unit_hydrograph) != len(df):
+                raise ValueError(
+                    "Unit hydrographs must be a 2d array with one row per member"
+                )
+        return self._solve_members(
+            df=df, outputs=outputs, unit_hydrograph=unit_hydrograph
+        )
+
+    def solve_basins(self, param_table=None, outputs=None):
+        """
+        Solve all basins of the path-areas table in one time loop.
+
+        Basins are solved as members of an ensemble (see ``solve_ensemble()``),
+        each with its own parameters and Geomorphic Unit Hydrograph.
+        Forcing (``p`` and ``e_pot``) is shared by all basins.
+
+        .. note::
+
+            Expected to be called after ``setup()``. Rows of outputs follow
+            ``basins_ls``. Parameters missing in ``param_table`` (or basins
+            missing in its index) take the current model values. The routing
+            parameter ``kq`` may vary by basin.
+
+        :param param_table: [optional] parameter sets indexed by basin name, one column per parameter
+        :type param_table: :class:`pandas.DataFrame`
+        :param outputs: output variables. Default value is ``["q"]``
+        :type outputs: list
+        :return: dictionary of (basin x time) arrays for each output variable
+        :rtype: dict
+        """
+        # ---------------- parameters ---------------- #
+        if param_table is None:
+            param_table = pd.DataFrame(index=self.basins_ls)
+        for b in param_table.index:
+            if b not in self.basins_ls:
+                raise ValueError(f"Basin '{b}' not found. Use one of {self.basins_ls}")
+        df = param_table.reindex(self.basins_ls)
+        for p in df.columns:
+            if p in self.params:
+                df[p] = df[p].fillna(self.params[p][self.datakey])
+
+        # ---------------- routing ---------------- #
+        if "kq" in df.columns:
+            # one GUH per basin, each with its own kq
+            grd_uh = np.stack(
+                [
+                    self.get_guh_array(kq=df["kq"].values[i])[i]
+                    for i in range(len(self.basins_ls))
+                ]
+            )
+        else:
+            grd_uh = self.data_guh[self.basins_ls].values.T
+
+        return self._solve_members(
+            df=df.reset_index(drop=True), outputs=outputs, unit_hydrograph=grd_uh
+        )
+
+    @profiled("members")
+    def _solve_members(self, df, outputs, unit_hydrograph):
+        """
+        Solve the model for many parameter sets (members) in one time loop.
+
+        .. note::
+
+            Only the requested outputs, storage levels and routing inflows
+            get (time x members) arrays, in the model ``dtype``. Other
+            variables live in rolling buffers (see ``_solve_time()``).
+
+        :param df: parameter sets, one row per member and one column per parameter
+        :type df: :class:`pandas.DataFrame`
+        :param outputs: output variables. Default value is ``["q"]``
+        :type outputs: list
+        :param unit_hydrograph: shared unit hydrograph (1d) or one per member (2d)
+        :type unit_hydrograph: :class:`numpy.ndarray`
+        :return: dictionary of (member x time) arrays for each output variable
+        :rtype: dict
+        """
+        from plans.hydrology import kernels
+
+        if outputs is None:
+            outputs = ["q"]
+        n = len(df)
+        for p in df.columns:
+            if p not in self.params:
+                raise ValueError(f"Parameter '{p}' not found in model parameters")
+
+        # member variables (shared arrays are time and forcing)
+        ls_all = list(self.new_vars) + ["e"]
+        for v in outputs:
+            if v not in ls_all and v not in self.sdata:
+                raise ValueError(f"Variable '{v}' not found in simulation data")
+        ls_required = list(OUTPUT_REQUIRED) + list(outputs)
+        for v in outputs:
+            ls_required = ls_required + list(OUTPUT_DEPENDENCIES.get(v, ()))
+
+        prm = {}
+        for p in ENSEMBLE_PARAMS:
+            if p in df.columns:
+                prm[p] = df[p].values.astype(np.float64)
+            else:
+                prm[p] = np.full(n, self.params[p][self.datakey], dtype=np.float64)
+
+        # --- handle bad (unfeaseable) parameters (see _setup_params)
+        prm["dea"] = np.where(prm["dea"] > prm["gcap"], prm["gcap"], prm["dea"])
+
+        # --- handle bad (unfeaseable) initial conditions (see _setup_start)
+        prm["g0"] = np.where(prm["g0"] > prm["gcap"], prm["gcap"], prm["g0"])
+        d0 = prm["gcap"] - prm["g0"]
+        prm["v0"] = np.where(prm["v0"] > d0, d0, prm["v0"])
+
+        # ---------------- simulation arrays ---------------- #
+        # arrays are (time x members) so each step is a contiguous row
+        gb = {v: self.sdata[v] for v in self.sdata if v not in ls_all}
+        # only required variables are kept (others live in rolling buffers)
+        for v in kernels.UPSCALED_VARS:
+            if v in ls_required:
+                gb[v] = np.full((self.slen, n), np.nan, dtype=self.dtype)
+        for v in CHECKPOINT_LEVELS:
+            gb[v][0] = prm[f"{v}0"]
+
+        # [Testing feature] shutdown E_pot
+        if self.shutdown_epot:
+            gb["e_pot"] = self.get_empty_series(0.0)
+
+        # ---------------- numerical solution ---------------- #
+        dt = self.params["dt"]["value"]
+        self._solve_time(
+            dt=dt,
+            gb=gb,
+            solver=self._solve_loop,
+            c_k=get_decay_k(k=prm["ck"], dt=dt, scheme=self.scheme),
+            c_a=prm["ca"],
+            s_k=prm["sk"],
+            s_of_c=prm["sofc"],
+            s_uf_a=prm["sufa"],
+            s_uf_c=prm["sufc"],
+            g_cap=prm["gcap"],
+            k_v=prm["kv"],
+            g_k=get_decay_k(k=prm["gk"], dt=dt, scheme=self.scheme),
+            g_e_cap=prm["ecap"],
+            d_e_a=prm["dea"],
+            s_uf_shutdown=UpscaledModel.compute_s_uf_shutdown(
+                prm["sufcap"], prm["sufa"]
+            ),
+            s_of_a_eff=UpscaledModel.compute_sof_a_eff(prm["sufcap"], prm["sofa"]),
+        )
+
+        # [Total Flows] ---------- compute total flows ---------- #
+        if "e" in outputs:
+            gb["e"] = UpscaledModel.compute_e(ec=gb["ec"], es=gb["es"], eg=gb["eg"])
+        if "qhf" in outputs:
+            gb["qhf"] = UpscaledModel.compute_qhf(
+                qof=gb["qof"], quf=gb["quf"], qgf=gb["qgf"]
+            )
+
+        # release levels not requested (routing inflows are released later)
+        for v in CHECKPOINT_LEVELS:
+            if v not in outputs:
+                del gb[v]
+
+        # [Streamflow] ---------- routing (members x time) ---------- #
+        if "q" in outputs or "qbf" in outputs:
+            # route base and fast flows of all members in one pass
+            vct_inflow = np.concatenate([gb["qgf"].T, (gb["quf"] + gb["qof"]).T])
+            for v in ["qgf", "quf", "qof"]:
+                if v not in outputs:
+                    del gb[v]
+            uh = unit_hydrograph
+            if uh.ndim == 2:
+                uh = np.concatenate([uh, uh])
+            q_routed = UpscaledModel.propagate_inflow(
+                inflow=vct_inflow,
+                unit_hydrograph=uh,
+                method=self.routing_method,
+            )
+            q_routed = q_routed.astype(self.dtype, copy=False)
+            gb["qbf"] = q_routed[:n].T
+            gb["q"] = (q_routed[:n] + q_routed[n:]).T
+
+        dc_out = {}
+        for v in outputs:
+            if np.ndim(gb[v]) == 2:
+                dc_out[v] = np.ascontiguousarray(gb[v].T)
+            else:
+                # shared arrays are repeated for each member
+                dc_out[v] = np.tile(gb[v], (n, 1))
+
+        return dc_out
+
     def export(self, folder, filename, views=False, mode=None):
         """
         Export object resources. Expected to be called after setup.
@@ -3135,29 +4164,73 @@ class UpscaledModel(LSFAS):
                 return None
 
     @staticmethod
-    def propagate_inflow(inflow, unit_hydrograph):
+    def propagate_inflow(inflow, unit_hydrograph, memory=None, method="auto"):
         """
         Flow routing model based on provided unit hydrograph.
-        Inflow and Unit Hydrograh arrays are expected to be the same size.
-        # todo [feature] improve so it can handle a smaller Unit Hydrograph (using slicing, etc)
+        The Unit Hydrograph is trimmed to its support, so it may be padded
+        to any length (see :func:`plans.hydrology.core.convolve_uh`).
+
+        .. note::
+
+            Inflow may also be a 2d array (series x time). All series are
+            routed at once with the same unit hydrograph.
 
-        :param inflow: 1d numpy array of inflow
+        :param inflow: 1d numpy array of inflow (or 2d, time in last axis)
         :type inflow: :class:`numpy.ndarray`
         :param unit_hydrograph: 1d numpy array of Unit Hydrograph (sum=1)
         :type unit_hydrograph: :class:`numpy.ndarray`
+        :param memory: [optional] outflow from inflow before the first step (see ``get_routing_memory()``)
+        :type memory: :class:`numpy.ndarray`
+        :param method: convolution method ("auto", "direct", "fft" or "oa")
+        :type method: str
         :return: outflow array
         :rtype: :class:`numpy.ndarray`
         """
-        size = len(inflow)
-        uh = unit_hydrograph[:]
-        # loop over time
-        for t in range(0, size):
-            if t == 0:
-                # create outflow vector
-                outflow = inflow[t] * uh
-            else:
-                # convolution over time
-                outflow[t:] = outflow[t:] + (inflow[t] * uh[: size - t])
+        return convolve_uh(
+            inflow=inflow,
+            uh=get_uh_support(unit_hydrograph),
+            memory=memory,
+            method=method,
+        )
+
+    @staticmethod
+    def get_routing_memory(inflow, unit_hydrograph, memory=None):
+        """
+        Get the routing memory at the last step, that is, the outflow still
+        to come from inflow of past steps.
+
+        .. note::
+
+            Inflow of the last step is not included, since flows are solved
+            up to the step before the last. A warm run starting at the last
+            step gets the same outflow as a full run (see ``propagate_inflow()``).
+
+        :param inflow: 1d numpy array of inflow (or 2d, time in last axis)
+        :type inflow: :class:`numpy.ndarray`
+        :param unit_hydrograph: 1d numpy array of Unit Hydrograph (sum=1)
+        :type unit_hydrograph: :class:`numpy.ndarray`
+        :param memory: [optional] routing memory before the first step
+        :type memory: :class:`numpy.ndarray`
+        :return: outflow from the last step onwards
+        :rtype: :class:`numpy.ndarray`
+        """
+        # solved steps
+        size = inflow.shape[-1] - 1
+        # unit hydrograph support
+        uh = get_uh_support(unit_hydrograph)
+        n_uh = len(uh)
+        n_mem = n_uh - 1
+        # start from the memory of previous runs still pending
+        n_tail = 0 if memory is None else max(memory.shape[-1] - size, 0)
+        outflow = np.zeros(inflow.shape[:-1] + (max(n_mem, n_tail),))
+        if n_tail > 0:
+            outflow[..., :n_tail] = memory[..., size:]
+        # add inflow of steps within the unit hydrograph reach (in time order)
+        for t in range(max(0, size - n_mem), size):
+            lag = size - t
+            outflow[..., : n_uh - lag] = (
+                outflow[..., : n_uh - lag] + inflow[..., t : t + 1] * uh[lag:]
+            )
         return outflow
 
     @staticmethod
@@ -3313,7 +4386,7 @@ class UpscaledModel(LSFAS):
     def compute_et_cap(e_t_f, g, g_et_cap, dt):
         # todo [docstring]
         # [Evaporation - Soil] Compute the root zone depth factor
-        output = e_t_f * np.min([g, g_et_cap]) * dt
+        output = e_t_f * np.minimum(g, g_et_cap) * dt
         r"""
         [Model Equation]
         Potential Soil Tanspiration capacity
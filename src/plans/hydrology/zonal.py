@@ -0,0 +1,198 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+On-the-fly zonal aggregation of local variables of distributed models.
+
+Local variables are reduced to zonal statistics while ``solve()`` runs, so
+reports by zone (basin, soil class, LULC class) and period (e.g. month)
+never need the per-step maps.
+
+Features
+--------
+
+* Zone index vectors precomputed once per zone layer (or LULC epoch).
+* Small (zone x period) accumulators (memory does not grow with the steps).
+* Area-weighted zonal means with the model cell weights.
+* Tidy output table (layer, zone, period, sums and means).
+
+Overview
+--------
+
+Each zone layer is a vector of zone ids over active cells. At every step the
+area-weighted mean of each variable over each zone is accumulated into the
+period of the step. Zones may change between steps (e.g. LULC epochs), so
+the number of steps is counted per zone and period.
+
+For each variable ``v`` the output table holds:
+
+* ``{v}_sum``: sum over the period steps of the zonal mean (e.g. monthly totals of fluxes, in mm).
+* ``{v}_mean``: mean over the period steps of the zonal mean.
+
+Examples
+--------
+
+.. code-block:: python
+
+    # ask the model to reduce fluxes by zone and month
+    m.zonal_vars = ["eg", "qif", "qgf"]
+    m.zonal_freq = "M"
+    m.setup()
+    m.solve()
+    df = m.data_zonal
+    df_lulc = df[df["layer"] == "lulc"]
+
+"""
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+
+# CLASSES
+# ***********************************************************************
+
+# CLASSES -- Project-level
+# =======================================================================
+
+
+class ZonalReducer:
+    """
+    Streaming reducer of local variables into (zone x period) statistics.
+    """
+
+    def __init__(self, variables, periods, weights, labels=None):
+        """
+        Deploy the reducer.
+
+        :param variables: list of variable names
+        :type variables: list
+        :param periods: period index of each simulation step (``0`` to ``n_periods - 1``)
+        :type periods: :class:`numpy.ndarray`
+        :param weights: upscaling weights of active cells
+        :type weights: :class:`numpy.ndarray`
+        :param labels: [optional] period labels. Default is the period index
+        :type labels: list
+        """
+        self.variables = list(variables)
+        self.periods = np.asarray(periods)
+        self.n_periods = int(np.max(self.periods)) + 1
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if labels is None:
+            labels = np.arange(self.n_periods)
+        self.labels = np.asarray(labels)
+
+        # zone layers
+        self.layers = {}
+        # accumulators (layer -> zone x period)
+        self.counts = {}
+        self.sums = {}
+
+    def set_layer(self, name, zones, zone_ids):
+        """
+        Set (or reset) the zones of a layer. Accumulators are kept.
+
+        .. note::
+
+            Cells with zones not in ``zone_ids`` (e.g. NaN) are not reduced.
+            When a layer is reset (e.g. a new LULC epoch), ``zone_ids`` must
+            be the same.
+
+        :param name: layer name
+        :type name: str
+        :param zones: zone id of each active cell
+        :type zones: :class:`numpy.ndarray`
+        :param zone_ids: all zone ids of the layer (output rows)
+        :type zone_ids: :class:`numpy.ndarray`
+        """
+        zone_ids = np.asarray(zone_ids)
+        n_zones = len(zone_ids)
+        # zone index of cells (n_zones is the bin of unmatched cells)
+        vct_sorter = np.argsort(zone_ids)
+        vct_i = np.searchsorted(zone_ids, zones, sorter=vct_sorter)
+        vct_i = np.where(vct_i < n_zones, vct_i, 0)
+        vct_index = vct_sorter[vct_i]
+        vct_index = np.where(zone_ids[vct_index] == zones, vct_index, n_zones)
+        vct_area = np.bincount(vct_index, weights=self.weights, minlength=n_zones + 1)
+        self.layers[name] = {
+            "ids": zone_ids,
+            "index": vct_index,
+            "area": vct_area[:n_zones],
+            "active": vct_area[:n_zones] > 0,
+        }
+        if name not in self.sums:
+            self.counts[name] = np.zeros((n_zones, self.n_periods), dtype=np.int64)
+            self.sums[name] = {
+                v: np.zeros((n_zones, self.n_periods)) for v in self.variables
+            }
+        return None
+
+    def append(self, step, values):
+        """
+        Accumulate the zonal means of one step.
+
+        :param step: simulation step
+        :type step: int
+        :param values: dict of 1d arrays of active cells for each variable
+        :type values: dict
+        """
+        n = self.periods[step]
+        for name, layer in self.layers.items():
+            n_zones = len(layer["ids"])
+            b_active = layer["active"]
+            self.counts[name][b_active, n] += 1
+            for v in self.variables:
+                vct_sum = np.bincount(
+                    layer["index"],
+                    weights=values[v] * self.weights,
+                    minlength=n_zones + 1,
+                )[:n_zones]
+                self.sums[name][v][b_active, n] += (
+                    vct_sum[b_active] / layer["area"][b_active]
+                )
+        return None
+
+    def get_table(self):
+        """
+        Get the tidy table of zonal statistics.
+
+        :return: table with fields ``layer``, ``zone``, ``period``, ``steps`` and statistics
+        :rtype: :class:`pandas.DataFrame`
+        """
+        ls_dfs = []
+        for name, layer in self.layers.items():
+            n_zones = len(layer["ids"])
+            grd_counts = self.counts[name]
+            dc = {
+                "layer": name,
+                "zone": np.repeat(layer["ids"], self.n_periods),
+                "period": np.tile(self.labels, n_zones),
+                "steps": grd_counts.ravel(),
+            }
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for v in self.variables:
+                    grd_sums = self.sums[name][v]
+                    dc[f"{v}_sum"] = grd_sums.ravel()
+                    dc[f"{v}_mean"] = (grd_sums / grd_counts).ravel()
+            ls_dfs.append(pd.DataFrame(dc))
+        df = pd.concat(ls_dfs, ignore_index=True)
+        # drop zones absent in periods
+        return df[df["steps"] > 0].reset_index(drop=True)
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    print("Hello world!")
+    # ... {develop}
@@ -0,0 +1,541 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Benchmarks for the numerical solvers of the hydrology models.
+
+Models are set up in memory with synthetic forcing, so no project files
+are needed. Run with ``RUN_BENCHMARKS=1``.
+
+The model suite times ``setup()``, ``solve()`` and ``export()`` (and the
+peak memory) of every model class over synthetic forcing of several lengths
+and time steps. Results are written as JSON (``BCMK_SUITE_FILE``, default in
+``tests/outputs``) and compared against a former run if ``BCMK_SUITE_BASELINE``
+points to its JSON file. Longest runs (1M steps) need ``RUN_BENCHMARKS_XXL=1``.
+
+"""
+
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import tracemalloc
+import unittest
+from importlib.metadata import version, PackageNotFoundError
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology.core import Model
+from plans.hydrology.upscaled import (
+    LinearStorage,
+    LSRR,
+    LSRRE,
+    LSFAS,
+    UpscaledModel,
+)
+from plans.hydrology.downscaled import DownscaledModel
+from tests.conftest import OUTPUT_DIR, RUN_BENCHMARKS, RUN_BENCHMARKS_XXL
+from tests.unit.test_hydrology_LinearStorage import make_model
+from tests.unit.test_hydrology_LinearStorage import PARAMS as PARAMS_STORAGE
+from tests.unit.test_hydrology_UpscaledModel import PARAMS as PARAMS_UPSCALED
+from tests.unit.test_hydrology_DownscaledModel import (
+    make_model as make_downscaled,
+)
+
+# ... {develop}
+
+
+# CONSTANTS
+# ***********************************************************************
+
+# number of days of forcing (hourly steps)
+BCMK_DAYS = 4200
+
+# minimum speedup of the compiled storage solvers
+BCMK_STORAGE_SPEEDUP = 100
+
+# residence times (days) for comparing integration schemes
+BCMK_SCHEME_K = [1.0, 2.0, 5.0, 20.0]
+
+# model suite classes
+BCMK_SUITE_MODELS = [
+    LinearStorage,
+    LSRR,
+    LSRRE,
+    LSFAS,
+    UpscaledModel,
+    DownscaledModel,
+]
+
+# model suite lengths (number of steps)
+BCMK_SUITE_STEPS = [1000, 10000, 100000]
+if RUN_BENCHMARKS_XXL:
+    BCMK_SUITE_STEPS = BCMK_SUITE_STEPS + [1000000]
+
+# model suite time step units
+BCMK_SUITE_UNITS = ["h", "D"]
+
+# maximum length of distributed runs (steps are much slower)
+BCMK_SUITE_MAX_STEPS_DOWNSCALED = 100000 if RUN_BENCHMARKS_XXL else 10000
+
+# start of synthetic forcing (long daily runs must end before 2262)
+BCMK_SUITE_START = "1900-01-01"
+
+# output file of the model suite
+BCMK_SUITE_FILE = os.getenv("BCMK_SUITE_FILE", str(OUTPUT_DIR / "bcmk_hydrology.json"))
+
+# former output file for regression checks (optional)
+BCMK_SUITE_BASELINE = os.getenv("BCMK_SUITE_BASELINE", None)
+
+# maximum slowdown of solve time against the baseline
+BCMK_SUITE_TOLERANCE = 1.5
+
+# ... {develop}
+
+
+# FUNCTIONS
+# ***********************************************************************
+
+
+def get_steps_per_second(model):
+    """
+    Solve a model and get the number of simulation steps per second.
+
+    :param model: model ready for ``solve()``
+    :type model: :class:`plans.hydrology.core.Model`
+    :return: steps per second
+    :rtype: float
+    """
+    t0 = time.perf_counter()
+    model.solve()
+    return model.slen / (time.perf_counter() - t0)
+
+
+def get_daily_errors(model_class, k, scheme):
+    """
+    Get the error of a daily-step run against the hourly explicit Euler run.
+
+    Both runs share the same forcing (daily totals evenly spread over hours).
+    Errors are the root mean squared error of daily flow totals and of
+    storage at the start of days, normalized by the mean hourly values.
+
+    :param model_class: linear storage model class
+    :type model_class: type
+    :param k: residence time in days
+    :type k: float
+    :param scheme: integration scheme of the daily run
+    :type scheme: str
+    :return: normalized errors of flow and storage
+    :rtype: tuple
+    """
+    dc = {}
+    for units in ["D", "h"]:
+        m = make_model(model_class, days=365)
+        m.params["dt"]["units"] = units
+        m.params["k"]["value"] = k
+        if "q_max" in m.params:
+            m.params["q_max"]["value"] = np.inf
+        m.scheme = scheme if units == "D" else "euler"
+        m.setup()
+        if units == "h":
+            # same forcing of the daily run
+            for v in ["p", "e_pot"]:
+                if v in m.sdata:
+                    vct = np.repeat(dc["D"].sdata[v] / 24, 24)
+                    m.sdata[v] = vct[: m.slen]
+        m.solve()
+        dc[units] = m
+    df = dc["h"].data.set_index("datetime")
+    vct_q = df["q"].resample("D").sum().values[:-1]
+    vct_s = df["s"].resample("D").first().values[:-1]
+    df_d = dc["D"].data
+    e_q = np.sqrt(np.mean((df_d["q"].values[:-1] - vct_q) ** 2)) / np.mean(vct_q)
+    e_s = np.sqrt(np.mean((df_d["s"].values[:-1] - vct_s) ** 2)) / np.mean(vct_s)
+    return e_q, e_s
+
+
+def get_synthetic_forcing(n_steps, units, seed=0):
+    """
+    Get synthetic climate forcing with storm events and seasonal PET.
+
+    Storms are gaussian pulses (see :meth:`plans.hydrology.core.Model.get_gaussian_signal`)
+    lasting about one day, with gamma-distributed depths and one storm every
+    five days on average. PET follows a yearly cycle around 4 mm/D.
+
+    :param n_steps: number of steps
+    :type n_steps: int
+    :param units: time step units (e.g. ``h`` or ``D``)
+    :type units: str
+    :param seed: random seed for storms
+    :type seed: int
+    :return: climate table with ``datetime``, ``p`` and ``e_pot`` (mm per step)
+    :rtype: :class:`pandas.DataFrame`
+    """
+    rng = np.random.default_rng(seed)
+    t0 = pd.Timestamp(BCMK_SUITE_START)
+    dtix = Model.get_timestep_series(
+        start_time=t0,
+        end_time=t0 + (n_steps - 1) * pd.Timedelta(1, unit=units),
+        time_unit=units,
+    )
+    steps_day = pd.Timedelta(1, unit="D") / pd.Timedelta(1, unit=units)
+
+    # storm pulse with unit depth
+    n_storm = max(3, int(np.ceil(2 * steps_day)))
+    vct_storm = Model.get_gaussian_signal(
+        value_max=1.0, size=n_storm, sigma=4, position_factor=2
+    )
+    vct_storm = vct_storm / np.sum(vct_storm)
+
+    # storm starts and depths
+    vct_starts = rng.random(n_steps) < 1 / (5 * steps_day)
+    vct_depths = rng.gamma(0.8, 15, size=n_steps) * vct_starts
+    p = np.convolve(vct_depths, vct_storm)[:n_steps]
+
+    # seasonal PET
+    vct_doy = dtix.dayofyear.values
+    e_pot = 4.0 * (1 + 0.5 * np.sin(2 * np.pi * (vct_doy - 80) / 365)) / steps_day
+    return pd.DataFrame({"datetime": dtix, "p": p, "e_pot": e_pot})
+
+
+def make_suite_model(model_class, n_steps, units, engine="compiled"):
+    """
+    Build a model of the suite with synthetic forcing and observations.
+
+    :param model_class: model class
+    :type model_class: type
+    :param n_steps: number of steps
+    :type n_steps: int
+    :param units: time step units (e.g. ``h`` or ``D``)
+    :type units: str
+    :param engine: numerical engine
+    :type engine: str
+    :return: model ready for ``setup()``
+    :rtype: :class:`plans.hydrology.core.Model`
+    """
+    df_clim = get_synthetic_forcing(n_steps=n_steps, units=units)
+    vct_dt = df_clim["datetime"]
+    if model_class is DownscaledModel:
+        m = make_downscaled(days=2, uniform=False)
+        # LULC maps switch in the middle of the run
+        m.data_lulc.catalog["datetime"] = [
+            str(vct_dt.iloc[0]),
+            str(vct_dt.iloc[n_steps // 2]),
+        ]
+    else:
+        m = model_class()
+        for k, value in {**PARAMS_STORAGE, **PARAMS_UPSCALED}.items():
+            if k in m.params:
+                m.params[k]["value"] = value
+        if model_class is UpscaledModel:
+            m.params["kq"]["units"] = "m/D"
+            m.data_pah = pd.DataFrame(
+                {
+                    "path": np.arange(100, 20000, 100.0),
+                    "global": np.linspace(1, 0, 199) ** 2 + 0.01,
+                }
+            )
+    m.engine = engine
+    m.params["dt"]["value"] = 1
+    m.params["dt"]["units"] = units
+    m.params["t0"]["value"] = str(vct_dt.iloc[0])
+    m.params["tN"]["value"] = str(vct_dt.iloc[-1])
+    m.data_clim = df_clim
+
+    # sparse observations of the evaluation variable
+    m.data_obs = pd.DataFrame(
+        {
+            "datetime": vct_dt.values[::10],
+            f"{m.var_eval}_obs": df_clim["p"].values[::10],
+        }
+    )
+    return m
+
+
+def get_suite_record(model_class, n_steps, units, engine="compiled"):
+    """
+    Time ``setup()``, ``solve()`` and ``export()`` of a suite model and get the peak memory.
+
+    .. note::
+
+        Peak memory is traced (with :mod:`tracemalloc`) in a separate run
+        of ``setup()`` and ``solve()``, so tracing does not spoil the timings.
+
+    :param model_class: model class
+    :type model_class: type
+    :param n_steps: number of steps
+    :type n_steps: int
+    :param units: time step units (e.g. ``h`` or ``D``)
+    :type units: str
+    :param engine: numerical engine
+    :type engine: str
+    :return: record with timings (s), speed (steps/s) and peak memory (MB)
+    :rtype: dict
+    """
+    m = make_suite_model(model_class, n_steps=n_steps, units=units, engine=engine)
+    dc_time = {}
+    t0 = time.perf_counter()
+    m.setup()
+    dc_time["setup"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    m.solve()
+    dc_time["solve"] = time.perf_counter() - t0
+    with tempfile.TemporaryDirectory() as folder:
+        t0 = time.perf_counter()
+        m.export(folder=folder, filename="bcmk")
+        dc_time["export"] = time.perf_counter() - t0
+    n_slen = m.slen
+    del m
+
+    # peak memory
+    m = make_suite_model(model_class, n_steps=n_steps, units=units, engine=engine)
+    tracemalloc.start()
+    m.setup()
+    m.solve()
+    _, n_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del m
+
+    return {
+        "model": model_class.__name__,
+        "engine": engine,
+        "units": units,
+        "steps": n_slen,
+        "setup": dc_time["setup"],
+        "solve": dc_time["solve"],
+        "export": dc_time["export"],
+        "steps_per_second": n_slen / dc_time["solve"],
+        "peak_memory": n_peak / 1e6,
+    }
+
+
+def get_suite_records(models=None, steps=None, units=None):
+    """
+    Run the model suite.
+
+    .. note::
+
+        Each model is warmed up (compilation of kernels) before timing.
+        Daily runs ending after the timestamp range are skipped.
+
+    :param models: [optional] model classes. Default is ``BCMK_SUITE_MODELS``
+    :type models: list
+    :param steps: [optional] run lengths. Default is ``BCMK_SUITE_STEPS``
+    :type steps: list
+    :param units: [optional] time step units. Default is ``BCMK_SUITE_UNITS``
+    :type units: list
+    :return: list of records (see ``get_suite_record()``)
+    :rtype: list
+    """
+    models = BCMK_SUITE_MODELS if models is None else models
+    steps = BCMK_SUITE_STEPS if steps is None else steps
+    units = BCMK_SUITE_UNITS if units is None else units
+    ls_records = []
+    for model_class in models:
+        # warm up
+        m = make_suite_model(model_class, n_steps=100, units=units[0])
+        m.setup()
+        m.solve()
+        for u in units:
+            for n in steps:
+                if model_class is DownscaledModel:
+                    if n > BCMK_SUITE_MAX_STEPS_DOWNSCALED:
+                        continue
+                t_end = pd.Timestamp(BCMK_SUITE_START) + n * pd.Timedelta(1, unit=u)
+                if t_end.year > 2261:
+                    continue
+                dc = get_suite_record(model_class, n_steps=n, units=u)
+                print(
+                    f"{dc['model']} {dc['steps']} {u}: "
+                    f"setup={dc['setup']:.3f}s solve={dc['solve']:.3f}s "
+                    f"export={dc['export']:.3f}s peak={dc['peak_memory']:.1f}MB"
+                )
+                ls_records.append(dc)
+    return ls_records
+
+
+def save_suite_records(records, fpath):
+    """
+    Save suite records as JSON, with metadata for comparing versions.
+
+    :param records: list of records (see ``get_suite_records()``)
+    :type records: list
+    :param fpath: path to JSON file
+    :type fpath: str
+    :return: None
+    :rtype: None
+    """
+    try:
+        s_version = version("plans")
+    except PackageNotFoundError:
+        s_version = None
+    dc = {
+        "meta": {
+            "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "plans": s_version,
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "records": records,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(fpath)), exist_ok=True)
+    with open(fpath, "w") as f:
+        json.dump(dc, f, indent=2)
+    return None
+
+
+def compare_suite_records(fpath_baseline, fpath):
+    """
+    Compare suite results against a baseline run.
+
+    :param fpath_baseline: path to JSON file of the baseline run
+    :type fpath_baseline: str
+    :param fpath: path to JSON file of the new run
+    :type fpath: str
+    :return: table of matching records with ratios (new over baseline) of timings and peak memory
+    :rtype: :class:`pandas.DataFrame`
+    """
+    ls_keys = ["model", "engine", "units", "steps"]
+    ls_fields = ["setup", "solve", "export", "peak_memory"]
+    ls_dfs = []
+    for f in [fpath_baseline, fpath]:
+        with open(f) as file:
+            ls_dfs.append(pd.DataFrame(json.load(file)["records"]))
+    df = pd.merge(
+        ls_dfs[0][ls_keys + ls_fields],
+        ls_dfs[1][ls_keys + ls_fields],
+        on=ls_keys,
+        suffixes=("_baseline", ""),
+    )
+    for c in ls_fields:
+        df[f"{c}_ratio"] = df[c] / df[f"{c}_baseline"]
+    return df
+
+
+# ... {develop}
+
+
+# CLASSES
+# ***********************************************************************
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, reason="skipping benchmarks")
+class TestStorageSolvers(unittest.TestCase):
+
+    def test_compiled_speedup(self):
+        """
+        Compiled solvers must be much faster than the reference loops (100k steps).
+        """
+        for model_class in [LSRR, LSRRE, LSFAS]:
+            dc_speed = {}
+            for engine in ["python", "compiled"]:
+                m = make_model(model_class, days=BCMK_DAYS, engine=engine)
+                m.setup()
+                if engine == "compiled":
+                    # warm up (compilation)
+                    m.solve()
+                dc_speed[engine] = get_steps_per_second(m)
+            self.assertGreater(m.slen, 100000)
+            speedup = dc_speed["compiled"] / dc_speed["python"]
+            print(
+                f"{model_class.__name__}: {dc_speed['python']:.0f} -> "
+                f"{dc_speed['compiled']:.0f} steps/s ({speedup:.0f}x)"
+            )
+            self.assertGreater(speedup, BCMK_STORAGE_SPEEDUP)
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, reason="skipping benchmarks")
+class TestDecaySchemes(unittest.TestCase):
+
+    def test_daily_exact_scheme(self):
+        """
+        Daily runs with exact decay must be closer to the hourly solution than explicit Euler.
+
+        .. note::
+
+            With inflow (``LSRR``), daily storage errors are dominated by the
+            timing of inflow, so only flow errors are asserted.
+        """
+        for model_class in [LinearStorage, LSRR]:
+            for k in BCMK_SCHEME_K:
+                e_euler = get_daily_errors(model_class, k, scheme="euler")
+                e_exact = get_daily_errors(model_class, k, scheme="exact")
+                print(
+                    f"{model_class.__name__} k={k}: "
+                    f"euler q={e_euler[0]:.4f} s={e_euler[1]:.4f} | "
+                    f"exact q={e_exact[0]:.4f} s={e_exact[1]:.4f}"
+                )
+                self.assertLess(e_exact[0], e_euler[0])
+                if model_class is LinearStorage:
+                    self.assertLess(e_exact[1], e_euler[1])
+
+
+@unittest.skipUnless(RUN_BENCHMARKS, reason="skipping benchmarks")
+class TestModelSuite(unittest.TestCase):
+
+    def test_suite(self):
+        """
+        Suite results must cover all models and be saved as JSON.
+
+        .. note::
+
+            If ``BCMK_SUITE_BASELINE`` is set, solve times of long runs
+            (100k steps or more) must not be much slower than the baseline.
+        """
+        ls_records = get_suite_records()
+        save_suite_records(ls_records, fpath=BCMK_SUITE_FILE)
+        print(f"saved to {BCMK_SUITE_FILE}")
+        df = pd.DataFrame(ls_records)
+        self.assertEqual(set(df["model"]), {c.__name__ for c in BCMK_SUITE_MODELS})
+        self.assertTrue(np.all(df[["setup", "solve", "export"]].values > 0))
+
+        if BCMK_SUITE_BASELINE is not None:
+            df = compare_suite_records(BCMK_SUITE_BASELINE, BCMK_SUITE_FILE)
+            print(df[["model", "units", "steps", "solve_ratio", "peak_memory_ratio"]])
+            df = df[df["steps"] >= 100000]
+            for _, row in df.iterrows():
+                self.assertLess(
+                    row["solve_ratio"],
+                    BCMK_SUITE_TOLERANCE,
+                    msg=f"{row['model']} {row['steps']} {row['units']}",
+                )
+
+
+# ... {develop}
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    from tests.conftest import RUN_BENCHMARKS
+
+    # RESET BENCHMARKS
+    RUN_BENCHMARKS = True
+
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
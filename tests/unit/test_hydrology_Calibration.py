@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for the Monte Carlo calibration driver.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import tempfile
+import unittest
+from pathlib import Path
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology import calibration
+from tests.unit.test_hydrology_UpscaledModel import make_model, run_model
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+HYPOTHESES = pd.DataFrame(
+    {"Name": ["kv", "gk"], "Min": [10.0, 10.0], "Max": [100.0, 60.0]}
+)
+
+# ***********************************************************************
+# FUNCTIONS
+# ***********************************************************************
+
+
+def make_calibration(folder, n_samples=12):
+    """
+    Build a calibration of a synthetic model against its own daily flows.
+
+    :return: calibration driver
+    :rtype: :class:`plans.hydrology.calibration.Calibration`
+    """
+    ref = run_model(days=10)
+    df_obs = ref.data[["datetime", "q"]].iloc[::24].dropna()
+    df_obs = df_obs.rename(columns={"q": "q_obs"})
+    df_obs["q_obs"] = df_obs["q_obs"] / ref.params["dt"]["value"]
+    m = make_model(days=10)
+    m.data_obs = df_obs
+    return calibration.Calibration(
+        model=m,
+        df_hypotheses=HYPOTHESES,
+        n_samples=n_samples,
+        seed=42,
+        folder=folder,
+        gridsize=20,
+    )
+
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestCalibration(unittest.TestCase):
+
+    def test_samples_reproducible(self):
+        df1 = calibration.sample_hypotheses(HYPOTHESES, n_samples=50, seed=1)
+        df2 = calibration.sample_hypotheses(HYPOTHESES, n_samples=50, seed=1)
+        pd.testing.assert_frame_equal(df1, df2)
+        self.assertTrue((df1["kv"] >= 10.0).all() and (df1["kv"] <= 100.0).all())
+        self.assertTrue((df1["gk"] >= 10.0).all() and (df1["gk"] <= 60.0).all())
+
+    def test_evidence_weights(self):
+        df = pd.DataFrame({"kv": [1.0, 2.0, 3.0], "rsq": [0.9, -0.5, 0.4]})
+        dc = calibration.get_evidence(df, ["kv"], likelihood="rsq", threshold=0.5)
+        np.testing.assert_array_equal(dc["kv"]["W"].values, [0.9, 0.0, 0.0])
+        with self.assertRaises(ValueError):
+            calibration.get_evidence(df, ["kv"], likelihood="foo")
+
+    def test_run_and_resume(self):
+        """
+        An interrupted run must resume and give the same results.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            cal = make_calibration(folder)
+            df = cal.run(n_workers=2, batch_size=4)
+            self.assertEqual(len(df), 12)
+            self.assertEqual(len(cal.bayes.steps), 4)
+            # true parameters are inside the hypotheses, so fit must be good
+            self.assertGreater(df["rsq"].max(), 0.5)
+
+            # simulate an interruption in the middle of the last batch
+            fpath = Path(f"{folder}/{cal.name}_results.csv")
+            df.iloc[:10].to_csv(fpath, sep=";", index=False)
+            cal2 = make_calibration(folder)
+            df2 = cal2.run(n_workers=2, batch_size=4)
+            pd.testing.assert_frame_equal(df, df2)
+            self.assertEqual(len(cal2.bayes.steps), 4)
+            for h in HYPOTHESES["Name"]:
+                np.testing.assert_allclose(
+                    cal.bayes.steps[-1]["Omega"][h]["P(H | E)"].values,
+                    cal2.bayes.steps[-1]["Omega"][h]["P(H | E)"].values,
+                )
+
+    def test_resume_short_last_batch(self):
+        """
+        A finished run with a short last batch must not be solved again.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            cal = make_calibration(folder, n_samples=10)
+            df = cal.run(n_workers=2, batch_size=4)
+            self.assertEqual(list(df["batch_rows"]), [4] * 8 + [2] * 2)
+            fpath = Path(f"{folder}/{cal.name}_results.csv")
+            n_mtime = fpath.stat().st_mtime_ns
+
+            # other batch sizes replay the saved batches
+            cal2 = make_calibration(folder, n_samples=10)
+            df2 = cal2.run(n_workers=2, batch_size=3)
+            pd.testing.assert_frame_equal(df, df2)
+            self.assertEqual(len(cal2.bayes.steps), len(cal.bayes.steps))
+            self.assertEqual(fpath.stat().st_mtime_ns, n_mtime)
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
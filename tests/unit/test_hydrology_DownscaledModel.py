@@ -0,0 +1,310 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for ``DownscaledModel`` numerical solvers.
+
+Models are set up in memory with synthetic maps, tables and climate data,
+so no project files are needed.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import tempfile
+import unittest
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+import plans.datasets as ds
+from plans.hydrology.downscaled import DownscaledModel
+from tests.unit.test_hydrology_UpscaledModel import make_model as make_upscaled
+from tests.unit.test_hydrology_UpscaledModel import run_model as run_upscaled
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+LULC_DATES = ["2019-01-01", "2020-01-20"]
+
+# ***********************************************************************
+# FUNCTIONS
+# ***********************************************************************
+
+
+def make_model(days=60, shape=(20, 30), uniform=True, seed=0, model_class=None):
+    """
+    Build a ``DownscaledModel`` with synthetic maps and the upscaled test forcing.
+
+    :param days: number of days of forcing
+    :type days: int
+    :param shape: basemap shape
+    :type shape: tuple
+    :param uniform: option for uniform parameter tables (same as upscaled)
+    :type uniform: bool
+    :param seed: random seed for maps
+    :type seed: int
+    :param model_class: model class. Default is ``DownscaledModel``
+    :type model_class: type
+    :return: model ready for ``setup()``
+    :rtype: :class:`plans.hydrology.downscaled.DownscaledModel`
+    """
+    rng = np.random.default_rng(seed)
+    up = make_upscaled(days=days)
+    m = DownscaledModel() if model_class is None else model_class()
+    for p in up.params:
+        m.params[p]["value"] = up.params[p]["value"]
+        m.params[p]["units"] = up.params[p]["units"]
+    m.data_clim = up.data_clim
+    m.data_pah = up.data_pah
+
+    # basin with a nodata frame
+    grd = np.zeros(shape)
+    grd[3:-3, 5:-5] = 1
+    m.data_basin = ds.AOI(name="basin")
+    m.data_basin.set_data(grd)
+    m.data_tsi = ds.HTWI()
+    m.data_tsi.set_data(rng.random(shape))
+
+    # soils
+    m.data_soils = ds.Soils()
+    m.data_soils.set_data(rng.integers(1, 3, shape).astype(float))
+    m.data_soils_table = pd.DataFrame({"id": [1, 2]})
+    m.soils_n = 2
+
+    # lulc
+    m.data_lulc_table = pd.DataFrame({"id": [1, 2, 3]})
+    m.lulc_n = 3
+    if not uniform:
+        m.data_soils_table["kv"] = [0.5, 2.0]
+        m.data_lulc_table["ck"] = [1.0, 2.0, 0.5]
+        m.data_lulc_table["sk"] = [1.0, 3.0, 0.5]
+    m.data_lulc = ds.LULCSeries(name="lulc")
+    for d in LULC_DATES:
+        rst = ds.LULC(name=f"lulc_{d[:4]}", datetime=d)
+        rst.set_data(rng.integers(1, 4, shape).astype(float))
+        rst.table = pd.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "name": ["a", "b", "c"],
+                "alias": ["A", "B", "C"],
+                "color": ["red", "green", "blue"],
+            }
+        )
+        m.data_lulc.append(raster=rst)
+    m.lulc_maps_ls = list(m.data_lulc.collection.keys())
+    m._set_basemap()
+    return m
+
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestDownscaledModel(unittest.TestCase):
+
+    def test_uniform_matches_upscaled(self):
+        """
+        With uniform parameter maps, global series must match the upscaled model.
+        """
+        m = make_model()
+        m.setup()
+        m.solve()
+        ref = run_upscaled()
+        for v in ["q", "qbf", "c", "s", "v", "g", "e", "qof", "qgf"]:
+            np.testing.assert_allclose(
+                m.data[v].values,
+                ref.data[v].values,
+                rtol=1e-12,
+                atol=1e-12,
+                err_msg=f"Mismatch in {v}",
+            )
+
+    # Active cells tests
+    # ------------------------------------------------------------------
+
+    def test_active_cells(self):
+        """
+        Local variables and parameter maps must hold only active cells.
+        """
+        m = make_model(uniform=False)
+        m.setup()
+        n_cells = int(np.sum(m.wmask > 0))
+        self.assertEqual(len(m.cells), n_cells)
+        self.assertLess(n_cells, m.basemap.size)
+        self.assertEqual(m.vars["s"]["map"].shape, (2, n_cells))
+        self.assertEqual(m.params["kv"]["map"].shape, (n_cells,))
+        for lulc in m.lulc_maps_ls:
+            self.assertEqual(m.params["ck"][lulc].shape, (n_cells,))
+
+    def test_lulc_epochs(self):
+        """
+        LULC epochs must cover all steps and follow the map dates.
+        """
+        m = make_model(uniform=False)
+        m.setup()
+        epochs = m.get_lulc_epochs()
+        self.assertEqual([e[2] for e in epochs], m.lulc_maps_ls)
+        self.assertEqual(epochs[0][0], 0)
+        self.assertEqual(epochs[-1][1], len(m.sdata["lulc_map_id"]))
+        for e1, e2 in zip(epochs[:-1], epochs[1:]):
+            self.assertEqual(e1[1], e2[0])
+        t_switch = pd.Timestamp(LULC_DATES[1])
+        self.assertEqual(m.data["datetime"].values[epochs[1][0]], t_switch)
+
+    def test_warm_start(self):
+        """
+        A warm run must match a full run, including local levels.
+        """
+        ref = make_model(uniform=False)
+        ref.routing_method = "direct"
+        ref.setup()
+        ref.solve()
+        with tempfile.TemporaryDirectory() as folder:
+            fpath = f"{folder}/checkpoint.npz"
+            m = make_model(uniform=False)
+            m.params["tN"]["value"] = "2020-01-25"
+            m.setup()
+            m.solve()
+            m.save_checkpoint(fpath)
+            m = make_model(uniform=False)
+            m.routing_method = "direct"
+            m.load_checkpoint(fpath)
+            m.setup()
+            m.solve()
+        i0 = ref.slen - m.slen
+        for c in ["q", "qbf", "s", "g", "qif"]:
+            np.testing.assert_array_equal(
+                ref.data[c].values[i0:], m.data[c].values, err_msg=c
+            )
+        np.testing.assert_array_equal(ref.vars["g"]["map"][0], m.vars["g"]["map"][0])
+
+    def test_lazy_lulc(self):
+        """
+        Lazy LULC maps must match eager maps, keeping only the cached epochs.
+        """
+        ref = make_model(uniform=False)
+        ref.setup()
+        ref.solve()
+        m = make_model(uniform=False)
+        with tempfile.TemporaryDirectory() as folder:
+            # export the test maps (ascii grids) and table
+            for lulc, d in zip(ref.lulc_maps_ls, LULC_DATES):
+                grd = ref.data_lulc.collection[lulc].data.astype(int)
+                with open(f"{folder}/lulc_{d}.asc", "w") as f:
+                    f.write(f"ncols {grd.shape[1]}\nnrows {grd.shape[0]}\n")
+                    f.write("xllcorner 0\nyllcorner 0\ncellsize 1\nNODATA_value -1\n")
+                    np.savetxt(f, grd, fmt="%d")
+            df = ref.data_lulc.collection[ref.lulc_maps_ls[0]].table
+            df = pd.merge(df, m.data_lulc_table, on="id")
+            df.to_csv(f"{folder}/lulc.csv", sep=";", index=False)
+            m.folders["lulc"] = folder
+            m.folder_data_lulc = folder
+            m.filename_data_lulc = "lulc_*.asc"
+            m.lulc_cache_size = 1
+            m.load_lulc()
+            self.assertIsNone(m.data_lulc)
+            m.setup()
+            m.solve()
+        self.assertEqual(len(m.lulc_cache), 1)
+        self.assertNotIn(m.lulc_maps_ls[0], m.params["ck"])
+        for v in ["q", "s", "g", "e"]:
+            np.testing.assert_array_equal(m.data[v].values, ref.data[v].values)
+
+    def test_zonal(self):
+        """
+        Zonal statistics must match the global series without changing the run.
+        """
+        ref = make_model(uniform=False)
+        ref.setup()
+        ref.solve()
+        m = make_model(uniform=False)
+        m.zonal_vars = ["qgf", "eg", "g"]
+        m.setup()
+        m.solve()
+        for v in ["q", "g", "qgf"]:
+            np.testing.assert_array_equal(m.data[v].values, ref.data[v].values)
+        df = m.data_zonal
+        self.assertEqual(set(df["layer"]), {"basin", "soils", "lulc"})
+
+        # basin zone is the global series (last step is not solved)
+        df_gb = m.data.iloc[:-1].set_index("datetime").resample("MS").sum()
+        df_basin = df[df["layer"] == "basin"]
+        self.assertEqual(list(df_basin["period"]), ["2020-01", "2020-02"])
+        for v in ["qgf", "eg"]:
+            np.testing.assert_allclose(df_basin[f"{v}_sum"].values, df_gb[v].values)
+
+        # area-weighted soils zones are the basin zone
+        df_soils = df[df["layer"] == "soils"]
+        vct_soils = m.get_cells(m.data_soils.data)
+        vct_area = np.array([np.sum(vct_soils == i) for i in df_soils["zone"]])
+        df_soils = df_soils.assign(a=vct_area * df_soils["g_mean"].values)
+        np.testing.assert_allclose(
+            df_soils.groupby("period")["a"].sum().values / len(vct_soils),
+            df_basin["g_mean"].values,
+        )
+
+        # steps of LULC zones cover all epochs
+        df_lulc = df[df["layer"] == "lulc"]
+        self.assertEqual(df_lulc.groupby("zone")["steps"].sum().max(), m.n_steps - 1)
+
+    def test_profile(self):
+        """
+        Profiling of local processes must time nested setup calls once.
+        """
+        m = make_model(uniform=False)
+        m.profile = True
+        m.setup()
+        m.solve()
+        df = m.get_profile().set_index("block")
+        self.assertNotIn("setup/setup", df.index)
+        self.assertNotIn("setup/params/params", df.index)
+        self.assertEqual(df.loc["solve/loop/lulc", "calls"], len(LULC_DATES))
+        self.assertEqual(df.loc["setup", "calls"], 1)
+
+    def test_get_map(self):
+        """
+        Scattering to the grid and gathering back must round trip.
+        """
+        m = make_model(uniform=False)
+        m.setup()
+        m.solve()
+        vct = m.vars["g"]["map"][0]
+        grd = m.get_map(vct)
+        self.assertEqual(grd.shape, m.basemap.shape)
+        self.assertTrue(np.all(np.isnan(grd[m.wmask == 0])))
+        np.testing.assert_array_equal(m.get_cells(grd), vct)
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
@@ -0,0 +1,191 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for the numerical solvers of the linear storage models
+(``LinearStorage``, ``LSRR``, ``LSRRE`` and ``LSFAS``).
+
+Models are set up in memory with synthetic climate data, so no project
+files are needed.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import unittest
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology import kernels
+from plans.hydrology.upscaled import LinearStorage, LSRR, LSRRE, LSFAS
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+PARAMS = {
+    "s0": 50.0,
+    "k": 5.0,
+    "q_max": 3.0,
+    "s_a": 20.0,
+    "s_c": 10.0,
+}
+
+MODELS = [LinearStorage, LSRR, LSRRE, LSFAS]
+
+# ***********************************************************************
+# FUNCTIONS
+# ***********************************************************************
+
+
+def make_model(model_class, days=60, engine="python"):
+    """
+    Build a linear storage model with synthetic daily forcing and hourly steps.
+
+    :param model_class: model class
+    :type model_class: type
+    :param days: number of days of forcing
+    :type days: int
+    :param engine: numerical engine
+    :type engine: str
+    :return: model ready for ``setup()``
+    :rtype: :class:`plans.hydrology.upscaled.LinearStorage`
+    """
+    m = model_class()
+    m.engine = engine
+    for k in PARAMS:
+        if k in m.params:
+            m.params[k]["value"] = PARAMS[k]
+    m.params["dt"]["value"] = 1
+    m.params["dt"]["units"] = "h"
+    rng = np.random.default_rng(0)
+    dtix = pd.date_range("2020-01-01", periods=days, freq="D")
+    p = rng.gamma(0.5, 10, size=days) * (rng.random(days) < 0.4)
+    m.data_clim = pd.DataFrame({"datetime": dtix, "p": p, "e_pot": np.full(days, 4.0)})
+    m.params["t0"]["value"] = str(dtix[0])
+    m.params["tN"]["value"] = str(dtix[-1])
+    return m
+
+
+def run_model(model_class, **kwargs):
+    """
+    Build, setup and solve a linear storage model.
+
+    :return: solved model
+    :rtype: :class:`plans.hydrology.upscaled.LinearStorage`
+    """
+    m = make_model(model_class, **kwargs)
+    m.setup()
+    m.solve()
+    return m
+
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestLinearStorage(unittest.TestCase):
+
+    def assertSameData(self, df1, df2):
+        self.assertEqual(list(df1.columns), list(df2.columns))
+        for c in df1.columns:
+            if c == "datetime":
+                continue
+            np.testing.assert_array_equal(
+                df1[c].values, df2[c].values, err_msg=f"Mismatch in {c}"
+            )
+
+    def test_compiled_engine_matches(self):
+        """
+        Compiled engine must match the reference loop bit-for-bit.
+        """
+        for model_class in MODELS:
+            ref = run_model(model_class, engine="python")
+            m = run_model(model_class, engine="compiled")
+            self.assertSameData(ref.data, m.data)
+
+    def test_fallback_kernel_matches(self):
+        """
+        Pure-Python kernel must match the reference loop bit-for-bit.
+        """
+        kernels._COMPILED["storage"] = kernels.get_kernel("storage", compiled=False)
+        try:
+            for model_class in MODELS:
+                ref = run_model(model_class, engine="python")
+                m = run_model(model_class, engine="compiled")
+                self.assertSameData(ref.data, m.data)
+        finally:
+            del kernels._COMPILED["storage"]
+
+    def test_shutdown_flags(self):
+        """
+        Testing flags must be honored by the compiled engine.
+        """
+        ref = make_model(LSFAS, engine="python")
+        m = make_model(LSFAS, engine="compiled")
+        for model in [ref, m]:
+            model.shutdown_epot = True
+            model.shutdown_qb = True
+            model.setup()
+            model.solve()
+        self.assertSameData(ref.data, m.data)
+        self.assertEqual(m.data["qb"].sum(), 0.0)
+
+    def test_exact_scheme(self):
+        """
+        Exact decay must match the analytical solution, even with dt larger than k.
+        """
+        for engine in ["python", "compiled"]:
+            m = make_model(LinearStorage, engine=engine)
+            m.params["dt"]["units"] = "D"
+            m.params["k"]["value"] = 0.5
+            m.scheme = "exact"
+            m.setup()
+            m.solve()
+            np.testing.assert_allclose(
+                m.data["s"].values, m.data["S_a"].values, rtol=1e-12, atol=1e-300
+            )
+        m = make_model(LSRR)
+        m.scheme = "implicit"
+        with self.assertRaises(ValueError):
+            m.setup()
+
+    def test_unknown_engine(self):
+        m = make_model(LSRR, engine="gpu")
+        m.setup()
+        with self.assertRaises(ValueError):
+            m.solve()
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
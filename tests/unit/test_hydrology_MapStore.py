@@ -0,0 +1,153 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for the chunked on-disk store of map snapshots.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import tempfile
+import unittest
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans import geo
+from plans.hydrology.store import MapStoreReader, MapStoreWriter
+from tests.unit.test_hydrology_DownscaledModel import make_model
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestMapStore(unittest.TestCase):
+
+    def write_store(self, folder, compress):
+        rng = np.random.default_rng(0)
+        cells = np.array([1, 2, 5, 7])
+        dtix = pd.date_range("2020-01-01", periods=25, freq="h")
+        data = rng.random((25, len(cells)))
+        with MapStoreWriter(
+            folder=folder,
+            variables=["g"],
+            cells=cells,
+            shape=(3, 3),
+            chunk_size=10,
+            dtype="float64",
+            compress=compress,
+        ) as writer:
+            for i in range(len(dtix)):
+                writer.append(step=i, datetime=dtix[i], values={"g": data[i]})
+        return data
+
+    def test_roundtrip(self):
+        """
+        Reader must return the appended snapshots, including a partial last chunk.
+        """
+        for compress in [False, True]:
+            with tempfile.TemporaryDirectory() as folder:
+                data = self.write_store(folder, compress=compress)
+                reader = MapStoreReader(folder)
+                self.assertEqual(len(reader), 25)
+                np.testing.assert_array_equal(reader.get("g", 13), data[13])
+                np.testing.assert_array_equal(reader.get("g", -1), data[-1])
+                grd = reader.get_map("g", 3)
+                self.assertEqual(grd.shape, (3, 3))
+                self.assertTrue(np.isnan(grd[0, 0]))
+                self.assertEqual(grd[0, 1], data[3, 0])
+                df = reader.get_series("g", cells=[2])
+                np.testing.assert_array_equal(df["g_2"].values, data[:, 2])
+                self.assertEqual(
+                    df["datetime"].iloc[1], pd.Timestamp("2020-01-01 01:00")
+                )
+                with self.assertRaises(ValueError):
+                    reader.get("foo", 0)
+
+    def test_interrupted(self):
+        """
+        Flushed chunks must be readable before the writer is closed.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            writer = MapStoreWriter(
+                folder=folder,
+                variables=["g"],
+                cells=[0, 1],
+                shape=(1, 2),
+                chunk_size=10,
+            )
+            for i in range(25):
+                writer.append(step=i, datetime="2020-01-01", values={"g": [i, i]})
+            # metadata is not rewritten per chunk, buffers hold one chunk
+            self.assertEqual(MapStoreReader(folder).meta["n_chunks"], 0)
+            self.assertEqual(len(writer.steps), 5)
+            reader = MapStoreReader(folder)
+            self.assertEqual(len(reader), 20)
+            self.assertEqual(reader.get("g", -1)[0], 19)
+            writer.close()
+            reader = MapStoreReader(folder)
+            self.assertEqual(len(reader), 25)
+            self.assertEqual(reader.meta["n_snapshots"], 25)
+
+    def test_model_snapshots(self):
+        """
+        Snapshots written during ``solve()`` must upscale to the global series.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            m = make_model(days=10, uniform=False)
+            m.store_folder = folder
+            m.store_vars = ["g", "qif"]
+            m.store_interval = 24
+            m.store_chunk = 4
+            m.store_dtype = "float64"
+            m.setup()
+            m.solve()
+            reader = MapStoreReader(folder)
+            self.assertEqual(list(reader.steps), list(range(0, m.n_steps - 1, 24)))
+            for i, t in enumerate(reader.steps):
+                for v in ["g", "qif"]:
+                    value = geo.upscale(
+                        reader.get(v, i), weights=m.cells_weights, mode="mean"
+                    )
+                    self.assertAlmostEqual(value, m.sdata[v][t], places=12)
+
+    def test_model_unknown_var(self):
+        m = make_model(days=2)
+        m.store_folder = "unused"
+        m.store_vars = ["q"]
+        m.setup()
+        with self.assertRaises(ValueError):
+            m.solve()
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for ``NestedRunner`` (topology-ordered nested sub-basins).
+
+Sub-basin models are the ``UpscaledModel`` test model with different
+forcing, so no project files are needed.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import tempfile
+import unittest
+from pathlib import Path
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology.nested import NestedRunner, get_lagged_flow, get_topology_levels
+from tests.unit.test_hydrology_UpscaledModel import make_model
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+# basins 1 and 2 drain to 3, basins 3 and 5 drain to the outlet 4
+TOPOLOGY = pd.DataFrame(
+    {
+        "Id": [1, 2, 3, 4, 5],
+        "Downstream_Id": [3, 3, 4, 0, 4],
+        "UpstreamArea": [10.0, 20.0, 5.0, 15.0, 30.0],
+        "Path": [0.0, 0.0, 2.5, 0.0, 1.0],
+    }
+)
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestNestedRunner(unittest.TestCase):
+
+    def test_levels(self):
+        """
+        Levels must follow the topology from headwaters to the outlet.
+        """
+        ls_levels, dc_upstream = get_topology_levels(TOPOLOGY)
+        self.assertEqual(ls_levels, [[1, 2, 5], [3], [4]])
+        self.assertEqual(dc_upstream[4], [3, 5])
+        with self.assertRaises(ValueError):
+            get_topology_levels(TOPOLOGY, ids=[3, 4, 5])
+        # fractional lags split flow between steps (mass is kept)
+        vct = get_lagged_flow(np.array([1.0, 0.0, 0.0, 0.0]), lag=1.5)
+        np.testing.assert_allclose(vct, [0.0, 0.5, 0.5, 0.0])
+
+    def test_run(self):
+        """
+        Outlet flows must be the area-weighted sum of local and upstream flows.
+        """
+        dc_models = {b: make_model(seed=b) for b in TOPOLOGY["Id"]}
+        # path lengths are given in steps of travel time
+        m = dc_models[4]
+        df_topo = TOPOLOGY.copy()
+        df_topo["Path"] = df_topo["Path"] * m.params["kq"]["value"]
+        df_topo["Path"] = df_topo["Path"] * m.params["dt"]["value"]
+
+        with tempfile.TemporaryDirectory() as folder:
+            runner = NestedRunner(
+                models=dc_models, topology=df_topo, field_path="Path", folder=folder
+            )
+            df = runner.run(n_workers=2)
+            self.assertTrue(Path(f"{folder}/myNested_summary.csv").is_file())
+            self.assertTrue(Path(f"{folder}/myNested_4.csv").is_file())
+        self.assertEqual(list(df["level"]), [0, 0, 0, 1, 2])
+        self.assertEqual(runner.timing["n_levels"], 3)
+
+        # serial local runs
+        dc_q = {}
+        for b, m in dc_models.items():
+            m.setup()
+            m.solve()
+            dc_q[b] = m.data["q"].values
+        for b in dc_models:
+            np.testing.assert_array_equal(runner.results[b]["q_local"].values, dc_q[b])
+        for b in [1, 2, 5]:
+            np.testing.assert_allclose(runner.results[b]["q"].values, dc_q[b])
+
+        # no travel time from 1 and 2 to 3
+        vct_q3 = (10 * dc_q[1] + 20 * dc_q[2] + 5 * dc_q[3]) / 35
+        np.testing.assert_allclose(runner.results[3]["q"].values, vct_q3)
+        # travel times of 2.5 steps from 3 and 1 step from 5 to 4
+        vct_q4 = (
+            35 * get_lagged_flow(vct_q3, lag=2.5)
+            + 30 * get_lagged_flow(dc_q[5], lag=1.0)
+            + 15 * dc_q[4]
+        ) / 80
+        np.testing.assert_allclose(runner.results[4]["q"].values, vct_q4)
+        self.assertEqual(df["area_total"].values[-1], 80)
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for ``ScenarioRunner`` (climate and LULC scenario matrices).
+
+Scenario data is built in memory from the ``DownscaledModel`` test model,
+so no project files are needed (except a temporary climate file).
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology.downscaled import DownscaledModel
+from plans.hydrology.scenarios import (
+    SCENARIO_RASTERS,
+    ScenarioRunner,
+    get_indicators,
+    get_scenario_matrix,
+)
+from tests.unit.test_hydrology_DownscaledModel import make_model
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+# precipitation factors of climate scenarios
+SCENARIOS_CLIM = {"obs": 1.0, "dry": 0.7, "wet": 1.3}
+
+# random seeds of LULC scenarios
+SCENARIOS_LULC = {"obs": 0, "alt": 1}
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+class ScenarioModel(DownscaledModel):
+    """
+    Downscaled model with in-memory scenario data.
+    """
+
+    def load_scenario(self, scenario_clim="obs", scenario_lulc="obs"):
+        self.scenario_clim = scenario_clim
+        self.scenario_lulc = scenario_lulc
+        ref = make_model(uniform=False, seed=SCENARIOS_LULC[scenario_lulc])
+        self.data_clim = ref.data_clim.copy()
+        self.data_clim["p"] = self.data_clim["p"] * SCENARIOS_CLIM[scenario_clim]
+        self.data_lulc = ref.data_lulc
+        self.lulc_maps_ls = ref.lulc_maps_ls
+        self._set_basemap()
+        return None
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestScenarioRunner(unittest.TestCase):
+
+    def test_scenario_matrix(self):
+        ls = get_scenario_matrix(["a", "b"], ["x", "y"])
+        self.assertEqual(ls, [("a", "x"), ("b", "x"), ("a", "y"), ("b", "y")])
+
+    def test_template_without_maps(self):
+        """
+        Shared maps must not be pickled into the worker template.
+        """
+        m = make_model(uniform=False, model_class=ScenarioModel)
+        runner = ScenarioRunner(model=m, scenarios_clim=["obs"], scenarios_lulc=["obs"])
+        template = pickle.loads(pickle.dumps(runner._get_template()))
+        for k in SCENARIO_RASTERS:
+            self.assertIsNone(getattr(template, k).data, msg=k)
+            self.assertIsNotNone(getattr(m, k).data, msg=k)
+
+    def test_run_matches_serial(self):
+        """
+        Pool runs must match serial runs of each scenario.
+        """
+        m = make_model(uniform=False, model_class=ScenarioModel)
+        runner = ScenarioRunner(
+            model=m,
+            scenarios_clim=list(SCENARIOS_CLIM),
+            scenarios_lulc=list(SCENARIOS_LULC),
+        )
+        df = runner.run(n_workers=2)
+        self.assertEqual(len(df), len(SCENARIOS_CLIM) * len(SCENARIOS_LULC))
+        self.assertEqual(list(df.columns[:2]), ["clim", "lulc"])
+        # shared model is untouched
+        self.assertIsNone(m.sdata)
+        self.assertIsNone(m.outputs)
+        for i in range(len(df)):
+            ref = make_model(uniform=False, model_class=ScenarioModel)
+            ref.load_scenario(df["clim"].values[i], df["lulc"].values[i])
+            ref.setup()
+            ref.solve()
+            dc = get_indicators(ref)
+            for k in dc:
+                self.assertAlmostEqual(df[k].values[i], dc[k], places=9, msg=k)
+        # wetter scenarios yield more streamflow
+        df = df.set_index(["lulc", "clim"])
+        for s in SCENARIOS_LULC:
+            self.assertLess(df.loc[(s, "dry"), "q"], df.loc[(s, "obs"), "q"])
+            self.assertLess(df.loc[(s, "obs"), "q"], df.loc[(s, "wet"), "q"])
+
+    def test_load_scenario_clim(self):
+        """
+        Loading a climate scenario must keep LULC and set the simulation period.
+        """
+        m = make_model()
+        data_lulc = m.data_lulc
+        with tempfile.TemporaryDirectory() as folder:
+            m.folders["clim"] = folder
+            Path(f"{folder}/wet").mkdir()
+            df = m.data_clim.copy()
+            df["p"] = df["p"] * 2
+            df.to_csv(f"{folder}/wet/{m.filename_data_clim}", sep=";", index=False)
+            m.load_scenario(scenario_clim="wet", scenario_lulc=None)
+        self.assertEqual(m.scenario_clim, "wet")
+        self.assertIs(m.data_lulc, data_lulc)
+        np.testing.assert_allclose(m.data_clim["p"].values, df["p"].values)
+        self.assertEqual(
+            pd.Timestamp(m.params["tN"]["value"]), df["datetime"].values[-1]
+        )
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
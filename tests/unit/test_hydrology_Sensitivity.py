@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for the global sensitivity analysis (Morris and Sobol) engine.
+
+Index estimators are checked on analytical functions. Model runs use the
+``UpscaledModel`` test model, so no project files are needed.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import unittest
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology.sensitivity import (
+    Sensitivity,
+    get_hypotheses,
+    get_morris_effects,
+    get_sobol_indices,
+    sample_morris,
+    sample_saltelli,
+)
+from tests.unit.test_hydrology_UpscaledModel import make_model
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+HYPOTHESES = pd.DataFrame(
+    {"Name": ["x1", "x2", "x3"], "Min": [0.0, 0.0, -1.0], "Max": [2.0, 1.0, 1.0]}
+)
+
+# ***********************************************************************
+# FUNCTIONS
+# ***********************************************************************
+
+
+def get_linear(df):
+    """
+    Additive test function (``x3`` has no effect).
+
+    :param df: samples table
+    :type df: :class:`pandas.DataFrame`
+    :return: function values
+    :rtype: :class:`numpy.ndarray`
+    """
+    return 3.0 * df["x1"].values + 2.0 * df["x2"].values
+
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestSensitivity(unittest.TestCase):
+
+    def test_morris(self):
+        """
+        Morris trajectories must change one factor per step and recover linear effects.
+        """
+        df = sample_morris(HYPOTHESES, n_trajectories=10, seed=0)
+        self.assertEqual(len(df), 10 * 4)
+        for h, n_min, n_max in HYPOTHESES.values:
+            self.assertTrue(np.all((df[h] >= n_min) & (df[h] <= n_max)))
+        grd = df[["x1", "x2", "x3"]].values.reshape(10, 4, 3)
+        n_changes = np.sum(np.diff(grd, axis=1) != 0, axis=2)
+        self.assertTrue(np.all(n_changes == 1))
+
+        df["y"] = get_linear(df)
+        df_ee = get_morris_effects(df, HYPOTHESES, output="y")
+        np.testing.assert_allclose(df_ee["mu_star"].values, [6.0, 2.0, 0.0])
+        np.testing.assert_allclose(df_ee["sigma"].values, 0.0, atol=1e-12)
+
+    def test_sobol(self):
+        """
+        Sobol indices must match the analytical values of an additive function.
+        """
+        df = sample_saltelli(HYPOTHESES, n_base=1024, seed=0)
+        self.assertEqual(len(df), 1024 * 5)
+        df["y"] = get_linear(df)
+        df_s = get_sobol_indices(df, ["x1", "x2", "x3"], output="y")
+        # variances: 36/12 and 4/12
+        vct_expected = [0.9, 0.1, 0.0]
+        np.testing.assert_allclose(df_s["S1"].values, vct_expected, atol=0.02)
+        np.testing.assert_allclose(df_s["ST"].values, vct_expected, atol=0.02)
+
+    def test_run(self):
+        """
+        Batched pool runs must match single model runs.
+        """
+        m = make_model()
+        m.setup()
+        df_hyp = get_hypotheses(m, params=["ck", "gk", "kq"], spread=0.5)
+        sa = Sensitivity(m, df_hyp, method="morris", n=4, seed=0)
+        df_ind = sa.run(n_workers=2, batch_size=5)
+        self.assertEqual(len(df_ind), 3 * 3)
+        self.assertEqual(sa.timing["n_evals"], 4 * 4)
+        self.assertGreater(sa.timing["time_per_1000"], 0)
+        self.assertEqual(sorted(set(sa.convergence["n"])), [2, 4])
+        # routing velocity is varied per sample
+        for i in [0, 5, 15]:
+            ref = make_model()
+            for h in df_hyp["Name"]:
+                ref.params[h]["value"] = sa.results[h].values[i]
+            ref.setup()
+            ref.solve()
+            for v in sa.outputs:
+                self.assertAlmostEqual(
+                    sa.results[v].values[i], np.nansum(ref.sdata[v]), places=6
+                )
+
+        with self.assertRaises(ValueError):
+            Sensitivity(m, df_hyp, method="fast")
+        with self.assertRaises(ValueError):
+            Sensitivity(m, pd.DataFrame({"Name": ["dt"], "Min": [0], "Max": [1]}))
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
@@ -0,0 +1,643 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for ``UpscaledModel`` numerical solvers.
+
+Models are set up in memory with synthetic climate and path-area data,
+so no project files are needed.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import tempfile
+import tracemalloc
+import unittest
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology import kernels, upscaled
+from plans.analyst import Bivar
+from plans.hydrology.core import load_columns, load_columns_meta
+from plans.hydrology.upscaled import UpscaledModel
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+PARAMS = {
+    "c0": 1.0,
+    "s0": 5.0,
+    "v0": 10.0,
+    "g0": 100.0,
+    "ck": 1.0,
+    "ca": 2.0,
+    "sk": 2.0,
+    "sufcap": 20.0,
+    "sufa": 5.0,
+    "sufc": 10.0,
+    "sofa": 5.0,
+    "sofc": 10.0,
+    "kv": 50.0,
+    "dea": 50.0,
+    "ecap": 20.0,
+    "gcap": 300.0,
+    "gk": 30.0,
+    "kq": 2000.0,
+}
+
+# ***********************************************************************
+# FUNCTIONS
+# ***********************************************************************
+
+
+def make_model(days=60, seed=0, engine="python"):
+    """
+    Build an ``UpscaledModel`` with synthetic daily forcing and hourly steps.
+
+    :param days: number of days of forcing
+    :type days: int
+    :param seed: random seed for precipitation
+    :type seed: int
+    :param engine: numerical engine
+    :type engine: str
+    :return: model ready for ``setup()``
+    :rtype: :class:`plans.hydrology.upscaled.UpscaledModel`
+    """
+    m = UpscaledModel()
+    m.engine = engine
+    for k in PARAMS:
+        m.params[k]["value"] = PARAMS[k]
+    m.params["dt"]["value"] = 1
+    m.params["dt"]["units"] = "h"
+    m.params["kq"]["units"] = "m/D"
+    rng = np.random.default_rng(seed)
+    dtix = pd.date_range("2020-01-01", periods=days, freq="D")
+    p = rng.gamma(0.5, 10, size=days) * (rng.random(days) < 0.4)
+    m.data_clim = pd.DataFrame({"datetime": dtix, "p": p, "e_pot": np.full(days, 4.0)})
+    m.params["t0"]["value"] = str(dtix[0])
+    m.params["tN"]["value"] = str(dtix[-1])
+    m.data_pah = pd.DataFrame(
+        {
+            "path": np.arange(100, 20000, 100.0),
+            "global": np.linspace(1, 0, 199) ** 2 + 0.01,
+        }
+    )
+    return m
+
+
+def run_model(**kwargs):
+    """
+    Set up and solve a synthetic model.
+
+    :return: solved model
+    :rtype: :class:`plans.hydrology.upscaled.UpscaledModel`
+    """
+    m = make_model(**kwargs)
+    m.setup()
+    m.solve()
+    return m
+
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestUpscaledModel(unittest.TestCase):
+
+    def setUp(self):
+        self.ref = run_model(engine="python")
+
+    def assertSameData(self, df1, df2):
+        for c in df1.columns:
+            if c == "datetime":
+                continue
+            np.testing.assert_array_equal(
+                df1[c].values, df2[c].values, err_msg=f"Mismatch in {c}"
+            )
+
+    # Engine tests
+    # ------------------------------------------------------------------
+
+    def test_compiled_engine_matches(self):
+        """
+        Compiled engine must match the reference loop bit-for-bit.
+        """
+        m = run_model(engine="compiled")
+        self.assertSameData(self.ref.data, m.data)
+
+    def test_fallback_kernel_matches(self):
+        """
+        Pure-Python kernel must match the reference loop bit-for-bit.
+        """
+        m = make_model(engine="compiled")
+        m.setup()
+        kernels._COMPILED["upscaled"] = kernels.get_kernel("upscaled", compiled=False)
+        try:
+            m.solve()
+        finally:
+            del kernels._COMPILED["upscaled"]
+        self.assertSameData(self.ref.data, m.data)
+
+    def test_shutdown_flags(self):
+        """
+        Testing flags must be honored by the compiled engine.
+        """
+        ref = make_model(engine="python")
+        m = make_model(engine="compiled")
+        for model in [ref, m]:
+            model.shutdown_qif = True
+            model.shutdown_qbf = True
+            model.setup()
+            model.solve()
+        self.assertSameData(ref.data, m.data)
+        self.assertEqual(m.data["qgf"].sum(), 0.0)
+
+    # Ensemble tests
+    # ------------------------------------------------------------------
+
+    def test_ensemble_matches_members(self):
+        """
+        Each ensemble member must match a single run with the same parameters.
+        """
+        df = pd.DataFrame(
+            {
+                "ck": [1.0, 3.0, 0.5],
+                "ca": [2.0, 0.0, 1.0],
+                "gcap": [300.0, 200.0, 100.0],
+                "g0": [100.0, 250.0, 150.0],
+                "dea": [50.0, 300.0, 20.0],
+            }
+        )
+        m = make_model()
+        m.setup()
+        outputs = ["q", "qbf", "g", "s", "e"]
+        dc = m.solve_ensemble(df, outputs=outputs)
+        for i in range(len(df)):
+            single = make_model()
+            for p in df.columns:
+                single.params[p]["value"] = df[p].values[i]
+            single.setup()
+            single.solve()
+            for v in outputs:
+                self.assertEqual(dc[v].shape, (len(df), m.slen))
+                np.testing.assert_array_equal(
+                    dc[v][i], single.data[v].values, err_msg=f"Member {i}: {v}"
+                )
+
+    def test_ensemble_compact_outputs(self):
+        """
+        Ensembles must allocate only requested outputs, in the model data type.
+        """
+        df = pd.DataFrame({"ck": np.linspace(0.5, 3.0, 50)})
+        m = make_model(days=365)
+        m.setup()
+        tracemalloc.start()
+        dc = m.solve_ensemble(df, outputs=["q"])
+        _, n_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(list(dc), ["q"])
+        # scratch of all variables would take over 26 output blocks
+        self.assertLess(n_peak, 16 * dc["q"].nbytes)
+
+        m = make_model()
+        m.dtype = "float32"
+        m.setup()
+        dc = m.solve_ensemble(df.iloc[:2], outputs=["q", "e", "s"])
+        single = make_model()
+        single.dtype = "float32"
+        single.params["ck"]["value"] = df["ck"].values[1]
+        single.setup()
+        single.solve()
+        for v in ["q", "e", "s"]:
+            self.assertEqual(dc[v].dtype, np.float32)
+            np.testing.assert_allclose(
+                dc[v][1], single.data[v].values, rtol=1e-5, atol=1e-6, err_msg=v
+            )
+
+    def test_ensemble_shared_kq(self):
+        m = make_model()
+        m.setup()
+        with self.assertRaises(ValueError):
+            m.solve_ensemble(pd.DataFrame({"kq": [100.0, 200.0]}))
+        with self.assertRaises(ValueError):
+            m.solve_ensemble(pd.DataFrame({"foo": [1.0]}))
+
+    def test_ensemble_member_guh(self):
+        """
+        Members with their own unit hydrographs must match single runs by ``kq``.
+        """
+        ls_kq = [1000.0, 3000.0]
+        m = make_model()
+        m.setup()
+        grd_uh = np.stack([m.get_guh_array(kq=kq)[0] for kq in ls_kq])
+        dc = m.solve_ensemble(pd.DataFrame({"kq": ls_kq}), unit_hydrograph=grd_uh)
+        for i, kq in enumerate(ls_kq):
+            single = make_model()
+            single.params["kq"]["value"] = kq
+            single.setup()
+            single.solve()
+            np.testing.assert_allclose(
+                dc["q"][i], single.data["q"].values, rtol=1e-9, atol=1e-12
+            )
+        with self.assertRaises(ValueError):
+            m.solve_ensemble(pd.DataFrame({"kq": ls_kq}), unit_hydrograph=grd_uh[:1])
+
+    # Checkpoint tests
+    # ------------------------------------------------------------------
+
+    def test_warm_start(self):
+        """
+        Chained warm runs must match a full run bit-for-bit (direct routing).
+        """
+        ref = make_model()
+        ref.routing_method = "direct"
+        ref.setup()
+        ref.solve()
+        with tempfile.TemporaryDirectory() as folder:
+            fpath = f"{folder}/checkpoint.npz"
+            for i, t_end in enumerate(["2020-01-15", "2020-02-02", "2020-02-29"]):
+                m = make_model()
+                m.routing_method = "direct"
+                if i > 0:
+                    m.load_checkpoint(fpath)
+                m.params["tN"]["value"] = t_end
+                m.setup()
+                m.solve()
+                m.save_checkpoint(fpath)
+        self.assertEqual(m.data["datetime"].iloc[0], pd.Timestamp("2020-02-02"))
+        i0 = ref.slen - m.slen
+        for c in ["q", "qbf", "c", "s", "v", "g", "e"]:
+            np.testing.assert_array_equal(
+                ref.data[c].values[i0:], m.data[c].values, err_msg=c
+            )
+
+    def test_step(self):
+        """
+        Stepwise runs must match batch runs bit-for-bit (direct routing).
+        """
+        ls_vars = ["q", "qbf", "c", "s", "v", "g", "e", "qhf", "qif"]
+        for engine in ["python", "compiled"]:
+            ref = make_model()
+            ref.engine = engine
+            ref.routing_method = "direct"
+            ref.setup()
+            ref.solve()
+            m = make_model()
+            m.engine = engine
+            m.setup()
+            ls_rows = []
+            for p, e_pot in zip(m.sdata["p"][:-1], m.sdata["e_pot"][:-1]):
+                ls_rows.append(m.step(p=p, e_pot=e_pot))
+            self.assertEqual(m.stream["step"], m.slen - 1)
+            for v in ls_vars:
+                np.testing.assert_array_equal(
+                    [dc[v] for dc in ls_rows], ref.data[v].values[:-1], err_msg=v
+                )
+
+        # stream from a warm start
+        with tempfile.TemporaryDirectory() as folder:
+            fpath = f"{folder}/checkpoint.npz"
+            m = make_model()
+            m.params["tN"]["value"] = "2020-02-02"
+            m.setup()
+            m.solve()
+            m.save_checkpoint(fpath)
+            m = make_model()
+            m.load_checkpoint(fpath)
+            m.setup()
+        m.start_stream()
+        vct_q = [m.step(p, e)["q"] for p, e in zip(m.sdata["p"], m.sdata["e_pot"])]
+        i0 = ref.slen - m.slen
+        np.testing.assert_array_equal(vct_q[:-1], ref.data["q"].values[i0:-1])
+
+    def test_step_long_stream(self):
+        """
+        Streams past a short setup period must route with the full GUH.
+        """
+        ref = make_model()
+        ref.routing_method = "direct"
+        ref.setup()
+        ref.solve()
+        m = make_model()
+        m.params["tN"]["value"] = "2020-01-02"
+        m.setup()
+        m.start_stream()
+        self.assertLess(m.slen, len(m.stream["uh"]))
+        ls_forcing = list(zip(ref.sdata["p"][:-1], ref.sdata["e_pot"][:-1]))
+        vct_q = [m.step(p, e)["q"] for p, e in ls_forcing]
+        np.testing.assert_array_equal(vct_q, ref.data["q"].values[:-1])
+
+        # missing inflow is propagated to all later outflow
+        m.start_stream()
+        vct_q = [m.step(p, e)["q"] for p, e in ls_forcing[:100]]
+        vct_q.append(m.step(np.nan, 4.0)["q"])
+        vct_q = vct_q + [m.step(p, e)["q"] for p, e in ls_forcing[101:400]]
+        np.testing.assert_array_equal(vct_q[:100], ref.data["q"].values[:100])
+        self.assertTrue(np.all(np.isnan(vct_q[100:])))
+
+    def test_profile(self):
+        """
+        Profiling must report solver blocks without changing outputs.
+        """
+        ref = run_model()
+        self.assertEqual(len(ref.get_profile()), 0)
+        m = make_model()
+        m.profile = True
+        m.setup()
+        m.solve()
+        np.testing.assert_array_equal(m.data["q"].values, ref.data["q"].values)
+        df = m.get_profile().set_index("block")
+        self.assertEqual(df.index[0], "setup")
+        for b in ["setup/guh", "solve/params", "solve/loop", "solve/routing"]:
+            self.assertEqual(df.loc[b, "calls"], 1)
+        self.assertAlmostEqual(df.loc[df["level"] == 0, "share"].sum(), 1.0)
+        self.assertLessEqual(df.loc["solve/loop", "time"], df.loc["solve", "time"])
+        # runs accumulate
+        m.solve()
+        self.assertEqual(m.get_profile().set_index("block").loc["solve", "calls"], 2)
+
+    def test_export_npz(self):
+        """
+        Binary export must round trip simulation data and load single columns.
+        """
+        m = run_model()
+        m.data_obs = m.data[["datetime", "q"]].rename(columns={"q": "q_obs"})
+        m.export_format = "npz"
+        m.export_level = 6
+        with tempfile.TemporaryDirectory() as folder:
+            m.export(folder, filename="run")
+            fpath = f"{folder}/run_sim.npz"
+            df = load_columns(fpath)
+            df_q = load_columns(fpath, columns=["q"])
+            meta = load_columns_meta(fpath)
+        self.assertEqual(list(df.columns), list(m.data.columns))
+        for c in df.columns:
+            np.testing.assert_array_equal(df[c].values, m.data[c].values, err_msg=c)
+        self.assertEqual(list(df_q.columns), ["q"])
+        self.assertEqual(meta["rows"], len(m.data))
+        self.assertEqual(meta["dt"], m.params["dt"]["value"])
+        self.assertEqual(meta["variables"]["q"]["kind"], "flow")
+        m.export_format = "parquet"
+        with self.assertRaises(ValueError):
+            m.export("", filename="run")
+
+    def test_checkpoint_mismatch(self):
+        m = make_model()
+        m.params["tN"]["value"] = "2020-01-15"
+        m.setup()
+        m.solve()
+        m.checkpoint = m.get_checkpoint()
+        # start time is not the checkpoint timestamp
+        with self.assertRaises(ValueError):
+            m.setup()
+        # time step differs
+        m.params["t0"]["value"] = str(m.checkpoint["datetime"])
+        m.checkpoint["dt"] = np.array(2 * m.params["dt"]["value"])
+        with self.assertRaises(ValueError):
+            m.setup()
+
+    # Routing tests
+    # ------------------------------------------------------------------
+
+    def test_routing_methods(self):
+        """
+        All routing methods must match the reference convolution.
+        """
+        rng = np.random.default_rng(1)
+        inflow = rng.random((3, 2000))
+        inflow[1, 1500:] = np.nan
+        uh = self.ref.data_guh[self.ref.basins_ls[0]].values
+        uh_support = uh[: np.flatnonzero(uh)[-1] + 1]
+        ref = np.array([np.convolve(x, uh_support)[:2000] for x in inflow])
+        for method in ["auto", "direct", "fft", "oa"]:
+            q = UpscaledModel.propagate_inflow(inflow, uh, method=method)
+            np.testing.assert_allclose(q, ref, atol=1e-12, err_msg=method)
+            # missing values propagate forward
+            self.assertTrue(np.all(np.isnan(q[1, 1500:])))
+        with self.assertRaises(ValueError):
+            UpscaledModel.propagate_inflow(inflow, uh, method="foo")
+
+    def test_routing_memory(self):
+        """
+        Warm runs must match a full run with FFT routing (to round-off).
+        """
+        m1 = make_model()
+        m1.params["tN"]["value"] = "2020-01-31"
+        m1.setup()
+        m1.solve()
+        m2 = make_model()
+        m2.checkpoint = m1.get_checkpoint()
+        m2.params["t0"]["value"] = "2020-01-31"
+        m2.routing_method = "fft"
+        m2.setup()
+        m2.solve()
+        i0 = self.ref.slen - m2.slen
+        for c in ["q", "qbf"]:
+            np.testing.assert_allclose(
+                self.ref.data[c].values[i0:], m2.data[c].values, atol=1e-12
+            )
+
+    def test_guh_cache(self):
+        """
+        Unit hydrographs of all basins must be built once and reused.
+        """
+        m = make_model()
+        m.data_pah["sub"] = np.linspace(0, 1, len(m.data_pah))
+        upscaled._GUH_CACHE.clear()
+        m.setup()
+        self.assertEqual(len(upscaled._GUH_CACHE), 1)
+        np.testing.assert_allclose(m.data_guh[["global", "sub"]].sum(), 1.0)
+        # each basin matches a single basin build
+        np.testing.assert_array_equal(
+            m.data_guh["global"].values, self.ref.data_guh["global"].values
+        )
+        # storage parameters do not change the key
+        guh = m.data_guh.copy()
+        m.params["kv"]["value"] = 10.0
+        m.setup()
+        self.assertEqual(len(upscaled._GUH_CACHE), 1)
+        pd.testing.assert_frame_equal(guh, m.data_guh)
+        # routing parameter does
+        m.params["kq"]["value"] = 1000.0
+        m.setup()
+        self.assertEqual(len(upscaled._GUH_CACHE), 2)
+        self.assertGreater(
+            np.flatnonzero(m.data_guh["global"].values)[-1],
+            np.flatnonzero(guh["global"].values)[-1],
+        )
+
+    # Multi-basin tests
+    # ------------------------------------------------------------------
+
+    def test_basins_match_single_runs(self):
+        """
+        Each basin must match a single basin run with its own parameters.
+        """
+        m = make_model()
+        m.data_pah["sub"] = np.linspace(0, 1, len(m.data_pah)) ** 2
+        m.setup()
+        df = pd.DataFrame({"gk": [10.0], "kq": [1000.0]}, index=["sub"])
+        dc = m.solve_basins(df, outputs=["q", "g"])
+        self.assertEqual(dc["q"].shape, (2, m.slen))
+        for i, basin in enumerate(m.basins_ls):
+            single = make_model()
+            single.data_pah = m.data_pah[["path", basin]]
+            if basin in df.index:
+                for p in df.columns:
+                    single.params[p]["value"] = df.loc[basin, p]
+            single.setup()
+            single.solve()
+            np.testing.assert_array_equal(dc["g"][i], single.data["g"].values)
+            np.testing.assert_allclose(
+                dc["q"][i], single.data["q"].values, atol=1e-12, err_msg=basin
+            )
+        with self.assertRaises(ValueError):
+            m.solve_basins(pd.DataFrame({"gk": [10.0]}, index=["foo"]))
+
+    # Evaluation tests
+    # ------------------------------------------------------------------
+
+    def test_evaluate(self):
+        """
+        Metrics on aligned arrays must match the merged table evaluation.
+        """
+        df_obs = self.ref.data[["datetime", "q"]].iloc[::7].copy()
+        df_obs.columns = ["datetime", "q_obs"]
+        df_obs["q_obs"] = df_obs["q_obs"] / self.ref.params["dt"]["value"]
+        # perfect fit
+        m = make_model()
+        m.data_obs = df_obs.dropna()
+        m.setup()
+        m.solve()
+        m.evaluate()
+        np.testing.assert_allclose(
+            m.get_metrics(), [0.0, 1.0, 0.0, 1.0, 1.0, 1.0], atol=1e-12
+        )
+        # voids, unsorted and out of period observations
+        df_obs["q_obs"] = df_obs["q_obs"] * 1.2
+        df_obs.iloc[3, 1] = np.nan
+        df_out = pd.DataFrame({"datetime": [pd.Timestamp("2030-01-01")], "q_obs": 1.0})
+        m.data_obs = pd.concat([df_out, df_obs[::-1]])
+        m.setup()
+        m.solve()
+        m.evaluate()
+        df = m.get_evaldata()
+        vc_pred = df["q"].values
+        vc_obs = df["q_obs"].values
+        self.assertEqual(len(m.eval_ix), len(df))
+        self.assertEqual(m.rmse, Bivar.rmse(pred=vc_pred, obs=vc_obs))
+        self.assertEqual(m.rsq, Bivar.rsq(pred=vc_pred, obs=vc_obs))
+        self.assertEqual(m.bias, Bivar.bias(pred=vc_pred, obs=vc_obs))
+        self.assertLess(m.kge, 1.0)
+        self.assertLess(m.lognse, 1.0)
+
+    # Output modes tests
+    # ------------------------------------------------------------------
+
+    def test_selective_outputs(self):
+        """
+        Selective outputs over rolling buffers must match the full run.
+        """
+        self.assertGreater(self.ref.slen, upscaled.SOLVE_CHUNK + 1)
+        for engine in ["python", "compiled"]:
+            m = make_model(engine=engine)
+            m.outputs = ["q", "e"]
+            m.setup()
+            self.assertNotIn("qif", m.sdata)
+            self.assertNotIn("qhf", m.sdata)
+            m.solve()
+            for v in ["q", "e", "g", "s", "qgf"]:
+                np.testing.assert_array_equal(
+                    m.data[v].values, self.ref.data[v].values, err_msg=v
+                )
+            self.assertNotIn("qbf", m.data.columns)
+        # ensembles
+        df = pd.DataFrame({"ck": [1.0, 2.0], "gk": [50.0, 90.0]})
+        ref = make_model()
+        ref.setup()
+        dc_ref = ref.solve_ensemble(df, outputs=["q", "e"])
+        dc = m.solve_ensemble(df, outputs=["q", "e"])
+        for v in dc_ref:
+            np.testing.assert_array_equal(dc[v], dc_ref[v], err_msg=v)
+        m = make_model()
+        m.outputs = ["foo"]
+        with self.assertRaises(ValueError):
+            m.setup()
+
+    def test_single_precision(self):
+        """
+        Single precision arrays must be close to the double precision run.
+        """
+        m = make_model()
+        m.dtype = "float32"
+        m.setup()
+        m.solve()
+        for v in ["q", "g", "e", "qbf"]:
+            self.assertEqual(m.sdata[v].dtype, np.float32, msg=v)
+            np.testing.assert_allclose(
+                m.data[v].values, self.ref.data[v].values, rtol=1e-4, atol=1e-5
+            )
+        m = make_model()
+        m.dtype = "int32"
+        with self.assertRaises(ValueError):
+            m.setup()
+
+    def test_exact_scheme(self):
+        """
+        Exact decay terms must match across engines and ensemble members.
+        """
+        ref = make_model()
+        ref.scheme = "exact"
+        ref.setup()
+        ref.solve()
+        m = make_model(engine="compiled")
+        m.scheme = "exact"
+        m.setup()
+        m.solve()
+        self.assertSameData(ref.data, m.data)
+        dc = m.solve_ensemble(pd.DataFrame({"gk": [PARAMS["gk"]]}), outputs=["q"])
+        np.testing.assert_array_equal(dc["q"][0], ref.data["q"].values)
+        # exact canopy decay is lower than explicit Euler
+        self.assertLess(np.nansum(ref.data["psf"]), np.nansum(self.ref.data["psf"]))
+
+    def test_unknown_engine(self):
+        m = make_model(engine="gpu")
+        m.setup()
+        with self.assertRaises(ValueError):
+            m.solve()
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
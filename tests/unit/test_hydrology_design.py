@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for the batch design-storm functions.
+
+Batch rows are checked against the one-storm-at-a-time functions.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import unittest
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology.core import uh_convolution, uh_convolution_batch
+from plans.hydrology.design import (
+    design_storms,
+    hydrograph_scs,
+    hydrograph_scs_batch,
+    hyetograph_scs,
+    hyetograph_scs_batch,
+    intensity_idf,
+    propagate_scs,
+    propagate_scs_batch,
+    tc_kirpich,
+)
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CONSTANTS
+# ***********************************************************************
+# define constants in uppercase
+
+IDF = {"k": 1000.0, "a": 0.15, "b": 10.0, "c": 0.8}
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestDesign(unittest.TestCase):
+
+    def test_batch_matches_single(self):
+        """
+        Batch hyetographs, runoff and hydrographs must match single storms.
+        """
+        vct_p = np.array([80.0, 120.0, 50.0])
+        vct_types = np.array(["II", "ia", "III"])
+        vct_cn = np.array([70.0, 85.0, 92.0])
+        vct_tc = np.array([30.0, 90.0, 240.0]) * 60
+        grd_p = hyetograph_scs_batch(vct_p, vct_types, factor=2)
+        grd_r = hydrograph_scs_batch(grd_p, vct_cn)
+        grd_q = propagate_scs_batch(grd_r, vct_tc)
+        for i in range(len(vct_p)):
+            df = hyetograph_scs(vct_p[i], vct_types[i].upper(), factor=2)
+            np.testing.assert_array_equal(grd_p[i], df["p"].values)
+            df = hydrograph_scs(df, vct_cn[i])
+            np.testing.assert_array_equal(grd_r[i], df["r"].values)
+            df = propagate_scs(df, vct_tc[i])
+            n = len(df)
+            np.testing.assert_allclose(grd_q[i, :n], df["q"].values, atol=1e-12)
+            np.testing.assert_allclose(grd_q[i, n:], 0.0, atol=1e-12)
+
+        with self.assertRaises(ValueError):
+            hyetograph_scs_batch(vct_p, ["II", "IV", "I"])
+
+    def test_design_storms(self):
+        """
+        Design storms must conserve mass and scale with storm duration.
+        """
+        vct_rec = np.array([2, 10, 50, 100])
+        vct_d = np.array([[60.0], [360.0], [1440.0]])
+        vct_tc = tc_kirpich(np.array([[800.0], [2500.0], [4000.0]]), 3.0)
+        dc = design_storms(
+            recurrence=vct_rec,
+            duration=vct_d,
+            CN=80,
+            tc=vct_tc,
+            parameters=IDF,
+            area=2e6,
+            dt=600,
+        )
+        df = dc["summary"]
+        self.assertEqual(len(df), 12)
+        self.assertEqual(dc["q"].shape, (12, len(dc["t"])))
+        vct_p = intensity_idf(df["recurrence"], df["duration"], IDF) * df["duration"]
+        np.testing.assert_allclose(df["p"].values, vct_p / 60)
+        # mass balance
+        np.testing.assert_allclose(dc["p"].sum(axis=1), df["p"].values)
+        np.testing.assert_allclose(dc["q"].sum(axis=1), df["r"].values)
+        np.testing.assert_allclose(df["V"].values, df["r"].values * 2e3)
+        # rain falls within the storm duration
+        for i, d in enumerate(df["duration"]):
+            self.assertEqual(np.sum(dc["p"][i, dc["t"] > d / 60]), 0.0)
+        # peaks grow with recurrence
+        grd_peak = df["Q_peak"].values.reshape(3, 4)
+        self.assertTrue(np.all(np.diff(grd_peak, axis=1) > 0))
+        np.testing.assert_allclose(df["Q_peak"].values, dc["Q"].max(axis=1))
+
+    def test_uh_convolution_batch(self):
+        """
+        Batch convolution must match single convolutions for short and long unit hydrographs.
+        """
+        rng = np.random.default_rng(0)
+        grd_flow = rng.gamma(0.5, 10, size=(4, 500))
+        for size_uh in [10, 200]:
+            grd_uh = rng.random((4, size_uh))
+            grd_uh = grd_uh / grd_uh.sum(axis=1, keepdims=True)
+            # one uh per series
+            grd_q = uh_convolution_batch(grd_flow, grd_uh)
+            self.assertEqual(grd_q.shape, (4, 500 + size_uh - 1))
+            for i in range(4):
+                np.testing.assert_allclose(
+                    grd_q[i], uh_convolution(grd_flow[i], grd_uh[i]), atol=1e-10
+                )
+            # shared uh and shared flow
+            grd_q = uh_convolution_batch(grd_flow, grd_uh[0])
+            np.testing.assert_allclose(
+                grd_q[2], uh_convolution(grd_flow[2], grd_uh[0]), atol=1e-10
+            )
+            grd_q = uh_convolution_batch(grd_flow[0], grd_uh)
+            np.testing.assert_allclose(
+                grd_q[3], uh_convolution(grd_flow[0], grd_uh[3]), atol=1e-10
+            )
+
+        with self.assertRaises(ValueError):
+            uh_convolution_batch(grd_flow, grd_uh[:3])
+        with self.assertRaises(ValueError):
+            uh_convolution_batch(grd_flow, 2 * grd_uh)
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}
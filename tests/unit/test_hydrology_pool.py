@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Copyright (C) 2025 The Project Authors
+# See pyproject.toml for authors/maintainers.
+# See LICENSE for license details.
+"""
+Unit tests for the process pool helpers.
+
+"""
+
+# ***********************************************************************
+# IMPORTS
+# ***********************************************************************
+# import modules from other libs
+
+# Native imports
+# =======================================================================
+# import {module}
+import pickle
+import unittest
+
+# ... {develop}
+
+# External imports
+# =======================================================================
+import numpy as np
+import pandas as pd
+
+# ... {develop}
+
+# Project-level imports
+# =======================================================================
+from plans.hydrology import pool
+from tests.unit.test_hydrology_UpscaledModel import make_model, run_model
+
+# ... {develop}
+
+
+# ***********************************************************************
+# CLASSES
+# ***********************************************************************
+
+
+# CLASSES -- Project-level
+# =======================================================================
+class TestPool(unittest.TestCase):
+
+    def test_template_without_forcing(self):
+        """
+        The pickled template must not carry climate forcing (shared in memory).
+        """
+        m = make_model()
+        # source copy as set by load_data()
+        m.data_clim_src = m.data_clim.copy()
+        template = pickle.loads(pickle.dumps(pool.get_template(m)))
+        for k, value in vars(template).items():
+            if isinstance(value, pd.DataFrame):
+                self.assertNotIn("e_pot", value.columns, msg=k)
+        # parameters are copied, the model is kept
+        template.params["kv"]["value"] = -1.0
+        self.assertNotEqual(m.params["kv"]["value"], -1.0)
+        self.assertIsNotNone(m.data_clim_src)
+
+    def test_attach_model(self):
+        """
+        A template attached to the shared climate must match the model run.
+        """
+        ref = run_model()
+        df = ref.data_clim.assign(label="a")
+        ls_shm, ls_specs = pool.share_frame(df)
+        try:
+            template = pool.get_template(make_model())
+            ls_attached = pool.attach_model(template, ls_specs)
+            # datetimes are shared in nanoseconds
+            pd.testing.assert_frame_equal(template.data_clim, df, check_dtype=False)
+            template.solve()
+            np.testing.assert_array_equal(
+                template.data["q"].values, ref.data["q"].values
+            )
+            for shm in ls_attached:
+                shm.close()
+        finally:
+            pool.release_frame(ls_shm)
+
+    def test_share_arrays(self):
+        """
+        Shared arrays (and masks of masked arrays) must be rebuilt as they are.
+        """
+        grd = np.arange(12).reshape(3, 4)
+        dc = {"grd": grd, "masked": np.ma.masked_where(grd > 8, grd)}
+        ls_shm, dc_specs = pool.share_arrays(dc)
+        try:
+            ls_attached, dc_attached = pool.attach_arrays(dc_specs)
+            np.testing.assert_array_equal(dc_attached["grd"], grd)
+            self.assertTrue(np.ma.isMaskedArray(dc_attached["masked"]))
+            np.testing.assert_array_equal(
+                np.ma.getmaskarray(dc_attached["masked"]), grd > 8
+            )
+            self.assertEqual(dc_attached["masked"].sum(), dc["masked"].sum())
+            del dc_attached
+            for shm in ls_attached:
+                shm.close()
+        finally:
+            pool.release_frame(ls_shm)
+
+
+# SCRIPT
+# ***********************************************************************
+# standalone behaviour as a script
+if __name__ == "__main__":
+    # Script section
+    # ===================================================================
+    unittest.main()
+    # ... {develop}